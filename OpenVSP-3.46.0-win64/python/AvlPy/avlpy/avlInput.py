@@ -25,6 +25,7 @@ from subprocess import Popen, PIPE, STDOUT
 import re
 import warnings
 from utilities import RunManager
+from utilities.cache import ResultCache, binary_identity, hash_key, register_cache_type
 import glob
 import sys
 import numpy as np
@@ -52,6 +53,16 @@ class AvlInput:
         self.header = header
         self.surfaces = surfaces
 
+    def generate(self):
+        """Generates the contents of the input file
+
+        :return: String with AVL geometry input
+        """
+        string_list = ["%s\n" % self.header.generate()]
+        for surface in self.surfaces:
+            string_list.append("%s\n" % surface.generate())
+        return ''.join(string_list)
+
     def toFile(self, fname):
         """Saves input to a file
 
@@ -59,9 +70,7 @@ class AvlInput:
         :return: boolean indicating success
         """
         with open(fname, 'w') as f:
-            f.write("%s\n" % self.header.generate())
-            for surface in self.surfaces:
-              f.write("%s\n" % surface.generate())
+            f.write(self.generate())
         return True
 
 
@@ -422,6 +431,62 @@ class AvlControl:
         return ''.join(string_list)
 
 
+AVL_OUTPUT_SCHEMA = (
+    ("Surfaces", "Surfaces"), ("Strips", "Strips"), ("Vortices", "Vortices"),
+    ("Sref", "Sref"), ("Cref", "Cref"), ("Bref", "Bref"), ("Xref", "Xref"), ("Yref", "Yref"), ("Zref", "Zref"),
+    ("Alpha", "Alpha"), ("pb_2V", "pb/2V"), ("pPrimeb_2V", "p'b/2V"), ("Beta", "Beta"), ("qc_2V", "qc/2V"),
+    ("Mach", "Mach"), ("rb_2V", "rb/2V"), ("rPrimeb_2V", "r'b/2V"),
+    ("CXtot", "CXtot"), ("Cltot", "Cltot"), ("ClPrimetot", "Cl'tot"), ("CYtot", "CYtot"), ("Cmtot", "Cmtot"),
+    ("CZtot", "CZtot"), ("Cntot", "Cntot"), ("CnPrimetot", "Cn'tot"), ("CLtot", "CLtot"), ("CDtot", "CDtot"),
+    ("CDvis", "CDvis"), ("CDind", "CDind"), ("CLff", "CLff"), ("CDff", "CDff"), ("CYff", "CYff"), ("e", "e"),
+    ("CLa", "CLa"), ("CLb", "CLb"), ("CYa", "CYa"), ("CYb", "CYb"), ("Cla", "Cla"), ("Clb", "Clb"),
+    ("Cma", "Cma"), ("Cmb", "Cmb"), ("Cna", "Cna"), ("Cnb", "Cnb"),
+    ("CLp", "CLp"), ("CLq", "CLq"), ("CLr", "CLr"), ("CYp", "CYp"), ("CYq", "CYq"), ("CYr", "CYr"),
+    ("Clp", "Clp"), ("Clq", "Clq"), ("Clr", "Clr"), ("Cmp", "Cmp"), ("Cmq", "Cmq"), ("Cmr", "Cmr"),
+    ("Cnp", "Cnp"), ("Cnq", "Cnq"), ("Cnr", "Cnr"),
+)
+"""
+(AvlOutput attribute, AVL quantity name) pairs read from every stability derivative output file
+"""
+
+STRIP_FORCES_COLUMNS = ['j', 'yle', 'chord', 'area', 'c_cl', 'ai', 'cl_norm', 'cl', 'cd', 'cdv', 'cm_c4', 'cm_le',
+                        'cp_xc']
+
+_AVL_TOKEN_EXPR = re.compile(r'[\s|#|\n]+')
+
+
+def _parse_avl_values(text):
+    """
+    Parses the "name = value" quantities of an AVL output file, tokenizing the whole file in one pass
+
+    :param text: contents of the output file
+    :return: dictionary of quantity name to value
+    """
+    data = dict()
+    tokens = _AVL_TOKEN_EXPR.split(text)
+    for i, token in enumerate(tokens):
+        if '=' not in token:
+            continue
+        key = tokens[i-1]
+        try:
+            val = float(tokens[i+1])
+        except ValueError:
+            if '*****' in token:
+                continue
+            val = float(token.replace("=",""))
+        if key not in data:
+            data[key] = val
+        else:
+            if key == 'Cnb':
+                # spiral stability parameter, keyed as "ClbCnr/ClrCnb"
+                key = "".join(tokens[i-5:i])
+                data[key] = val
+            else:
+                warnings.warn(f"Duplicate quantity parsed for {key}, keeping first value")
+    return data
+
+
+@register_cache_type
 class AvlOutput:
     """AvlOutput class to collect avl results
 
@@ -496,11 +561,16 @@ class AvlOutput:
         :param str plotFile: path to the generated plot file
         """
         self.cases = []
+        self.caseConditions = []
+        """
+        (alpha, beta) of each run case, known even when no stability derivative files were written
+        """
         self.plots = None
         self.plotFile = plotFile
         self.stripForces = None
         self.stabilityDerivs = None
         self.surfaceForces: typing.List[SurfaceForcesOutput] = []
+        self._set_case_attributes()
 
     def parseFile(self,file):
         """
@@ -508,30 +578,9 @@ class AvlOutput:
         :param str file: path to output file from AVL
         :return: none
         """
-        data = dict()
         with open(file,'r') as f:
-            lines = f.readlines()
-        for line in lines:
-            if "=" in line:
-                splitLine = re.split('[\s|#|\n]+',line)
-                indices = [i for i, j in enumerate(splitLine) if '=' in j ]
-                for i in indices:
-                    key = splitLine[i-1]
-                    try:
-                        val = float(splitLine[i+1])
-                    except ValueError:
-                        if '*****' in splitLine[i]:
-                            continue
-                        val = float(splitLine[i].replace("=",""))
-                    if key not in data:
-                        data[key] = val
-                    else:
-                        if key == 'Cnb':
-                            key = "".join(splitLine[i-6:i])
-                            data[key] = val
-                        else:
-                            warnings.warn(f"Duplicate quantity parsed for {key}, keeping first value")
-        self.cases.append( data)
+            text = f.read()
+        self.cases.append(_parse_avl_values(text))
 
     def parseFiles(self,files):
         """
@@ -541,67 +590,73 @@ class AvlOutput:
         """
         for f in files:
             self.parseFile(f)
-        self.Surfaces = [case["Surfaces"] for case in self.cases]
-        self.Strips = [case["Strips"] for case in self.cases]
-        self.Vortices = [case["Vortices"] for case in self.cases]
-        self.Sref = [case["Sref"] for case in self.cases]
-        self.Cref = [case["Cref"] for case in self.cases]
-        self.Bref = [case["Bref"] for case in self.cases]
-        self.Xref = [case["Xref"] for case in self.cases]
-        self.Yref = [case["Yref"] for case in self.cases]
-        self.Zref = [case["Zref"] for case in self.cases]
-        self.Alpha = [case["Alpha"] for case in self.cases]
-        self.pb_2V = [case["pb/2V"] for case in self.cases]
-        self.pPrimeb_2V = [case["p'b/2V"] for case in self.cases]
-        self.Beta = [case["Beta"] for case in self.cases]
-        self.qc_2V = [case["qc/2V"] for case in self.cases]
-        self.Mach = [case["Mach"] for case in self.cases]
-        self.rb_2V = [case["rb/2V"] for case in self.cases]
-        self.rPrimeb_2V = [case["r'b/2V"] for case in self.cases]
-        self.CXtot = [case["CXtot"] for case in self.cases]
-        self.Cltot = [case["Cltot"] for case in self.cases]
-        self.ClPrimetot = [case["Cl'tot"] for case in self.cases]
-        self.CYtot = [case["CYtot"] for case in self.cases]
-        self.Cmtot = [case["Cmtot"] for case in self.cases]
-        self.CZtot = [case["CZtot"] for case in self.cases]
-        self.Cntot = [case["Cntot"] for case in self.cases]
-        self.CnPrimetot = [case["Cn'tot"] for case in self.cases]
-        self.CLtot = [case["CLtot"] for case in self.cases]
-        self.CDtot = [case["CDtot"] for case in self.cases]
-        self.CDvis = [case["CDvis"] for case in self.cases]
-        self.CDind = [case["CDind"] for case in self.cases]
-        self.CLff = [case["CLff"] for case in self.cases]
-        self.CDff = [case["CDff"] for case in self.cases]
-        self.CYff = [case["CYff"] for case in self.cases]
-        self.e = [case["e"] for case in self.cases]
-        if "Xnp" in self.cases[0]:
-            self.Xnp = [case["Xnp"] for case in self.cases]
-        self.CLa = [case["CLa"] for case in self.cases]
-        self.CLb = [case["CLb"] for case in self.cases]
-        self.CYa = [case["CYa"] for case in self.cases]
-        self.CYb = [case["CYb"] for case in self.cases]
-        self.Cla = [case["Cla"] for case in self.cases]
-        self.Clb = [case["Clb"] for case in self.cases]
-        self.Cma = [case["Cma"] for case in self.cases]
-        self.Cmb = [case["Cmb"] for case in self.cases]
-        self.Cna = [case["Cna"] for case in self.cases]
-        self.Cnb = [case["Cnb"] for case in self.cases]
-        self.CLp = [case["CLp"] for case in self.cases]
-        self.CLq = [case["CLq"] for case in self.cases]
-        self.CLr = [case["CLr"] for case in self.cases]
-        self.CYp = [case["CYp"] for case in self.cases]
-        self.CYq = [case["CYq"] for case in self.cases]
-        self.CYr = [case["CYr"] for case in self.cases]
-        self.Clp = [case["Clp"] for case in self.cases]
-        self.Clq = [case["Clq"] for case in self.cases]
-        self.Clr = [case["Clr"] for case in self.cases]
-        self.Cmp = [case["Cmp"] for case in self.cases]
-        self.Cmq = [case["Cmq"] for case in self.cases]
-        self.Cmr = [case["Cmr"] for case in self.cases]
-        self.Cnp = [case["Cnp"] for case in self.cases]
-        self.Cnq = [case["Cnq"] for case in self.cases]
-        self.Cnr = [case["Cnr"] for case in self.cases]
-        self.SM = -1.0*np.array(self.Cma)/np.array(self.CLa)
+        self._set_case_attributes()
+
+    def merge(self, outputs):
+        """
+        Appends the cases, strip forces, surface forces and plots of other outputs to this output, in order. The plots
+        of each output are a complete PostScript document, so merged plots hold one document per output
+
+        :param outputs: list of AvlOutput objects
+        :return: none
+        """
+        for output in outputs:
+            self.cases.extend(output.cases)
+            self.caseConditions.extend(output.caseConditions)
+            if output.stripForces is not None:
+                self.stripForces = (self.stripForces or []) + output.stripForces
+            self.surfaceForces.extend(output.surfaceForces)
+            if output.plots is not None:
+                self.plots = (self.plots or "") + output.plots
+        self._set_case_attributes()
+
+    def _set_case_attributes(self):
+        # Fill preallocated columns in a single pass over the cases, quantities missing from a case are NaN
+        num_cases = max(len(self.cases), len(self.caseConditions))
+        data = {}
+        for i, case in enumerate(self.cases):
+            for key, val in case.items():
+                column = data.get(key)
+                if column is None:
+                    column = data[key] = np.full(num_cases, np.nan)
+                column[i] = val
+        # without stability derivative files the cases are only known by the conditions they were run at
+        if self.caseConditions and "Alpha" not in data:
+            conditions = np.array(self.caseConditions, dtype=float).reshape(-1, 2)
+            data["Alpha"] = conditions[:, 0]
+            data["Beta"] = conditions[:, 1]
+        self.data = data
+        """
+        Dictionary of AVL quantity name to array with a value for each case
+        """
+
+        for attr, key in AVL_OUTPUT_SCHEMA:
+            setattr(self, attr, data[key] if key in data else np.full(num_cases, np.nan))
+        if "Xnp" in data:
+            self.Xnp = data["Xnp"]
+        self.SM = -1.0*self.Cma/self.CLa
+
+    def to_cache_data(self):
+        """
+        Data of the output for storing in a :class:`utilities.cache.ResultCache`
+        :return: dictionary of the parsed cases, case conditions, plots, strip forces and surface forces
+        """
+        return {"cases": self.cases, "caseConditions": [tuple(c) for c in self.caseConditions], "plots": self.plots,
+                "plotFile": self.plotFile, "stripForces": self.stripForces, "surfaceForces": self.surfaceForces}
+
+    @classmethod
+    def from_cache_data(cls, data):
+        """
+        Rebuilds an output from :meth:`to_cache_data`
+        """
+        output = cls(data["plotFile"])
+        output.cases = data["cases"]
+        output.caseConditions = data["caseConditions"]
+        output.plots = data["plots"]
+        output.stripForces = data["stripForces"]
+        output.surfaceForces = data["surfaceForces"]
+        output._set_case_attributes()
+        return output
 
     def loadPlots(self,file=None):
         """Loads the plot files from AVL. This stores it as a binary file, so can be saved with a naive call to write()
@@ -646,21 +701,44 @@ class AvlOutput:
         :return:
         """
         import pandas as pd
-        df = pd.DataFrame.from_records(self.cases)
+        df = pd.DataFrame(self.data)
         df['SM'] = self.SM
         return df
 
     def get_surface_forces_df(self):
-        all_df = pd.DataFrame()
-        for i, a in enumerate(self.Alpha):
-            b = self.Beta[i]
-            single_df = self.surfaceForces[i].get_df()
-            single_df['Alpha'] = a
-            single_df['Beta'] = b
-            all_df = pd.concat((all_df, single_df), ignore_index=True)
-        return all_df
-
-
+        """
+        Concatenates the surface forces of all cases into a single data frame
+        :return: data frame with a row for each surface and case
+        """
+        frames = []
+        for i, surface_forces in enumerate(self.surfaceForces):
+            single_df = surface_forces.get_df()
+            single_df['Alpha'] = self.Alpha[i]
+            single_df['Beta'] = self.Beta[i]
+            frames.append(single_df)
+        return pd.concat(frames, ignore_index=True)
+
+    def get_strip_forces_df(self):
+        """
+        Concatenates the strip forces of all surfaces and cases into a single data frame
+        :return: data frame with a row for each strip, surface and case
+        """
+        frames = []
+        for i, strip_forces in enumerate(self.stripForces):
+            if not hasattr(strip_forces, "strips"):
+                strip_forces.parse_lines()
+            for surface in strip_forces.strips:
+                single_df = pd.DataFrame(surface.data[:, 0:len(STRIP_FORCES_COLUMNS)],
+                                         columns=STRIP_FORCES_COLUMNS[0:surface.data.shape[1]])
+                single_df['name'] = surface.name
+                single_df['surf_num'] = surface.surf_num
+                single_df['Alpha'] = self.Alpha[i]
+                single_df['Beta'] = self.Beta[i]
+                frames.append(single_df)
+        return pd.concat(frames, ignore_index=True)
+
+
+@register_cache_type
 class StripForcesOutput():
     def __init__(self, file):
         '''
@@ -685,6 +763,16 @@ class StripForcesOutput():
 
         self.strips.append( StripForcesSurface(lines[indx[-1]: len(lines)-1]))
 
+    def to_cache_data(self):
+        return {"lines": self.lines, "cref": self.cref}
+
+    @classmethod
+    def from_cache_data(cls, data):
+        output = cls.__new__(cls)
+        output.lines = data["lines"]
+        output.cref = data["cref"]
+        return output
+
     def dump_csvs(self, base_filename):
         for strip in self.strips:
             strip.dump_csv(base_filename + f"{strip.name}_{strip.surf_num}.csv", self.cref)
@@ -746,9 +834,9 @@ class StripForcesSurface():
         # data = np.genfromtxt(bio, )
         # Manually parse data since sometimes there are a different number of rows
         data = []
+        reader = ff.FortranRecordReader("(2X,I4,11(1X,F8.4),1X,F8.3)")
         for line in str_array[14:]:
             line = line.replace("*", " ")
-            reader = ff.FortranRecordReader("(2X,I4,11(1X,F8.4),1X,F8.3)")
             line_data = reader.read(line)
             line_data = [np.nan if x is None else x for x in line_data]
             data.append(line_data)
@@ -781,6 +869,7 @@ class StripForcesSurface():
             writer.writerow(['j', 'yle', 'chord', 'area', 'c_cl', 'ai', 'cl_norm', 'cl', 'cd', 'cdv', 'cm_c4', 'cm_le', 'cp_xc'])
             pd.DataFrame(self.data).to_csv(csvfile, header=None, index=None)
 
+@register_cache_type
 class SurfaceForcesOutput:
     """
     Output wrapper for surface forces
@@ -825,6 +914,15 @@ class SurfaceForcesOutput:
     def get_df(self):
         return pd.DataFrame(self.__dict__)
 
+    def to_cache_data(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_cache_data(cls, data):
+        output = cls.__new__(cls)
+        output.__dict__.update(data)
+        return output
+
 
 
 def create_input_from_degen_geom(degen_objects=None, degen_set=None, title="DegenAvl", mach=0.0, Sref=1.0, Bref=1.0,
@@ -946,7 +1044,8 @@ def create_input_from_degen_geom(degen_objects=None, degen_set=None, title="Dege
 
 
 def runAvl(avlInput, alpha=None, beta=None, savePlots=False,
-           binPath=DEFAULT_AVL_BINARY, constraints=None, collect_surface_forces=False, **kwargs):
+           binPath=DEFAULT_AVL_BINARY, constraints=None, collect_surface_forces=False, num_workers=1,
+           collect_stability_derivs=True, collect_strip_forces=True, lean=None, cache=None, **kwargs):
     """
 
     :param avlInput: AvlInput object to run or
@@ -955,6 +1054,16 @@ def runAvl(avlInput, alpha=None, beta=None, savePlots=False,
     :param binPath: path to binary file (optional)
     :param constraints: constraints structure to be used for trimming (default=None)
     :param collect_surface_forces: True to have avl output surface forces
+    :param collect_stability_derivs: True to have avl output totals and stability derivatives for each case
+    :param collect_strip_forces: True to have avl output strip forces
+    :param lean: if True, only the requested outputs are written and no geometry, loading or Trefftz plane plots are
+    generated. Defaults to True unless savePlots is set
+    :param cache: optional :class:`utilities.cache.ResultCache` or path of one, see :func:`avl_cache`. Results are keyed
+    by the generated input file, the cases, constraints, output options and the contents of the AVL binary, and a hit
+    returns the stored results without running AVL
+    :param num_workers: number of AVL processes to split the alpha/beta cases across. Each runs a contiguous block of
+    cases in its own worker process and RunManager directory, and the results are merged back in case order. With
+    savePlots, the plots hold one PostScript document per worker
     :param kwargs: can pass cleanup_flag and change_dir to the RunManager class, if desired
     :return:
     """
@@ -964,6 +1073,101 @@ def runAvl(avlInput, alpha=None, beta=None, savePlots=False,
     if beta is None:
         beta = [0]
 
+    cases = [(a, b) for a in alpha for b in beta]
+    if lean is None:
+        lean = not savePlots
+
+    key = None
+    if cache is not None:
+        if not isinstance(cache, ResultCache):
+            cache = ResultCache(cache)
+        key = hash_key("runAvl", avlInput.generate(), cases, constraints, savePlots, lean, collect_surface_forces,
+                       collect_stability_derivs, collect_strip_forces, _binary_identity(binPath))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    results = _runAvlSharded(avlInput, cases, num_workers, savePlots=savePlots, binPath=binPath,
+                             constraints=constraints, collect_surface_forces=collect_surface_forces,
+                             collect_stability_derivs=collect_stability_derivs,
+                             collect_strip_forces=collect_strip_forces, lean=lean, **kwargs)
+    if key is not None:
+        cache.put(key, results)
+    return results
+
+
+def avl_cache(cache_dir=None, max_size=2**30, shared=False):
+    """
+    Opens a result cache for runAvl
+
+    :param cache_dir: directory of the cache, defaults to the AVLPY_CACHE_DIR environment variable or ~/.cache/avlpy.
+    Point several users at the same directory with shared set to share results on one machine
+    :param max_size: maximum size of the cache in bytes, least recently used results are evicted beyond it
+    :param shared: True or a group name to share the cache with the members of a group, see
+    :class:`utilities.cache.ResultCache`
+    :return: :class:`utilities.cache.ResultCache` object
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get("AVLPY_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "avlpy"))
+    return ResultCache(os.path.join(cache_dir, "avl_results.sqlite"), max_size=max_size, shared=shared)
+
+
+def _binary_identity(binPath):
+    """
+    Identifies an AVL binary by its contents, so results are recomputed when the binary changes
+
+    :param binPath: path to binary file
+    :return: hex digest, or binPath if the binary cannot be found
+    """
+    return binary_identity(binPath)
+
+
+def _runAvlSharded(avlInput, cases, num_workers, savePlots=False, binPath=DEFAULT_AVL_BINARY, constraints=None,
+                   collect_surface_forces=False, collect_stability_derivs=True, collect_strip_forces=True, lean=None,
+                   **kwargs):
+    """
+    Runs cases in up to num_workers AVL processes, see runAvl
+
+    :return: AvlOutput object, AVL standard output
+    """
+    num_workers = min(num_workers, len(cases))
+    if num_workers <= 1:
+        return _runAvlCases(avlInput, cases, savePlots=savePlots, binPath=binPath, constraints=constraints,
+                            collect_surface_forces=collect_surface_forces,
+                            collect_stability_derivs=collect_stability_derivs,
+                            collect_strip_forces=collect_strip_forces, lean=lean, **kwargs)
+
+    from concurrent.futures import ProcessPoolExecutor
+    shards = [list(shard) for shard in np.array_split(np.arange(len(cases)), num_workers)]
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(_runAvlCases, avlInput, [cases[i] for i in shard], savePlots=savePlots,
+                                   binPath=binPath, constraints=constraints,
+                                   collect_surface_forces=collect_surface_forces,
+                                   collect_stability_derivs=collect_stability_derivs,
+                                   collect_strip_forces=collect_strip_forces, lean=lean, **kwargs)
+                   for shard in shards]
+        shard_outputs = [future.result() for future in futures]
+
+    results = AvlOutput()
+    results.merge([output for output, _ in shard_outputs])
+    stdOut = "".join(out for _, out in shard_outputs)
+    return results, stdOut
+
+
+def _runAvlCases(avlInput, cases, savePlots=False, binPath=DEFAULT_AVL_BINARY, constraints=None,
+                 collect_surface_forces=False, collect_stability_derivs=True, collect_strip_forces=True, lean=None,
+                 **kwargs):
+    """
+    Runs a list of (alpha, beta) cases in a single AVL process, see runAvl
+
+    :param cases: list of (alpha, beta) tuples
+    :return: AvlOutput object, AVL standard output
+    """
+    if lean is None:
+        lean = not savePlots
+    if lean and savePlots:
+        raise ValueError("savePlots requires plots to be generated, set lean=False")
+
     with RunManager(**kwargs) as r:
         cmd = io.StringIO()
 
@@ -977,31 +1181,33 @@ def runAvl(avlInput, alpha=None, beta=None, savePlots=False,
         cmd.write('plop\nG\n\n') # turn off plotting
         cmd.write('load {}\n'.format(inputFile))
         cmd.write('oper\n')
-        cmd.write("g\n")  # go to geometry menu
-        cmd.write("h\n")  # print current geometry
-        cmd.write("no\n")  # turn normals on
-        cmd.write("h\n")  # print
-        cmd.write("no\n")  # turn normal off
-        # Get front view
-        cmd.write("v\n")
-        cmd.write("0 0\n")
-        cmd.write("h\n\n")
+        if not lean:
+            cmd.write("g\n")  # go to geometry menu
+            cmd.write("h\n")  # print current geometry
+            cmd.write("no\n")  # turn normals on
+            cmd.write("h\n")  # print
+            cmd.write("no\n")  # turn normal off
+            # Get front view
+            cmd.write("v\n")
+            cmd.write("0 0\n")
+            cmd.write("h\n\n")
 
         if constraints is not None:
             for constraint in constraints:
                 cmd.write("%s %s %f\n" % tuple(constraint))
 
-        for a in alpha:
-            for b in beta:
-                cmd.write("+\n")  # add new run case
-                cmd.write("a a {}\n".format(a))  # add this alpha to the run case
-                cmd.write("b b {}\n".format(b))  # add this beta to the run case
-                cmd.write("x\n")  # execute run case
+        for a, b in cases:
+            cmd.write("+\n")  # add new run case
+            cmd.write("a a {}\n".format(a))  # add this alpha to the run case
+            cmd.write("b b {}\n".format(b))  # add this beta to the run case
+            cmd.write("x\n")  # execute run case
+            if collect_stability_derivs:
                 cmd.write("st\n")
                 f = "results_alpha_{}_beta_{}.txt".format(a, b)
                 outputFiles.append( f )
                 cmd.write(f + "\n")
 
+            if not lean:
                 cmd.write("g\n") # go to geometry menu
                 cmd.write("lo\n")  # turn loading on
                 cmd.write("v\n-45.0 20.0\n") # set viewpoint to iso
@@ -1013,21 +1219,22 @@ def runAvl(avlInput, alpha=None, beta=None, savePlots=False,
                 cmd.write("lo\n") # turn loading off
                 cmd.write("\n")  #go back to oper menu
 
-                # save out strip forces
+            # save out strip forces
+            if collect_strip_forces:
                 cmd.write("FS\n")
                 fsFiles.append("strip_forces_{}_{}.txt".format(a, b))
                 cmd.write("{}\n".format(fsFiles[-1]))
 
+            if not lean:
                 cmd.write("T\n")  # go to trefftz plane menu
                 cmd.write("h\n\n")  # print
 
-                # save out surface forces
-                if collect_surface_forces:
-                    fn_file = "surface_forces_{}_{}.txt".format(a, b)
-                    fnFiles.append(fn_file)
-                    cmd.write("FN\n")
-                    cmd.write(fn_file + "\n")
-
+            # save out surface forces
+            if collect_surface_forces:
+                fn_file = "surface_forces_{}_{}.txt".format(a, b)
+                fnFiles.append(fn_file)
+                cmd.write("FN\n")
+                cmd.write(fn_file + "\n")
 
         cmd.write("\nquit\n")
 
@@ -1037,6 +1244,7 @@ def runAvl(avlInput, alpha=None, beta=None, savePlots=False,
         cmd.close()
 
         results = AvlOutput()
+        results.caseConditions = list(cases)
         results.parseFiles(outputFiles)
 
         try:
@@ -1066,3 +1274,202 @@ def runAvl(avlInput, alpha=None, beta=None, savePlots=False,
             results.loadPlots(plotFile)
 
     return results, stdOut
+
+
+class AvlSession:
+    """
+    Long lived AVL process for running many cases on the same geometry
+
+    AVL is started once and kept open over pipes. The geometry is only reloaded when the generated input file changes,
+    and each case's output files are parsed as soon as AVL has written them.
+
+    Trim constraints stay in effect for later cases until they are changed, as in interactive AVL.
+    """
+
+    def __init__(self, avlInput=None, binPath=DEFAULT_AVL_BINARY, collect_strip_forces=True,
+                 collect_surface_forces=False, timeout=60.0, cleanup_flag=True):
+        """
+
+        :param avlInput: AvlInput object to load, can also be given to each run
+        :param binPath: path to binary file (optional)
+        :param collect_strip_forces: True to have avl output strip forces
+        :param collect_surface_forces: True to have avl output surface forces
+        :param timeout: time in seconds to wait for the outputs of a single case. If a case takes longer, AVL is stopped
+        and the session can no longer be used
+        :param cleanup_flag: whether or not to delete the run directory when the session is closed
+        """
+        import collections
+        import tempfile
+        import threading
+
+        self.binPath = binPath
+        self.collect_strip_forces = collect_strip_forces
+        self.collect_surface_forces = collect_surface_forces
+        self.timeout = timeout
+        self.cleanup_flag = cleanup_flag
+        self.wd = tempfile.mkdtemp()
+        self.stdOut = collections.deque(maxlen=1000)
+        """
+        Most recent lines of AVL standard output
+        """
+
+        self._input = None
+        self._cref = None
+        self._num_cases = 0
+        self._in_oper = False
+        self._failed = False
+        self._process = Popen([binPath], stdout=PIPE, stdin=PIPE, stderr=STDOUT, universal_newlines=True,
+                              bufsize=1, cwd=self.wd)
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+        self._send('plop\nG\n\n')  # turn off plotting
+
+        if avlInput is not None:
+            self.load(avlInput)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _read_output(self):
+        for line in self._process.stdout:
+            self.stdOut.append(line)
+
+    def _send(self, cmd):
+        if self._failed:
+            raise RuntimeError("AVL session stopped after a failed run, start a new AvlSession")
+        if self._process.poll() is not None:
+            raise RuntimeError("AVL exited with code {}:\n{}".format(self._process.returncode, "".join(self.stdOut)))
+        self._process.stdin.write(cmd)
+        self._process.stdin.flush()
+
+    def load(self, avlInput):
+        """
+        Loads geometry into AVL if it differs from the geometry already loaded
+
+        :param avlInput: AvlInput object
+        :return: True if the geometry was reloaded
+        """
+        input_text = avlInput.generate()
+        self._cref = avlInput.header.Cref
+        if input_text == self._input:
+            return False
+
+        with open(os.path.join(self.wd, "avlinput.txt"), "w") as f:
+            f.write(input_text)
+        cmd = "\n" if self._in_oper else ""  # go back to the main menu
+        cmd += "load avlinput.txt\n"
+        cmd += "oper\n"
+        self._send(cmd)
+        self._input = input_text
+        self._in_oper = True
+        return True
+
+    def run(self, alpha, beta=None, constraints=None, avlInput=None):
+        """
+        Runs cases, sending them to AVL all at once and parsing each as soon as its outputs are written
+
+        :param alpha: angle of attack or array of angles of attack to run
+        :param beta: sideslip angle or array of sideslip angles, every alpha is run at every beta (default=0)
+        :param constraints: constraints structure to be used for trimming (default=None)
+        :param avlInput: AvlInput object to run, the geometry is only reloaded if it changed
+        :return: AvlOutput object with the cases in alpha then beta order
+        :raises TimeoutError: if a case does not finish within the session timeout, the session cannot be used again
+        """
+        if avlInput is not None:
+            self.load(avlInput)
+        if self._input is None:
+            raise ValueError("No AvlInput has been loaded")
+        if beta is None:
+            beta = [0]
+
+        cmd = io.StringIO()
+        if constraints is not None:
+            for constraint in constraints:
+                cmd.write("%s %s %f\n" % tuple(constraint))
+
+        case_files = []
+        for a in np.atleast_1d(alpha):
+            for b in np.atleast_1d(beta):
+                self._num_cases += 1
+                files = {name: "{}_{}.txt".format(name, self._num_cases) for name in ("st", "fs", "fn", "ft")}
+                cmd.write("a a {}\n".format(a))
+                cmd.write("b b {}\n".format(b))
+                cmd.write("x\n")  # execute run case
+                cmd.write("st\n{}\n".format(files["st"]))
+                if self.collect_strip_forces:
+                    cmd.write("FS\n{}\n".format(files["fs"]))
+                if self.collect_surface_forces:
+                    cmd.write("FN\n{}\n".format(files["fn"]))
+                # AVL handles commands in order, so once the total forces file exists the other files are closed
+                cmd.write("FT\n{}\n".format(files["ft"]))
+                case_files.append((files, (a, b)))
+        self._send(cmd.getvalue())
+
+        results = AvlOutput()
+        outputs = []
+        try:
+            for files, condition in case_files:
+                outputs.append(self._collect_case(files, condition))
+        except BaseException:
+            # The cases queued behind the failed one would keep AVL busy and hold up every later run, so AVL is
+            # stopped instead
+            self._stop()
+            raise
+        results.merge(outputs)
+        return results
+
+    def _collect_case(self, files, condition):
+        import time
+        paths = {name: os.path.join(self.wd, f) for name, f in files.items()}
+        start_time = time.time()
+        while not os.path.exists(paths["ft"]):
+            if self._process.poll() is not None:
+                raise RuntimeError("AVL exited with code {}:\n{}".format(self._process.returncode,
+                                                                         "".join(self.stdOut)))
+            if time.time() - start_time > self.timeout:
+                raise TimeoutError("AVL did not finish case in {} s".format(self.timeout))
+            time.sleep(0.001)
+
+        output = AvlOutput()
+        output.caseConditions = [condition]
+        output.parseFile(paths["st"])
+        if self.collect_strip_forces:
+            s = StripForcesOutput(paths["fs"])
+            s.cref = self._cref
+            output.stripForces = [s]
+        if self.collect_surface_forces:
+            output.surfaceForces = [SurfaceForcesOutput(paths["fn"])]
+
+        for path in paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+        return output
+
+    def _stop(self):
+        self._failed = True
+        if self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        self._process.stdin.close()
+
+    def close(self):
+        """
+        Quits AVL and removes the run directory
+        """
+        import shutil
+        from subprocess import TimeoutExpired
+        if self._process.poll() is None:
+            try:
+                self._send("\n" if self._in_oper else "")
+                self._send("quit\n")
+                self._process.stdin.close()
+                self._process.wait(timeout=10)
+            except (OSError, RuntimeError, TimeoutExpired):
+                self._process.kill()
+                self._process.wait()
+        self._reader.join(timeout=1)
+        if self.cleanup_flag:
+            shutil.rmtree(self.wd, ignore_errors=True)
@@ -0,0 +1,144 @@
+# Copyright (c) 2020 Uber Technologies, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Stand-in for the AVL executable used by the avlpy tests
+
+Reads AVL commands from standard input one line at a time, echoing each as "> command", and writes stability
+derivative (st), strip force (FS), surface force (FN) and total force (FT) files whose values depend on the alpha
+and beta of the current case. Hardcopy commands (h) append a page for the current case to plot.ps. Setting the
+STUB_AVL_CASE_DELAY environment variable delays every executed case by that many seconds.
+"""
+
+import os
+import stat
+import sys
+import time
+
+ST_NAMES = ("Surfaces", "Strips", "Vortices", "Sref", "Cref", "Bref", "Xref", "Yref", "Zref", "Alpha", "pb/2V",
+            "p'b/2V", "Beta", "qc/2V", "Mach", "rb/2V", "r'b/2V", "CXtot", "Cltot", "Cl'tot", "CYtot", "Cmtot",
+            "CZtot", "Cntot", "Cn'tot", "CLtot", "CDtot", "CDvis", "CDind", "CLff", "CDff", "CYff", "e", "CLa", "CLb",
+            "CYa", "CYb", "Cla", "Clb", "Cma", "Cmb", "Cna", "Cnb", "CLp", "CLq", "CLr", "CYp", "CYq", "CYr", "Clp",
+            "Clq", "Clr", "Cmp", "Cmq", "Cmr", "Cnp", "Cnq", "Cnr")
+
+SURFACES = ("Wing", "Tail")
+
+
+def case_cl(alpha, beta, surface=0):
+    """
+    Lift coefficient the stub reports for a case, tests compare results against it
+    """
+    return 0.1 * alpha + 0.01 * beta + 0.001 * surface
+
+
+def install(directory):
+    """
+    Writes an executable copy of the stub that runs with the current python interpreter
+
+    :param directory: directory to write the copy to
+    :return: path of the executable
+    """
+    path = os.path.join(directory, "stub_avl")
+    with open(__file__, "r") as f_in, open(path, "w") as f_out:
+        f_out.write("#!{}\n".format(sys.executable))
+        f_out.write(f_in.read())
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
+
+
+def write_st(filename, alpha, beta):
+    values = {"Alpha": alpha, "Beta": beta, "CLtot": case_cl(alpha, beta), "CLa": 5.0, "Cma": -1.0}
+    with open(filename, "w") as f:
+        f.write(" Vortex Lattice Output -- Total Forces\n\n")
+        for name in ST_NAMES:
+            f.write("  {} = {:11.6f}\n".format(name, values.get(name, 0.01)))
+
+
+def write_fs(filename, alpha, beta):
+    with open(filename, "w") as f:
+        for i, name in enumerate(SURFACES):
+            cl = case_cl(alpha, beta, i)
+            f.write("  Surface # {}     {}\n".format(i + 1, name))
+            f.write("     # Chordwise = 8   # Spanwise = 2     First strip = {}\n".format(2 * i + 1))
+            f.write("     Surface area =    0.5000     Ave. chord =    0.2500\n")
+            f.write("     CLsurf  = {:9.5f}     Clsurf  =  -0.00100\n".format(cl))
+            f.write("     CYsurf  =   0.00000     Cmsurf  =  -0.05000\n")
+            f.write("     CDsurf  =   0.01000     Cnsurf  =   0.00000\n")
+            f.write("     CDisurf =   0.00900     CDvsurf =   0.00100\n")
+            f.write("\n" * 7)
+            for j in (1, 2):
+                f.write("  {:4d}".format(j) + " {:8.4f}".format(0.1 * j) * 6 + " {:8.4f}".format(cl)
+                        + " {:8.4f}".format(cl) + " {:8.4f}".format(0.01) * 3 + " {:8.3f}\n".format(0.25))
+            f.write("\n")
+
+
+def write_fn(filename, alpha, beta):
+    with open(filename, "w") as f:
+        f.write(" Surface Forces (referred to Sref,Cref,Bref about Xref,Yref,Zref)\n\n")
+        f.write("  n      Area      CL      CD      Cm      CY      Cn      Cl     CDi     CDv\n")
+        for i, name in enumerate(SURFACES):
+            f.write("  {}  0.5000 {:8.5f}  0.0100 -0.0500  0.0000  0.0000 -0.0010  0.0090  0.0010  {}\n".format(
+                i + 1, case_cl(alpha, beta, i), name))
+        f.write("\n")
+
+
+def write_ft(filename, alpha, beta):
+    with open(filename, "w") as f:
+        f.write("  CLtot = {:11.6f}\n".format(case_cl(alpha, beta)))
+
+
+WRITERS = {"st": write_st, "FS": write_fs, "FN": write_fn, "FT": write_ft}
+
+
+def main():
+    delay = float(os.environ.get("STUB_AVL_CASE_DELAY", 0.0))
+    alpha = beta = 0.0
+    num_cases = 0
+    pending = None
+    for line in sys.stdin:
+        command = line.strip()
+        print("> " + command, flush=True)
+        if pending is not None:
+            WRITERS[pending](command, alpha, beta)
+            pending = None
+        elif command in WRITERS:
+            pending = command
+        elif command.startswith("a a "):
+            alpha = float(command.split()[2])
+        elif command.startswith("b b "):
+            beta = float(command.split()[2])
+        elif command == "x":
+            time.sleep(delay)
+            num_cases += 1
+        elif command == "h":
+            new = not os.path.exists("plot.ps")
+            with open("plot.ps", "a") as f:
+                if new:
+                    f.write("%!PS-Adobe-2.0\n")
+                if num_cases:
+                    f.write("%%Page: case alpha={} beta={}\n".format(alpha, beta))
+                else:
+                    f.write("%%Page: geometry\n")
+        elif command == "quit":
+            break
+
+
+if __name__ == "__main__":
+    main()
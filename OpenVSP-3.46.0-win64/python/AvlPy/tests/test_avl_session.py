@@ -0,0 +1,125 @@
+# Copyright (c) 2020 Uber Technologies, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+import avlpy
+import stub_avl
+
+
+@unittest.skipIf(sys.platform == "win32", "the AVL stand-in is a python script")
+class TestAvlSession(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.binPath = stub_avl.install(cls.tmp)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def commands(self, session):
+        return [line.strip()[2:] for line in list(session.stdOut) if line.startswith("> ")]
+
+    def assertCommandCount(self, count, session, command):
+        # AVL output is read on another thread, so give it time to catch up
+        deadline = time.time() + 10.0
+        while self.commands(session).count(command) < count and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(count, self.commands(session).count(command))
+
+    def test_run(self):
+        alpha, beta = [0.0, 2.0, 4.0], [0.0, 1.0]
+        with avlpy.AvlSession(avlpy.AvlInput(avlpy.AvlHeader(), []), binPath=self.binPath,
+                              collect_surface_forces=True) as session:
+            results = session.run(alpha, beta)
+            expected_alpha, expected_beta = np.array([(a, b) for a in alpha for b in beta]).T
+            npt.assert_allclose(expected_alpha, results.Alpha)
+            npt.assert_allclose(expected_beta, results.Beta)
+            npt.assert_allclose(stub_avl.case_cl(expected_alpha, expected_beta), results.CLtot)
+            npt.assert_allclose(stub_avl.case_cl(expected_alpha, expected_beta),
+                                [s.CL[0] for s in results.surfaceForces])
+            self.assertEqual(len(expected_alpha) * 4, len(results.get_strip_forces_df()))
+
+            # each case is collected once its total forces (FT) file exists, then its files are removed
+            self.assertCommandCount(len(expected_alpha), session, "FT")
+            self.assertEqual(["avlinput.txt"], os.listdir(session.wd))
+
+            npt.assert_allclose([0.4], session.run(4.0).CLtot)
+
+    def test_reload(self):
+        avlInput = avlpy.AvlInput(avlpy.AvlHeader(), [])
+        with avlpy.AvlSession(avlInput, binPath=self.binPath) as session:
+            session.run(0.0)
+            self.assertFalse(session.load(avlpy.AvlInput(avlpy.AvlHeader(), [])))
+            session.run(1.0, avlInput=avlInput)
+            self.assertCommandCount(1, session, "load avlinput.txt")
+
+            changed = avlpy.AvlInput(avlpy.AvlHeader(Mach=0.3), [])
+            npt.assert_allclose([0.2], session.run(2.0, avlInput=changed).CLtot)
+            self.assertCommandCount(2, session, "load avlinput.txt")
+            with open(os.path.join(session.wd, "avlinput.txt")) as f:
+                self.assertEqual(changed.generate(), f.read())
+
+        with avlpy.AvlSession(binPath=self.binPath) as session:
+            with self.assertRaises(ValueError):
+                session.run(0.0)
+
+    def test_timeout(self):
+        with mock.patch.dict(os.environ, {"STUB_AVL_CASE_DELAY": "2.0"}):
+            session = avlpy.AvlSession(avlpy.AvlInput(avlpy.AvlHeader(), []), binPath=self.binPath, timeout=0.2)
+        with self.assertRaises(TimeoutError):
+            session.run([0.0, 2.0, 4.0])
+
+        # the queued cases are not left running, and the session refuses further work
+        self.assertIsNotNone(session._process.poll())
+        with self.assertRaises(RuntimeError):
+            session.run(0.0)
+        session.close()
+        self.assertFalse(os.path.exists(session.wd))
+
+    def test_close(self):
+        session = avlpy.AvlSession(avlpy.AvlInput(avlpy.AvlHeader(), []), binPath=self.binPath)
+        session.run(0.0)
+        session.close()
+        self.assertEqual(0, session._process.returncode)
+        self.assertIn("quit", self.commands(session))
+        self.assertFalse(os.path.exists(session.wd))
+        with self.assertRaises(RuntimeError):
+            session.run(0.0)
+
+        with avlpy.AvlSession(binPath=self.binPath, cleanup_flag=False) as session:
+            pass
+        self.assertTrue(os.path.isdir(session.wd))
+        shutil.rmtree(session.wd)
+
+
+if __name__ == "__main__":
+    unittest.main()
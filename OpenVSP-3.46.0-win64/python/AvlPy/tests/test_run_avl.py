@@ -0,0 +1,134 @@
+# Copyright (c) 2020 Uber Technologies, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+import avlpy
+import stub_avl
+
+
+@unittest.skipIf(sys.platform == "win32", "the AVL stand-in is a python script")
+class TestRunAvl(unittest.TestCase):
+    alpha = [-4.0, -2.0, 0.0, 2.0, 4.0, 6.0, 8.0]
+    beta = [0.0, 2.0]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.binPath = stub_avl.install(cls.tmp)
+        cls.avlInput = avlpy.AvlInput(avlpy.AvlHeader(), [])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def run_avl(self, **kwargs):
+        return avlpy.runAvl(self.avlInput, self.alpha, self.beta, binPath=self.binPath, **kwargs)
+
+    def test_results(self):
+        results, _ = self.run_avl(collect_surface_forces=True)
+        alpha, beta = np.array([(a, b) for a in self.alpha for b in self.beta]).T
+        npt.assert_allclose(alpha, results.Alpha)
+        npt.assert_allclose(beta, results.Beta)
+        npt.assert_allclose(stub_avl.case_cl(alpha, beta), results.CLtot)
+        npt.assert_allclose(stub_avl.case_cl(alpha, beta, 1), [s.CL[1] for s in results.surfaceForces])
+
+        strips = results.get_strip_forces_df()
+        self.assertEqual(len(alpha) * 2 * 2, len(strips))
+        npt.assert_allclose(stub_avl.case_cl(strips["Alpha"], strips["Beta"], strips["surf_num"] - 1), strips["cl"],
+                            atol=1e-4)
+
+    def test_lean(self):
+        results, stdOut = self.run_avl()
+        commands = [line[2:] for line in stdOut.splitlines() if line.startswith("> ")]
+        self.assertIn("FS", commands)
+        for hardcopy_command in ("g", "h", "T", "lo"):
+            self.assertNotIn(hardcopy_command, commands)
+        self.assertIsNone(results.plots)
+
+        _, stdOut = self.run_avl(lean=False)
+        self.assertIn("> h", stdOut.splitlines())
+
+        with self.assertRaises(ValueError):
+            self.run_avl(savePlots=True, lean=True)
+
+    def test_without_stability_derivs(self):
+        results, stdOut = self.run_avl(collect_stability_derivs=False, collect_surface_forces=True)
+        self.assertNotIn("> st", stdOut.splitlines())
+        alpha, beta = np.array([(a, b) for a in self.alpha for b in self.beta]).T
+
+        df = results.get_results_df()
+        npt.assert_allclose(alpha, df["Alpha"])
+        npt.assert_allclose(beta, df["Beta"])
+        self.assertTrue(np.isnan(results.CLtot).all())
+
+        strips = results.get_strip_forces_df()
+        self.assertEqual(len(alpha) * 2 * 2, len(strips))
+        npt.assert_allclose(np.repeat(alpha, 4), strips["Alpha"])
+        npt.assert_allclose(np.repeat(beta, 2), results.get_surface_forces_df()["Beta"])
+
+    def test_cache(self):
+        cache = avlpy.avl_cache(os.path.join(self.tmp, "cache"))
+        results, stdOut = self.run_avl(collect_surface_forces=True, cache=cache)
+        with mock.patch("avlpy.avlInput._runAvlSharded", side_effect=AssertionError("AVL was run")):
+            cached, cached_stdOut = self.run_avl(collect_surface_forces=True, cache=cache)
+        cache.close()
+
+        self.assertIsInstance(cached, avlpy.AvlOutput)
+        self.assertEqual(stdOut, cached_stdOut)
+        self.assertEqual(results.caseConditions, cached.caseConditions)
+        self.assertTrue(results.get_results_df().equals(cached.get_results_df()))
+        self.assertTrue(results.get_strip_forces_df().equals(cached.get_strip_forces_df()))
+        self.assertTrue(results.get_surface_forces_df().equals(cached.get_surface_forces_df()))
+        self.assertEqual(results.stripForces[0].cref, cached.stripForces[0].cref)
+
+    def test_workers(self):
+        serial, _ = self.run_avl(savePlots=True, collect_surface_forces=True)
+        parallel, stdOut = self.run_avl(savePlots=True, collect_surface_forces=True, num_workers=3)
+        self.assertEqual(3, stdOut.count("> quit"))
+
+        npt.assert_array_equal(serial.Alpha, parallel.Alpha)
+        npt.assert_array_equal(serial.Beta, parallel.Beta)
+        self.assertEqual(serial.caseConditions, parallel.caseConditions)
+        self.assertTrue(serial.get_results_df().equals(parallel.get_results_df()))
+        self.assertTrue(serial.get_strip_forces_df().equals(parallel.get_strip_forces_df()))
+        self.assertEqual([s.strips[0].CLsurf for s in serial.stripForces],
+                         [s.strips[0].CLsurf for s in parallel.stripForces])
+        self.assertTrue(serial.get_surface_forces_df().equals(parallel.get_surface_forces_df()))
+
+        # one PostScript document per worker, the case pages in case order
+        self.assertEqual(1, serial.plots.count("%!PS"))
+        self.assertEqual(3, parallel.plots.count("%!PS"))
+        case_pages = [[line for line in plots.splitlines() if line.startswith("%%Page: case")]
+                      for plots in (serial.plots, parallel.plots)]
+        self.assertEqual(3 * len(serial.cases), len(case_pages[0]))
+        self.assertEqual(case_pages[0], case_pages[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -70,14 +70,26 @@ def create_charm_af_from_df(df: pd.DataFrame, charm_output_name, thickness, airf
         if req_col not in df.columns:
             raise ValueError("{} column not found".format(req_col))
 
-    # Get number of mach and angle of attacks
-    # Even though the CHARM format supports inputing cl, cd, and cm at different
-    # mach numbers and angles of attack
-
-    # Drop all rows with NaNs. Assuming that if one value is nan, there are not going
-    # to be other values in the row (e.g. if cl is nan, assuming there isn't going to be a valid cd or cm)
-    num_alpha = len(df[AF_COL_NAMES.aoa].unique())
-    num_mach = len(df[AF_COL_NAMES.mach].unique())
+    # Pivot once into dense (alpha x mach) tables. Even though the CHARM format supports inputing cl, cd, and cm at
+    # different mach numbers and angles of attack, the same set is written for all three. The first row is used for
+    # any repeated (alpha, mach) pair
+    tables = df.drop_duplicates(subset=[AF_COL_NAMES.aoa, AF_COL_NAMES.mach]).pivot(
+        index=AF_COL_NAMES.aoa, columns=AF_COL_NAMES.mach, values=[AF_COL_NAMES.cl, AF_COL_NAMES.cd, AF_COL_NAMES.cm])
+    alphas = tables.index.to_numpy(dtype=float)
+    machs = tables[AF_COL_NAMES.cl].columns.to_numpy(dtype=float)
+    num_alpha = len(alphas)
+    num_mach = len(machs)
+
+    # Format each table as one block
+    mach_line = _wrapped_format("        ", "  {: 8.3f}", num_mach).format(*machs.tolist())
+    row_format = _wrapped_format("\n{: 8.4f}", " {: 8.6f}", num_mach)
+    blocks = []
+    for col in (AF_COL_NAMES.cl, AF_COL_NAMES.cd, AF_COL_NAMES.cm):
+        values = tables[col].to_numpy(dtype=float)
+        if np.isnan(values).any():
+            raise ValueError("{} data is not rectangular in Mach and Alpha".format(col))
+        data = np.column_stack((alphas, values))
+        blocks.append(mach_line + (row_format * num_alpha).format(*data.ravel().tolist()))
 
     # Open up output file
     with open(charm_output_name, "w") as f:
@@ -91,58 +103,30 @@ def create_charm_af_from_df(df: pd.DataFrame, charm_output_name, thickness, airf
         # Write out title and dimensions
         f.write(("{:28s}  " + "{:2d}" * 6 + "\n").format(airfoil_name, num_mach, num_alpha, num_mach, num_alpha, num_mach, num_alpha))
 
-        # Write out mach numbers
-        machs = df[AF_COL_NAMES.mach].unique()
-        machs.sort()
-        f.write("        ")
-        for imach, mach in enumerate(machs):
-            f.write("  {: 8.3f}".format(mach))
-            if (imach+1) % 9 == 0 and (imach + 1) < num_mach:
-                f.write("\n        ")
-
-        # Write out alpha and cls
-        for alpha, alpha_df in df.groupby(AF_COL_NAMES.aoa):
-            f.write("\n{: 8.4f}".format(alpha))
-            for imach, mach in enumerate(machs):
-                cl = alpha_df.loc[alpha_df[AF_COL_NAMES.mach] == mach][AF_COL_NAMES.cl].unique()[0]
-                f.write(" {: 8.6f}".format(cl))
-                if (imach+1) % 9 == 0 and (imach + 1) < num_mach:
-                    f.write("\n        ")
-
-        # Write out mach
-        f.write("\n        ")
-        for imach, mach in enumerate(machs):
-            f.write("  {: 8.3f}".format(mach))
-            if (imach+1) % 9 == 0 and (imach + 1) < num_mach:
-                f.write("\n        ")
-
-        # Write out alpha and cds
-        for alpha, alpha_df in df.groupby(AF_COL_NAMES.aoa):
-            f.write("\n{: 8.4f}".format(alpha))
-            for imach, mach in enumerate(machs):
-                cd = alpha_df.loc[alpha_df[AF_COL_NAMES.mach] == mach][AF_COL_NAMES.cd].unique()
-                f.write(" {: 8.6f}".format(cd[0]))
-                if (imach+1) % 9 == 0 and (imach + 1) < num_mach:
-                    f.write("\n        ")
-
-        # Write out mach
-        f.write("\n        ")
-        for imach, mach in enumerate(machs):
-            f.write("  {: 8.3f}".format(mach))
-            if (imach+1) % 9 == 0 and (imach + 1) < num_mach:
-                f.write("\n        ")
-
-        # Write out alpha and cms
-        for alpha, alpha_df in df.groupby(AF_COL_NAMES.aoa):
-            f.write("\n{: 8.4f}".format(alpha))
-            for imach, mach in enumerate(machs):
-                cm = alpha_df.loc[alpha_df[AF_COL_NAMES.mach] == mach][AF_COL_NAMES.cm].unique()
-                f.write(" {: 8.6f}".format(cm[0]))
-                if (imach+1) % 9 == 0 and (imach + 1) < num_mach:
-                    f.write("\n        ")
+        # Write out the cl, cd and cm tables, each preceded by its mach numbers
+        f.write("\n".join(blocks))
         f.write("\n")
 
 
+def _wrapped_format(lead, value_format, num_values, per_line=9):
+    """
+    Builds a format string for one row of a CHARM airfoil table, wrapping onto continuation lines every per_line
+    values
+
+    :param lead: format of the start of the row
+    :param value_format: format of each value
+    :param num_values: number of values in the row
+    :param per_line: number of values per line
+    :return: format string
+    """
+    parts = [lead]
+    for i in range(num_values):
+        parts.append(value_format)
+        if (i + 1) % per_line == 0 and (i + 1) < num_values:
+            parts.append("\n        ")
+    return "".join(parts)
+
+
 def create_df_from_charm_af(filename):
     """
     Creates a pandas data from *.inp file
@@ -151,58 +135,40 @@ def create_df_from_charm_af(filename):
     """
     from scipy.interpolate import interp1d
 
-    def parse_machs(f, num_machs):
-        parsed_machs = np.empty(num_machs)
-        machs_read = 0
-        while machs_read < num_machs:
-            line = f.readline()
-            machs = [float(m) for m in line.split()]
-            parsed_machs[machs_read:machs_read + len(machs)] = np.array(machs)
-            machs_read += len(machs)
-
-        return parsed_machs
-
-    def parse_inner_data(f, num_rows, num_cols):
-        row_vals = np.empty(num_rows)
-        data_vals = np.empty((num_rows, num_cols))
-        for ir in range(num_rows):
-            data_read = 0
-            while data_read < num_cols:
-                line = f.readline()
-                data = [float(lift) for lift in line.split()]
-                if data_read == 0:
-                    row_vals[ir] = data[0]
-                    del data[0]
-                data_vals[ir, data_read:data_read + len(data)] = np.array(data)
-                data_read += len(data)
-
-        return row_vals, data_vals
-
     # Parse the file
     with open(filename, "r") as f:
         f.readline()
         f.readline()
         line = f.readline()
+        data = f.read()
+
+    dimensions = line[30:30 + 12]
+    nlmach = int(dimensions[0:2])
+    nlaoa = int(dimensions[2:4])
+    ndmach = int(dimensions[4:6])
+    ndaoa = int(dimensions[6:8])
+    nmmach = int(dimensions[8:10])
+    nmaoa = int(dimensions[10:12])
+
+    # Line breaks in the tables are only continuations, so all of the numeric blocks are parsed in one go and split
+    # up by their dimensions
+    num_values = sum(nm + na * (nm + 1) for nm, na in ((nlmach, nlaoa), (ndmach, ndaoa), (nmmach, nmaoa)))
+    values = np.array(data.split()[:num_values], dtype=float)
 
-        dimensions = line[30:30 + 12]
-        nlmach = int(dimensions[0:2])
-        nlaoa = int(dimensions[2:4])
-        ndmach = int(dimensions[4:6])
-        ndaoa = int(dimensions[6:8])
-        nmmach = int(dimensions[8:10])
-        nmaoa = int(dimensions[10:12])
+    def split_table(start, num_machs, num_aoas):
+        machs = values[start:start + num_machs]
+        start += num_machs
+        table = values[start:start + num_aoas * (num_machs + 1)].reshape(num_aoas, num_machs + 1)
+        return start + table.size, machs, table[:, 0], table[:, 1:]
 
-        # Parse lift values
-        lift_machs = parse_machs(f, nlmach)
-        lift_aoas, cls = parse_inner_data(f, nlaoa, nlmach)
+    # Parse lift values
+    end, lift_machs, lift_aoas, cls = split_table(0, nlmach, nlaoa)
 
-        # Parse drag numbers
-        drag_machs = parse_machs(f, ndmach)
-        drag_aoas, cds = parse_inner_data(f, ndaoa, ndmach)
+    # Parse drag numbers
+    end, drag_machs, drag_aoas, cds = split_table(end, ndmach, ndaoa)
 
-        # Parse Moment Values
-        moment_machs = parse_machs(f, nmmach)
-        moment_aoas, cms = parse_inner_data(f, nmaoa, nmmach)
+    # Parse Moment Values
+    end, moment_machs, moment_aoas, cms = split_table(end, nmmach, nmaoa)
 
     # Create data frame
     df_data = np.full((nlmach * nlaoa + ndmach * ndaoa + nmmach * nmaoa, 5), np.nan)
@@ -282,7 +248,7 @@ def create_df_from_charm_af(filename):
         df_linear_lift = df_non_stall.loc[alpha0_i - 4:alpha0_i + 4]
         y = df_linear_lift[AF_COL_NAMES.cd] - cd_min
         x = (cl_cd_min - df_linear_lift[AF_COL_NAMES.cl])**2.0
-        cdcl21, _, _, _ = np.linalg.lstsq(x[:, np.newaxis], y, rcond=None)
+        cdcl21, _, _, _ = np.linalg.lstsq(x.to_numpy()[:, np.newaxis], y, rcond=None)
 
         # get cl2cd
         cdcl2 = cdcl21[0]
@@ -35,8 +35,8 @@
 # THE SOFTWARE.
 
 import utilities.units as u
-from utilities.files import RunManager
-from utilities.transformations import TransMatrix
+from utilities.cache import MemoryCache, binary_identity, hash_key
+from utilities.transformations import TransMatrix, transform_points
 import logging
 import utilities.uberlogging as ul
 import openvsp as vsp_module
@@ -51,6 +51,7 @@ import re
 import math
 import sys
 import glob
+import tempfile
 from typing import Union
 
 # Find default fortran executables
@@ -697,7 +698,7 @@ class CharmAtmosphereData:
 
 def create_charm_blade_geom_file_from_propeller(prop_dg: dg.DegenComponent, unit_factor=u.in2ft,
                                                 bg2charm_path=DEFAULT_BG2CHARM,
-                                                nspan_override=None, nchord=1, **kwargs):
+                                                nspan_override=None, nchord=1, bg_cache=None, **kwargs):
     """
     Create charm blade geometry file (*bg file)
     :param prop_dg: degen object of propeller to create bg file from
@@ -705,6 +706,7 @@ def create_charm_blade_geom_file_from_propeller(prop_dg: dg.DegenComponent, unit
     :param bg2charm_path: path to bg2charm executable
     :param nspan_override: number of spanwise segments for the vortext lattice override
     :param nchord: number of chordwise segments for the vortex lattice panels
+    :param bg_cache: cache of bg2charm outputs, see :func:`create_charm_blade_geom_file`
     :return: string of bg file contents
     """
 
@@ -720,19 +722,12 @@ def create_charm_blade_geom_file_from_propeller(prop_dg: dg.DegenComponent, unit
     # The untransformed vsp blade has y out the radius and x going leading edge to trailing edge. Therefore, we need
     # to swap the x/z axes before running the CHARM utility
     # z is positive in the down direction
-
-    data = []  # lex ley lez tex tey tez toc
-    for i in range(leading_edge_charm.shape[1]):
-        row = [leading_edge_charm[1, i], leading_edge_charm[2, i], leading_edge_charm[0, i],
-               trailing_edge_charm[1, i], trailing_edge_charm[2, i], trailing_edge_charm[0, i],
-               thickness[i]]
-        data.append(row)
-
-    data = np.array(data)
+    swap_axes = [1, 2, 0]
 
     # Run the utility in a temporary directory
-    return create_charm_blade_geom_file(data[:, 0:3].T, data[:, 3:6].T, thickness, unit_factor=unit_factor,
-                                        bg2charm_path=bg2charm_path, nspan_override=nspan_override, nchord=nchord)
+    return create_charm_blade_geom_file(leading_edge_charm[swap_axes], trailing_edge_charm[swap_axes], thickness,
+                                        unit_factor=unit_factor, bg2charm_path=bg2charm_path,
+                                        nspan_override=nspan_override, nchord=nchord, bg_cache=bg_cache)
 
 
 def create_charm_blade_geom_file_from_wing(wing_info: CharmWingInfo, unit_factor=u.in2ft,
@@ -753,7 +748,7 @@ def create_charm_blade_geom_file_from_wing(wing_info: CharmWingInfo, unit_factor
 def create_charm_blade_geom_file(leading_edge, trailing_edge, thickness, unit_factor=u.in2ft,
                                  bg2charm_path=DEFAULT_BG2CHARM,
                                  nspan_override=None, nchord=1, flap_type=None, flap_length=None, flap_defl=None,
-                                 **kwargs):
+                                 bg_cache=None, **kwargs):
     """
     Creates a CHARM blade geometry input file
 
@@ -768,6 +763,10 @@ def create_charm_blade_geom_file(leading_edge, trailing_edge, thickness, unit_fa
     (Torenbeek), =2 split flap (Nicolai)
     :param flap_length: flap length for segment ISEG, percent chord, (0.0 - 0.5)
     :param flap_defl: flap deflection of segment ISEG in degrees (0 - 40)
+    :param bg_cache: optional cache of bg2charm outputs by blade geometry, unit factor and bg2charm executable
+        contents, so unchanged blades are not run through bg2charm again. None runs bg2charm every time, True uses a
+        cache of the most recent blades shared by the whole process, a :class:`utilities.cache.ResultCache` keeps
+        the cache between runs. Any mapping with get and item assignment can be passed
     :return: string of blade geometry file
     """
 
@@ -779,61 +778,90 @@ def create_charm_blade_geom_file(leading_edge, trailing_edge, thickness, unit_fa
     if nseg > 50:
         raise ValueError("Number of segments exceeds 50, incompatible with CHARM. Reduce tesselation.")
 
-    bg_file_contents = None
-    with RunManager() as rd:
-        np.savetxt("blade.inp", data, delimiter=' ', header=' lex ley lez tex tey tez toc', comments='*', fmt='%.10f')
+    if bg_cache is None:
+        bg_file_contents = _run_bg2charm(data, unit_factor, bg2charm_path)
+    else:
+        if bg_cache is True:
+            bg_cache = _BG_FILE_CACHE
+        cache_key = hash_key(data, unit_factor, binary_identity(bg2charm_path))
+        bg_file_contents = bg_cache.get(cache_key)
+        if bg_file_contents is None:
+            bg_file_contents = _run_bg2charm(data, unit_factor, bg2charm_path)
+            bg_cache[cache_key] = bg_file_contents
+
+    # If the nspan override is not none, modified the file contents
+    if nspan_override is not None:
+        # Warn if override is not a valid value
+        if abs(nspan_override) < 2 or abs(nspan_override) > 100 or abs(nspan_override) < nseg:
+            logger.warning("nspan override is invalid. using nspan=50")
+            nspan_override = 50
+
+        re_expr = re.compile(r"(^NCHORD\s+NSPAN\s+ICOS\s?\n\s+[0-9]+\s+)([0-9]+)\s", re.MULTILINE)
+        bg_file_contents = re.sub(re_expr, r"\g<1>{}".format(nspan_override), bg_file_contents)
+
+    # Modify nchord
+    re_expr = re.compile(r"(^NCHORD\s+NSPAN\s+ICOS\s?\n\s+)([0-9])", re.MULTILINE)
+    bg_file_contents = re.sub(re_expr, r"\g<1>{}".format(nchord), bg_file_contents)
+
+    if flap_type is not None:
+        if len(flap_type) != nseg:
+            raise ValueError(f"The flap_type list length must equal number of wing segments.  "
+                             f"len(flap_type)={len(flap_type)}, nseg={nseg}.")
+        re_expr_type = re.compile(r"((^|\s)KFLAP\(ISEG\)\n\s*)([0-9]+\*0)")
+        kflapstr = "  ".join(map(str, flap_type))
+        bg_file_contents = re.sub(re_expr_type, r"\g<1>{}".format(kflapstr), bg_file_contents)
+
+        if len(flap_length) != nseg:
+            raise ValueError(f"The flap_length list length must equal number of wing segments.  len("
+                             f"flap_length)={len(flap_length)}, nseg={nseg}.")
+        re_expr_length = re.compile(r"((^|\s)FLAPND\(ISEG\)\n\s*)([0-9]+\*0.0)")
+        flapndstr = "  ".join(map(lambda x: f"{x:0.4f}", flap_length))
+        bg_file_contents = re.sub(re_expr_length, r"\g<1>{}".format(flapndstr), bg_file_contents)
+
+        if len(flap_defl) != nseg:
+            raise ValueError(f"The flap_defl list length must equal number of wing segments.  len("
+                             f"flap_defl)={len(flap_defl)}, nseg={nseg}.")
+        re_expr_defl = re.compile(r"((^|\s)FLDEFL\(ISEG\)\n\s*)([0-9]+\*0.0)")
+        fldeflstr = "  ".join(map(lambda x: f"{x:0.4f}", flap_defl))
+        bg_file_contents = re.sub(re_expr_defl, r"\g<1>{}".format(fldeflstr), bg_file_contents)
+
+    return bg_file_contents
 
-        # build up command inputs for utility
-        cmd = "blade.inp\n"
-        cmd += "bladebg.inp\n"
-        cmd += "4\n"
-        cmd += "0\n"
-        cmd += "{:10f}\n".format(unit_factor)
 
-        p = Popen([bg2charm_path], stdout=PIPE, stdin=PIPE, stderr=STDOUT, universal_newlines=True)
-        stdout = p.communicate(input=cmd)[0]
+_BG_FILE_CACHE = MemoryCache(max_entries=64)
 
-        # Read contents into memory
-        with open("bladebg.inp", "r") as f:
-            bg_file_contents = f.read()
-
-        # If the nspan override is not none, modified the file contents
-        if nspan_override is not None:
-            # Warn if override is not a valid value
-            if abs(nspan_override) < 2 or abs(nspan_override) > 100 or abs(nspan_override) < nseg:
-                logger.warning("nspan override is invalid. using nspan=50")
-                nspan_override = 50
-
-            re_expr = re.compile(r"(^NCHORD\s+NSPAN\s+ICOS\s?\n\s+[0-9]+\s+)([0-9]+)\s", re.MULTILINE)
-            bg_file_contents = re.sub(re_expr, r"\g<1>{}".format(nspan_override), bg_file_contents)
-
-        # Modify nchord
-        re_expr = re.compile(r"(^NCHORD\s+NSPAN\s+ICOS\s?\n\s+)([0-9])", re.MULTILINE)
-        bg_file_contents = re.sub(re_expr, r"\g<1>{}".format(nchord), bg_file_contents)
-
-        if flap_type is not None:
-            if len(flap_type) != nseg:
-                raise ValueError(f"The flap_type list length must equal number of wing segments.  "
-                                 f"len(flap_type)={len(flap_type)}, nseg={nseg}.")
-            re_expr_type = re.compile(r"((^|\s)KFLAP\(ISEG\)\n\s*)([0-9]+\*0)")
-            kflapstr = "  ".join(map(str, flap_type))
-            bg_file_contents = re.sub(re_expr_type, r"\g<1>{}".format(kflapstr), bg_file_contents)
-
-            if len(flap_length) != nseg:
-                raise ValueError(f"The flap_length list length must equal number of wing segments.  len("
-                                 f"flap_length)={len(flap_length)}, nseg={nseg}.")
-            re_expr_length = re.compile(r"((^|\s)FLAPND\(ISEG\)\n\s*)([0-9]+\*0.0)")
-            flapndstr = "  ".join(map(lambda x: f"{x:0.4f}", flap_length))
-            bg_file_contents = re.sub(re_expr_length, r"\g<1>{}".format(flapndstr), bg_file_contents)
-
-            if len(flap_defl) != nseg:
-                raise ValueError(f"The flap_defl list length must equal number of wing segments.  len("
-                                 f"flap_defl)={len(flap_defl)}, nseg={nseg}.")
-            re_expr_defl = re.compile(r"((^|\s)FLDEFL\(ISEG\)\n\s*)([0-9]+\*0.0)")
-            fldeflstr = "  ".join(map(lambda x: f"{x:0.4f}", flap_defl))
-            bg_file_contents = re.sub(re_expr_defl, r"\g<1>{}".format(fldeflstr), bg_file_contents)
 
-    return bg_file_contents
+def _run_bg2charm(data, unit_factor, bg2charm_path):
+    """
+    Runs the bg2charm utility on blade stations in a temporary directory
+
+    :param data: array with a row of (lex ley lez tex tey tez toc) for each station
+    :param unit_factor: unit conversion factor to go from units in vsp to feet
+    :param bg2charm_path: path to bg2charm executable
+    :return: string of blade geometry file
+    """
+    # Format every station in a single pass, this matches np.savetxt with fmt='%.10f'
+    num_cols = data.shape[1]
+    blade_inp = "* lex ley lez tex tey tez toc\n"
+    blade_inp += ((" ".join(["%.10f"] * num_cols) + "\n") * data.shape[0]) % tuple(data.ravel())
+
+    # build up command inputs for utility
+    cmd = "blade.inp\n"
+    cmd += "bladebg.inp\n"
+    cmd += "4\n"
+    cmd += "0\n"
+    cmd += "{:10f}\n".format(unit_factor)
+
+    with tempfile.TemporaryDirectory() as run_dir:
+        with open(os.path.join(run_dir, "blade.inp"), "w") as f:
+            f.write(blade_inp)
+
+        p = Popen([bg2charm_path], stdout=PIPE, stdin=PIPE, stderr=STDOUT, universal_newlines=True, cwd=run_dir)
+        p.communicate(input=cmd)
+
+        # Read contents into memory
+        with open(os.path.join(run_dir, "bladebg.inp"), "r") as f:
+            return f.read()
 
 
 def create_single_wing_info(wing_dg: dg.DegenComponent, settings: CharmRotorSettingsCollection):
@@ -890,14 +918,19 @@ def create_single_wing_info(wing_dg: dg.DegenComponent, settings: CharmRotorSett
             tocs.append(np.array(wing.sticks[0].toc))
             u_vals.append(np.array(wing.sticks[0].u))
 
-    wing_infos = []
+    t_vsp2charm_blade = TransMatrix()
+    t_vsp2charm_blade.mat[0, 0:3] = np.array([0.0, 1.0, 0.0])
+    t_vsp2charm_blade.mat[1, 0:3] = np.array([1.0, 0.0, 0.0])
+    t_vsp2charm_blade.mat[2, 0:3] = np.array([0.0, 0.0, -1.0])
+
+    t_vsp2origins = []
+    charm_mats = []
+    spans = []
     for i in range(len(leading_edges)):
-        le_vsp = leading_edges[i]
-        te_vsp = trailing_edges[i]
-        toc = tocs[i]
         inverse_vsp_tmat = transmats[i].get_inverse_transform()
 
-        le_vsp_untrans = inverse_vsp_tmat.apply_transformation(le_vsp.T)
+        # Only the root and tip leading edge points are needed from the untransformed wing
+        le_vsp_untrans = inverse_vsp_tmat.apply_transformation(leading_edges[i][[0, -1]].T)
 
         # Check to see if the root le the origin, if not transform it to be so
         t_vsp2origin = TransMatrix(inverse_vsp_tmat.mat)
@@ -906,16 +939,22 @@ def create_single_wing_info(wing_dg: dg.DegenComponent, settings: CharmRotorSett
             wing_origin2vsp_origin.set_translations(-1.0*le_vsp_untrans[:, 0])
             t_vsp2origin.mat = np.dot(wing_origin2vsp_origin.mat, t_vsp2origin.mat)
 
-        t_vsp2charm_blade = TransMatrix()
-        t_vsp2charm_blade.mat[0, 0:3] = np.array([0.0, 1.0, 0.0])
-        t_vsp2charm_blade.mat[1, 0:3] = np.array([1.0, 0.0, 0.0])
-        t_vsp2charm_blade.mat[2, 0:3] = np.array([0.0, 0.0, -1.0])
+        t_vsp2origins.append(t_vsp2origin)
+        charm_mats.append(np.dot(t_vsp2charm_blade.mat, t_vsp2origin.mat))
+        spans.append(abs(le_vsp_untrans[1, 0] - le_vsp_untrans[1, -1]))
 
-        le_charm = t_vsp2charm_blade.apply_transformation(t_vsp2origin.apply_transformation(le_vsp.T))
-        te_charm = t_vsp2charm_blade.apply_transformation(t_vsp2origin.apply_transformation(te_vsp.T))
-        vsp_origin = le_vsp.T[:, 0]
+    # Transform the leading and trailing edges of every wing copy at once
+    charm_edges = _transform_point_sets(charm_mats + charm_mats,
+                                        [le.T for le in leading_edges] + [te.T for te in trailing_edges])
 
-        span = abs(le_vsp_untrans[1, 0] - le_vsp_untrans[1, -1])
+    wing_infos = []
+    for i in range(len(leading_edges)):
+        toc = tocs[i]
+        t_vsp2origin = t_vsp2origins[i]
+        le_charm = charm_edges[i]
+        te_charm = charm_edges[len(leading_edges) + i]
+        vsp_origin = leading_edges[i][0, :]
+        span = spans[i]
 
         # Get airfoils
         airfoils = []
@@ -980,9 +1019,6 @@ def remove_le_te_transformations(degen_blade: dg.DegenGeom, vsp_instance=None):
     leading_edge_original = np.array(degen_blade.sticks[0].le)
     trailing_edge_original = np.array(degen_blade.sticks[0].te)
 
-    leading_edge_charm = transform_inverse.apply_transformation(leading_edge_original.T)
-    trailing_edge_charm = transform_inverse.apply_transformation(trailing_edge_original.T)
-
     rotation_deg = vsp.GetParmVal(degen_blade.geom_id, "Rotate", "Design")
     reverse_flag = vsp.GetParmVal(degen_blade.geom_id, "ReverseFlag", "Design")
     axis = np.array([-1.0, 0.0, 0.0])
@@ -998,10 +1034,12 @@ def remove_le_te_transformations(degen_blade: dg.DegenGeom, vsp_instance=None):
         rot_mat.mat = np.dot(ynegy.mat, rot_mat.mat)
         rot_mat.mat = np.dot(rotx.mat, rot_mat.mat)
 
-    leading_edge_charm = rot_mat.apply_transformation(leading_edge_charm)
-    trailing_edge_charm = rot_mat.apply_transformation(trailing_edge_charm)
+    # Apply the inverse and rotation transformations to both edges in a single operation
+    rot_mat.mat = np.dot(rot_mat.mat, transform_inverse.mat)
+    edges_charm = rot_mat.apply_transformation(np.concatenate((leading_edge_original, trailing_edge_original)).T)
+    num_stations = leading_edge_original.shape[0]
 
-    return leading_edge_charm, trailing_edge_charm
+    return edges_charm[:, :num_stations], edges_charm[:, num_stations:]
 
 
 def create_rigid_blade_dynamics_file(radius, unit_factor=u.in2ft, iaero=1, irvflo=0, isv66=False, isrotor=True,
@@ -2179,6 +2217,20 @@ def _determine_num_symm(trans_orig: TransMatrix, trans_copy: TransMatrix):
     return num_syms
 
 
+def _transform_point_sets(mats, point_sets):
+    """
+    Applies a transformation matrix to each of several sets of points in one operation
+    :param mats: list of 4x4 transformation matrices, one for each point set
+    :param point_sets: list of point arrays, each point is a column
+    :return: list of transformed point arrays
+    """
+    counts = [points.shape[1] for points in point_sets]
+    points = np.concatenate(point_sets, axis=1)
+    point_mats = np.asarray(mats)[np.repeat(np.arange(len(point_sets)), counts)]
+    transformed = transform_points(point_mats, points.T).T
+    return np.split(transformed, np.cumsum(counts)[:-1], axis=1)
+
+
 def _connect_arrays(arr1, arr2):
     """
     Checks if two arrays could be connected
@@ -39,7 +39,8 @@ import os
 from charm.input_automation import read_run_characteristics_template
 import math
 import re
-import io
+import json
+import warnings
 import numpy as np
 import utilities.units as u
 import matplotlib.pyplot as plt
@@ -199,14 +200,36 @@ class CharmScanGridFrame:
         ax.set_aspect('equal', adjustable='box')
 
 
+SCAN_GRID_NUM_COLS = 8
+"""
+Number of values written for each scan grid point: x, y, z, u, v, w, cp, cp_prime
+"""
+
+
 class CharmScanGridResults:
     """
     Holds all scan grid results frames
     """
 
-    def __init__(self, num_psi, num_grids, grids):
+    def __init__(self, num_psi, num_grids, grids=None, data=None, dims=None, num_rotors=None,
+                 freestream_velocity=None, loader=None):
         """
         Initializes scan grid results object
+
+        Either a list of frames or a data array can be given. When a data array is given, the frames are created on
+        first access as views into it.
+
+        :param num_psi: number of azimuthal points in the solution
+        :param num_grids: number of grids
+        :param grids: list of list of :class:`CharmScanGridFrame` objects (optional)
+        :param data: num_psi x (num_rotors + sum(dim1*dim2*8)) array holding each azimuth's rotor azimuths followed by
+            the values of every grid point, in file order (optional)
+        :param dims: num_grids x 2 array of grid dimensions, required with data
+        :param num_rotors: number of rotors, required with data
+        :param freestream_velocity: freestream to add to the velocities in data when frames are created. None if it
+            has already been added to data
+        :param loader: function called with an azimuth index to fill that row of data before it is first used, for
+            lazily read files (optional)
         """
 
         self.num_psi = num_psi
@@ -219,6 +242,18 @@ class CharmScanGridResults:
         Number of grids this solution contains
         """
 
+        self._data = data
+        self._dims = None if dims is None else np.asarray(dims, dtype=int).reshape(-1, 2)
+        self._num_rotors = num_rotors
+        self._freestream = None if freestream_velocity is None else np.asarray(freestream_velocity, dtype=float)
+        self._loader = loader
+        self._loaded = np.zeros(num_psi, dtype=bool) if loader is not None else np.ones(num_psi, dtype=bool)
+        self._average_grids = None
+        if data is not None:
+            sizes = self._dims[:, 0] * self._dims[:, 1] * SCAN_GRID_NUM_COLS
+            self._offsets = num_rotors + np.concatenate(([0], np.cumsum(sizes)))
+            grids = _ScanGridAzimuths(self)
+
         self.grids = grids
         """
         List of list of :class:`CharmScanGridFrame` objects.
@@ -228,41 +263,116 @@ class CharmScanGridResults:
         example: grids[iazimuth][igrid]
         """
 
-        average_grids = []
-        for igrid in range(num_grids):
-            shape = grids[0][igrid].x.shape
-            x = np.zeros(shape)
-            y = np.zeros(shape)
-            z = np.zeros(shape)
-            u = np.zeros(shape)
-            v = np.zeros(shape)
-            w = np.zeros(shape)
-            cp = np.zeros(shape)
-            cp_prime = np.zeros(shape)
-            for ipsi in range(num_psi):
-                x += grids[ipsi][igrid].x
-                y += grids[ipsi][igrid].y
-                z += grids[ipsi][igrid].z
-                u += grids[ipsi][igrid].u
-                v += grids[ipsi][igrid].v
-                w += grids[ipsi][igrid].w
-                cp += grids[ipsi][igrid].cp
-                cp_prime += grids[ipsi][igrid].cp_prime
-            x /= num_psi
-            y /= num_psi
-            z /= num_psi
-            u /= num_psi
-            v /= num_psi
-            w /= num_psi
-            cp /= num_psi
-            cp_prime /= num_psi
-            average_grids.append(CharmScanGridFrame(x, y, z, u, v, w, cp, cp_prime, [0]))
-
-        self.average_grids = average_grids
+    @property
+    def average_grids(self):
         """
         List of single :class:`CharmScanGridFrame` per grid where the data has been averaged over all of the
         azimuths.
         """
+        if self._average_grids is not None:
+            return self._average_grids
+
+        if self._data is not None:
+            mean = self._azimuth_rows(slice(None)).mean(axis=0)
+            self._average_grids = [self._create_frame(mean, igrid, [0]) for igrid in range(self.num_grids)]
+            return self._average_grids
+
+        average_grids = []
+        for igrid in range(self.num_grids):
+            fields = np.mean([[g.x, g.y, g.z, g.u, g.v, g.w, g.cp, g.cp_prime]
+                              for g in (self.grids[ipsi][igrid] for ipsi in range(self.num_psi))], axis=0)
+            average_grids.append(CharmScanGridFrame(*fields, [0]))
+        self._average_grids = average_grids
+        return self._average_grids
+
+    @property
+    def data(self):
+        """
+        (num_psi, num_grids, dim1, dim2, 8) view of all scan grid values. Only available when every grid has the same
+        dimensions, otherwise use :meth:`grid_data`. A copy is returned when the freestream still has to be added to
+        the velocities, as for memory mapped results
+        """
+        if self._data is None:
+            raise ValueError("Scan grid results were not created from a data array")
+        if not (self._dims == self._dims[0]).all():
+            raise ValueError("Scan grids have different dimensions, use grid_data(igrid)")
+        dim1, dim2 = self._dims[0]
+        rows = self._azimuth_rows(slice(None))
+        return self._add_freestream(rows[:, self._num_rotors:].reshape(self.num_psi, self.num_grids, dim1, dim2,
+                                                                        SCAN_GRID_NUM_COLS))
+
+    @property
+    def psis(self):
+        """
+        num_psi x num_rotors array of rotor azimuths
+        """
+        return self._azimuth_rows(slice(None))[:, :self._num_rotors]
+
+    def grid_data(self, igrid):
+        """
+        :param igrid: grid index
+        :return: (num_psi, dim1, dim2, 8) view of a single grid's values, or a copy when the freestream still has to
+            be added to the velocities
+        """
+        dim1, dim2 = self._dims[igrid]
+        rows = self._azimuth_rows(slice(None))
+        return self._add_freestream(rows[:, self._offsets[igrid]:self._offsets[igrid + 1]].reshape(
+            self.num_psi, dim1, dim2, SCAN_GRID_NUM_COLS))
+
+    def _azimuth_rows(self, index):
+        """
+        Returns rows of the data array, reading any that have not been loaded yet
+        """
+        ipsis = np.atleast_1d(np.arange(self.num_psi)[index])
+        for ipsi in ipsis[~self._loaded[ipsis]]:
+            self._loader(ipsi)
+            self._loaded[ipsi] = True
+        return self._data[index]
+
+    def _create_frame(self, row, igrid, psis):
+        dim1, dim2 = self._dims[igrid]
+        g = self._add_freestream(row[self._offsets[igrid]:self._offsets[igrid + 1]].reshape(dim1, dim2,
+                                                                                            SCAN_GRID_NUM_COLS))
+        return CharmScanGridFrame(g[:, :, 0], g[:, :, 1], g[:, :, 2], g[:, :, 3], g[:, :, 4], g[:, :, 5], g[:, :, 6],
+                                  g[:, :, 7], psis)
+
+    def _add_freestream(self, values):
+        """
+        Adds the freestream to the velocities of an array of scan grid values, if it has not been added to the data
+        already. The last axis of values holds the 8 scan grid columns
+        """
+        if self._freestream is None:
+            return values
+        values = np.array(values)
+        values[..., 3:6] += self._freestream
+        return values
+
+
+class _ScanGridAzimuths:
+    """
+    Sequence of the frames at each azimuth, created on first access
+    """
+
+    def __init__(self, results: CharmScanGridResults):
+        self._results = results
+        self._frames = [None] * results.num_psi
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __getitem__(self, ipsi):
+        if isinstance(ipsi, slice):
+            return [self[i] for i in range(*ipsi.indices(len(self)))]
+        if self._frames[ipsi] is None:
+            res = self._results
+            row = res._azimuth_rows(ipsi)
+            psis = row[:res._num_rotors]
+            self._frames[ipsi] = [res._create_frame(row, igrid, psis) for igrid in range(res.num_grids)]
+        return self._frames[ipsi]
+
+    def __iter__(self):
+        for ipsi in range(len(self)):
+            yield self[ipsi]
 
 
 class RotorFrameResults:
@@ -312,11 +422,12 @@ class CharmPerfData:
     Class that contains data from the [name]perf.dat file of a CHARM run
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename, blocks=None):
         """
         Initializes a :class:`CharmPerfData` object from a [name]perf.dat file
 
         :param filename: full name of the [name]perf.dat file to read from
+        :param blocks: byte offsets of the rotor blocks from :func:`_index_perf_file`, found if None
         """
 
         self.row_data = pd.DataFrame()
@@ -333,7 +444,7 @@ class CharmPerfData:
         Additional columns of ``rotor`` and ``revolution``
         """
 
-        self._parse_perf_file(filename=filename)
+        self._parse_perf_file(filename=filename, blocks=blocks)
 
     def line_plot(self, rotors, revolutions, variable, psis=None, ax=None, npsi=None, scaling=1.0):
         """
@@ -453,76 +564,53 @@ class CharmPerfData:
         cbar.ax.set_ylabel(variable)
         return ax, cbar
 
-    def _parse_perf_file(self, filename):
+    def _parse_perf_file(self, filename, blocks=None):
         """
         Parses a [name]perf.dat file from a CHARM run
 
+        Each rotor block is located from the byte offset index and its radial data is read with one bulk numeric
+        read.
+
         :param filename: fullname of the [name]perf.dat file to parse
+        :param blocks: byte offsets of the rotor blocks from :func:`_index_perf_file`, found if None
         :return:
         """
+        with open(filename, "rb") as f:
+            text = f.read().decode("latin-1")
+        if blocks is None:
+            blocks = _index_perf_file(text=text)
+
+        # Read in the number of rotors, and atmosphere properties
+        num_rotors = int(text.split("\n", 2)[1].split()[0])
 
-        # Open up the file
-        rows = []
+        meta_data_variablenames = []
+        meta_data_rows = []
+        variable_names = []
+        row_blocks = []
         rotor_num = []
         revolution_num = []
-        variable_names = []
-        meta_data_rows = []
-        meta_data_variablenames = []
         psi_ind = []
-        with open(filename, "r") as f:
-            # Read in the number of rotors, and atmosphere properties
-            line = f.readline()  # variable names
-            line = f.readline()  # variable values
-            data = line.split()
-            num_rotors = int(data[0])
-            # rho = float(data[1])  # Unused at this time, JRW 3/24/2022
-            # speed_of_sound = float(data[2])  # Unused at this time, JRW 3/24/2022
-
-            revolution = 0
-
-            # arrays for blade level properties
-            line = f.readline()  # variable names line
-            while line:
-                revolution += 1
-                meta_data_variablenames = ['revolution'] + line.split()
-                meta_data_variablenames[1] = 'rotor'
-                for irotor in range(num_rotors):
-                    line = f.readline()  # variable values line
-                    reader = ff.FortranRecordReader("(I9, 2I5, F11.2, F10.2, E10.4, F12.4, F12.3, 2E11.3)")
-                    data = reader.read(line)
-                    charm_rotor_num = int(data[0])
-                    num_psi = int(data[1])
-                    num_radial_locs = int(data[2])
-
-                    meta_data_row = [revolution, charm_rotor_num, num_psi, num_radial_locs] + list(map(float, data[3:]))
-                    meta_data_rows.append(meta_data_row)
-                    # Read in radial data
-                    line = f.readline()  # variable names
-                    variable_names = line.split()
-                    skip = False
-                    for ipsi in range(num_psi):
-                        if skip:
-                            break
-                        for iradial in range(num_radial_locs):
-                            cur_pos = f.tell()
-                            line = f.readline()  # variable values
-                            try:
-                                row_data = [float(d) for d in line.split()]
-                            except Exception:
-                                f.seek(cur_pos)
-                                skip = True
-
-                            if skip:
-                                break
-                            rotor_num.append(charm_rotor_num)
-                            revolution_num.append(revolution)
-                            psi_ind.append(ipsi)
-                            rows.append(row_data)
-                    line = f.readline()
+        for iblock, (start, end) in enumerate(blocks):
+            revolution = iblock // num_rotors + 1
+            names_line, meta_line, variable_line, data = text[start:end].split("\n", 3)
+            meta_data_variablenames = ['revolution'] + names_line.split()
+            meta_data_variablenames[1] = 'rotor'
+            charm_rotor_num, num_psi, num_radial_locs, meta_values = _parse_perf_meta_line(meta_line)
+            meta_data_rows.append([revolution, charm_rotor_num, num_psi, num_radial_locs] + meta_values)
+
+            # Read in radial data
+            variable_names = variable_line.split()
+            rows = _parse_perf_rows(data, num_psi * num_radial_locs, len(variable_names))
+            row_blocks.append(rows)
+            rotor_num.append(np.full(rows.shape[0], charm_rotor_num))
+            revolution_num.append(np.full(rows.shape[0], revolution))
+            psi_ind.append(np.arange(rows.shape[0]) // num_radial_locs)
 
         # Create a pandas data frame dictionary
-        df_dict = {'rotor': rotor_num, 'revolution': revolution_num, 'psi_ind': psi_ind}
-        rows = np.array(rows)
+        df_dict = {'rotor': np.concatenate(rotor_num) if rotor_num else [],
+                   'revolution': np.concatenate(revolution_num) if revolution_num else [],
+                   'psi_ind': np.concatenate(psi_ind) if psi_ind else []}
+        rows = np.concatenate(row_blocks) if row_blocks else np.empty((0, len(variable_names)))
         for ivar, var_name in enumerate(variable_names):
             df_dict[var_name] = rows[:, ivar]
 
@@ -798,172 +886,401 @@ class CharmResults:
         if v_inf > 0.0:
             self.alpha = math.atan2(aircraft_velocity[2], aircraft_velocity[0]) * u.rad2deg
 
-        cq_data = pd.DataFrame()
-        df_list = []
-        for ir, res in enumerate(rotor_results):
-            df_new = pd.DataFrame(vars(res.cq_data))
-            df_new['rotor'] = ir+1
-            df_new['rev'] = range(len(res.cq_data.a1s))
-            df_list.append(df_new)
-
-        cq_data = pd.concat(df_list, ignore_index=True)
-        cq_data = cq_data.pivot(index='rev', columns='rotor')
+        cq_data = _cq_data_frame([res.cq_data for res in rotor_results])
 
         self.cq_data = cq_data
         """
         :class:`pd.DataFrame` object, which contains the data from the cq.dat file for all rotors in a single dataframe
         """
 
+    _LAZY_ATTRIBUTES = ("rotor_results", "log_file", "scan_grid", "perf_data", "cq_data")
+
+    @classmethod
+    def from_run(cls, charm_dir, case_name, ignore_perfdat_errors=True, scan_grid_mode="memory"):
+        """
+        Opens a charm run without parsing its outputs.
+
+        Only the run characteristics file is read up front. ``rotor_results``, ``log_file``, ``scan_grid``,
+        ``perf_data`` and ``cq_data`` are each parsed from their own output files on first access, using byte offset
+        indexes of the log and perf files that are cached in the run directory by :class:`CharmRunIndex`.
+
+        :param charm_dir: directory where charm was run
+        :param case_name: name of the charm case
+        :param ignore_perfdat_errors: if True, exceptions raised while parsing [name]perf.dat file will be ignored
+        :param scan_grid_mode: how scan grid values are held, see :func:`parse_scan_grid_output`
+        :return: :class:`CharmResults` object
+        """
+        results = cls.__new__(cls)
+        results._run = _CharmRun(charm_dir, case_name, ignore_perfdat_errors, scan_grid_mode)
+        results.aircraft_velocity = results._run.aircraft_velocity
+        results.alpha = 0.0
+        if np.linalg.norm(results.aircraft_velocity) > 0.0:
+            results.alpha = math.atan2(results.aircraft_velocity[2], results.aircraft_velocity[0]) * u.rad2deg
+        return results
+
+    def __getattr__(self, name):
+        # Only called for attributes that have not been set yet, which are parsed on first access for results
+        # opened with from_run
+        run = self.__dict__.get("_run")
+        if run is None or name not in self._LAZY_ATTRIBUTES:
+            raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+        value = getattr(run, name)
+        setattr(self, name, value)
+        return value
 
-def parse_charm_run(charm_dir, case_name, ignore_perfdat_errors=True):
+    def rotor_performance(self, irotor, revolution=-1):
+        """
+        Parses the integrated performance of a single rotor and revolution from the log file, without parsing the
+        rest of the log. Only available for results opened with :meth:`from_run` or :func:`parse_charm_run`.
+
+        :param irotor: rotor index
+        :param revolution: revolution index in the log file, negative values count from the end
+        :return: :class:`RotorTuple` of integrated quantities
+        """
+        if "_run" not in self.__dict__:
+            raise ValueError("Results were not opened from a run directory")
+        return self._run.rotor_performance(irotor, revolution)
+
+
+def parse_charm_run(charm_dir, case_name, ignore_perfdat_errors=True, scan_grid_mode="memory", lazy=False):
     """
     Parses a charm run
 
     :param charm_dir: directory where charm was run
     :param case_name: name of the charm case
     :param ignore_perfdat_errors: if True, exceptions raised while parsing [name]perf.dat file will be ignored
+    :param scan_grid_mode: how scan grid values are held, see :func:`parse_scan_grid_output`
+    :param lazy: if True, each output file is parsed on first access, see :meth:`CharmResults.from_run`
     :return: :class:`CharmResults` object
     """
-    cwd = os.getcwd()
-    try:
-        os.chdir(charm_dir)
+    results = CharmResults.from_run(charm_dir, case_name, ignore_perfdat_errors=ignore_perfdat_errors,
+                                    scan_grid_mode=scan_grid_mode)
+    if not lazy:
+        for name in CharmResults._LAZY_ATTRIBUTES:
+            getattr(results, name)
+    return results
+
+
+class CharmRunIndex:
+    """
+    Byte offsets of the sections of a charm run's log and perf files.
+
+    Each file is indexed in a single pass the first time it is needed. The index is cached as
+    [case_name].charm_index.json in the run directory and reused while the size and modification time of the indexed
+    files are unchanged, so re-opening a completed run does not scan its outputs again.
+    """
+    VERSION = 1
+
+    def __init__(self, charm_dir, case_name):
+        """
+
+        :param charm_dir: directory where charm was run
+        :param case_name: name of the charm case
+        """
+        self.charm_dir = os.path.abspath(charm_dir)
+        self.case_name = case_name
+        self.index_file = os.path.join(self.charm_dir, case_name + ".charm_index.json")
+        self._index = {}
+        try:
+            with open(self.index_file, "r") as f:
+                index = json.load(f)
+            if index.get("version") == self.VERSION:
+                self._index = index
+        except (OSError, ValueError):
+            pass
+
+    @property
+    def log_sections(self):
+        """
+        [rotor number, start, end] byte offsets of each integrated performance section of the log file
+        """
+        return self._sections(".log", _index_log_file)
+
+    @property
+    def perf_blocks(self):
+        """
+        [start, end] byte offsets of each rotor block of the perf file
+        """
+        return self._sections("perf.dat", _index_perf_file)
+
+    def _sections(self, suffix, indexer):
+        filename = os.path.join(self.charm_dir, self.case_name + suffix)
+        stat = os.stat(filename)
+        key = [stat.st_size, stat.st_mtime]
+        entry = self._index.get(suffix)
+        if entry is None or entry["stat"] != key:
+            entry = {"stat": key, "sections": indexer(filename)}
+            self._index[suffix] = entry
+            self._save()
+        return entry["sections"]
+
+    def _save(self):
+        self._index["version"] = self.VERSION
+        tmp_file = self.index_file + ".tmp{}".format(os.getpid())
+        try:
+            with open(tmp_file, "w") as f:
+                json.dump(self._index, f)
+            os.replace(tmp_file, self.index_file)
+        except OSError:
+            # the index is only a cache, a read-only run directory is indexed again next time
+            pass
+
+
+class _CharmRun:
+    """
+    Parses the outputs of a charm run on demand for :meth:`CharmResults.from_run`
+    """
+
+    def __init__(self, charm_dir, case_name, ignore_perfdat_errors, scan_grid_mode):
+        self.charm_dir = os.path.abspath(charm_dir)
+        self.case_name = case_name
+        self.ignore_perfdat_errors = ignore_perfdat_errors
+        self.scan_grid_mode = scan_grid_mode
+        self.index = CharmRunIndex(self.charm_dir, case_name)
 
         # Parse the run characteristics file
-        run_char_params = read_run_characteristics_template(template_filename=case_name + ".inp")
+        self.run_char_params = read_run_characteristics_template(template_filename=self.filename(".inp"))
+        self.num_rotors = abs(self.run_char_params['NROTOR'])
+        self.aircraft_velocity = np.array([self.run_char_params['U'], self.run_char_params['V'],
+                                           self.run_char_params['W']])
 
-        num_rotors = abs(run_char_params['NROTOR'])
+    def filename(self, suffix):
+        return os.path.join(self.charm_dir, self.case_name + suffix)
 
-        # Parse the shaft frame values
-        shaft_frames = _parse_shaft_frame_forces(case_name+"hub.dat")
+    @property
+    def log_file(self):
+        with open(self.filename(".log")) as f:
+            return f.read()
 
-        # If there are not the same number of shaft frame results as num_rotors,
-        # append None to the list
-        if len(shaft_frames) < num_rotors:
-            shaft_frames += [None]*(num_rotors-len(shaft_frames))
+    @property
+    def perf_data(self):
+        try:
+            return CharmPerfData(filename=self.filename("perf.dat"), blocks=self.index.perf_blocks)
+        except Exception as e:
+            if not self.ignore_perfdat_errors:
+                raise e
+        return None
 
-        # Parse perf file
-        perf_data = None
-        omegas = np.ones(num_rotors)*np.nan
+    @property
+    def omegas(self):
+        """
+        Rotational rate of each rotor in the last revolution of the perf file, read from the block metadata only
+        """
+        omegas = np.ones(self.num_rotors)*np.nan
         try:
-            perf_data = CharmPerfData(filename=case_name+"perf.dat")
-            omegas = perf_data.rotor_metadata.pivot("rotor", "revolution", "OMEGA").values[:, -1]
+            blocks = self.index.perf_blocks
+            with open(self.filename("perf.dat"), "rb") as f:
+                for start, end in blocks[-self.num_rotors:]:
+                    f.seek(start)
+                    meta_line = f.read(end - start).decode("latin-1").split("\n", 2)[1]
+                    rotor, _, _, meta_values = _parse_perf_meta_line(meta_line)
+                    if 1 <= rotor <= self.num_rotors:
+                        omegas[rotor - 1] = meta_values[1]
         except Exception as e:
-            if not ignore_perfdat_errors:
+            if not self.ignore_perfdat_errors:
                 raise e
+        return omegas
 
+    @property
+    def cq_results(self):
         # parse convergence history file
-        cq_results = __parse_cq_file(case_name + "cq.dat", num_rotors=num_rotors)
+        return _parse_cq_file(self.filename("cq.dat"), num_rotors=self.num_rotors)
 
-        # read log
-        log_contents = []
-        with open(case_name + ".log") as f:
-            log_contents = f.read()
+    @property
+    def cq_data(self):
+        return _cq_data_frame(self.cq_results)
 
-        rotor_log_results = _parse_log_file(case_name + ".log")
+    @property
+    def rotor_results(self):
+        # Parse the shaft frame values
+        shaft_frames = _parse_shaft_frame_forces(self.filename("hub.dat"))
+
+        # If there are not the same number of shaft frame results as num_rotors,
+        # append None to the list
+        if len(shaft_frames) < self.num_rotors:
+            shaft_frames += [None]*(self.num_rotors-len(shaft_frames))
+
+        omegas = self.omegas
+        cq_results = self.cq_results
+        rotor_log_results = _parse_log_file(self.filename(".log"), sections=self.index.log_sections)
+        rotor_log_results += [[] for _ in range(self.num_rotors - len(rotor_log_results))]
 
         rotor_results = []
-        for i in range(num_rotors):
+        for i in range(self.num_rotors):
             rotor_results.append(CharmRotorResults(aircraft_frame=None, rotor_frame=None,
                                                    shaft_frame=shaft_frames[i], omega=omegas[i],
                                                    rotor_log_results=rotor_log_results[i],
                                                    cq_data=cq_results[i]))
+        return rotor_results
 
+    @property
+    def scan_grid(self):
         # Read scan grid
-        scan_grid = None
-        aircraft_velocity = np.array([run_char_params['U'], run_char_params['V'], run_char_params['W']])
-        freestream = -1.0*aircraft_velocity
+        freestream = -1.0*self.aircraft_velocity
         try:
-            scan_grid = parse_scan_grid_output(case_name + ".off", freestream_velocity=freestream,
-                                               num_rotors=num_rotors)
+            return parse_scan_grid_output(self.filename(".off"), freestream_velocity=freestream,
+                                          num_rotors=self.num_rotors, mode=self.scan_grid_mode)
         except FileNotFoundError:
-            pass
+            return None
 
-        results = CharmResults(rotor_results=rotor_results, log_file=log_contents, scan_grid=scan_grid,
-                               aircraft_velocity=aircraft_velocity, perf_data=perf_data)
-        return results
-    finally:
-        os.chdir(cwd)
+    def rotor_performance(self, irotor, revolution=-1):
+        sections = self.index.log_sections
+        rotor_ids = sorted(set(rotor for rotor, _, _ in sections))
+        rotor_sections = [(start, end) for rotor, start, end in sections if rotor == rotor_ids[irotor]]
+        start, end = rotor_sections[revolution]
+        with open(self.filename(".log"), "rb") as f:
+            f.seek(start)
+            return _parse_log_section(f.read(end - start).decode("latin-1"))
+
+
+def _cq_data_frame(cq_results):
+    """
+    Combines the cq.dat data of all rotors into a single data frame
+
+    :param cq_results: list of :class:`CharmCQData`, one per rotor
+    :return: data frame with one row per revolution and a (variable, rotor) column for each rotor's data
+    """
+    df_list = []
+    for ir, cq in enumerate(cq_results):
+        df_new = pd.DataFrame(vars(cq))
+        df_new['rotor'] = ir+1
+        df_new['rev'] = range(len(cq.a1s))
+        df_list.append(df_new)
+
+    cq_data = pd.concat(df_list, ignore_index=True)
+    return cq_data.pivot(index='rev', columns='rotor')
 
 
-def parse_scan_grid_output(filename, freestream_velocity, num_rotors):
+def parse_scan_grid_output(filename, freestream_velocity, num_rotors, mode="memory"):
     """
     Parses a scan grid output file
+
+    The file is read in one block per azimuth into a single array, and the scan grid frames are views into that
+    array. mode selects how the values are held:
+
+    * "memory": the whole file is read up front
+    * "mmap": the values are cached in a binary [filename].npy file beside the output, which is memory mapped and
+      reused while it is newer than the output file. Velocities are stored without the freestream, which is added
+      when the values are accessed
+    * "lazy": each azimuth is read from the output file the first time it is accessed
+
     :param filename: name of the scan grid output file
     :param freestream_velocity: freestream that is added to the scan grid velocities
     :param num_rotors: number of rotors in the scan grid output
+    :param mode: "memory", "mmap" or "lazy"
     :return: scan grid results object
     """
-    with open(filename, "r") as f:
+    if mode not in ("memory", "mmap", "lazy"):
+        raise ValueError("Unknown scan grid parsing mode: {}".format(mode))
+
+    with open(filename, "rb") as f:
         line = f.readline()
         num_grids = int(line.split()[0])
-        dim1s = np.empty(num_grids, dtype=int)
-        dim2s = np.empty(num_grids, dtype=int)
-
-        dim1_remaining = num_grids
-        dim2_remaining = num_grids
 
-        while dim1_remaining > 0 or dim2_remaining > 0:
+        # grid dimensions, all dim1s followed by all dim2s, possibly spread over several lines
+        dims = []
+        while len(dims) < 2 * num_grids:
             line = f.readline()
-            dims = np.array([int(d) for d in line.split()])
-            dims_available = len(dims)
-            current_dim_start = 0
-
-            if dim1_remaining > 0:
-                dim1_start_ind = num_grids-dim1_remaining
-                dim1_end_ind = dim1_start_ind + dim1_remaining if dims_available >= dim1_remaining else dim1_start_ind + dims_available  # noqa
-                dim1s[dim1_start_ind:dim1_end_ind] = dims[current_dim_start:(dim1_end_ind-dim1_start_ind)]
-                dim1_remaining -= (dim1_end_ind-dim1_start_ind)
-                current_dim_start += (dim1_end_ind-dim1_start_ind)
-                dims_available -= (dim1_end_ind-dim1_start_ind)
-
-            if dim2_remaining > 0:
-                dim2_start_ind = num_grids-dim2_remaining
-                dim2_end_ind = dim2_start_ind + dim2_remaining if dims_available >= dim2_remaining else dim2_start_ind + dims_available  # noqa
-                dim2s[dim2_start_ind:dim2_end_ind] = dims[current_dim_start:current_dim_start +
-                                                          (dim2_end_ind-dim2_start_ind)]
-                dim2_remaining -= (dim2_end_ind-dim2_start_ind)
+            if not line:
+                raise ValueError("Unexpected end of scan grid file {}".format(filename))
+            dims += [int(d) for d in line.split()]
+        dims = np.array(dims[:2 * num_grids]).reshape(2, num_grids).T
 
         line = f.readline()
         num_psi = int(line.split()[0])
+        data_start = f.tell()
 
-        psi_grids = []
-        for ipsi in range(num_psi):
-            psis = np.empty(num_rotors, dtype=float)
-            psi_remaining = num_rotors
-            while psi_remaining > 0:
-                line = f.readline()
-                line_data = [float(d) for d in line.split()]
-                for psi in line_data:
-                    psis[num_rotors-psi_remaining] = psi
-                    psi_remaining -= 1
-            frames = []
-            for igrid in range(num_grids):
-                x = np.empty((dim1s[igrid], dim2s[igrid]))
-                y = np.empty((dim1s[igrid], dim2s[igrid]))
-                z = np.empty((dim1s[igrid], dim2s[igrid]))
-                u = np.empty((dim1s[igrid], dim2s[igrid]))
-                v = np.empty((dim1s[igrid], dim2s[igrid]))
-                w = np.empty((dim1s[igrid], dim2s[igrid]))
-                cp = np.empty((dim1s[igrid], dim2s[igrid]))
-                cp_prime = np.empty((dim1s[igrid], dim2s[igrid]))
-                for i in range(dim1s[igrid]):
-                    for j in range(dim2s[igrid]):
-                        line = f.readline()
-                        data = [float(d) for d in line.split()]
-                        x[i, j] = data[0]
-                        y[i, j] = data[1]
-                        z[i, j] = data[2]
-                        u[i, j] = data[3] + freestream_velocity[0]
-                        v[i, j] = data[4] + freestream_velocity[1]
-                        w[i, j] = data[5] + freestream_velocity[2]
-                        cp[i, j] = data[6]
-                        cp_prime[i, j] = data[7]
-                grid = CharmScanGridFrame(x, y, z, u, v, w, cp, cp_prime, psis)
-                frames.append(grid)
-
-            psi_grids.append(frames)
-
-        return CharmScanGridResults(num_psi=num_psi, num_grids=num_grids, grids=psi_grids)
+        # count the lines holding the rotor azimuths of the first azimuth, which sets the lines per azimuth
+        psi_lines = 0
+        psi_read = 0
+        while psi_read < num_rotors:
+            line = f.readline()
+            if not line:
+                raise ValueError("Unexpected end of scan grid file {}".format(filename))
+            psi_read += len(line.split())
+            psi_lines += 1
+
+    row_size = num_rotors + int((dims[:, 0] * dims[:, 1]).sum()) * SCAN_GRID_NUM_COLS
+    lines_per_psi = psi_lines + int((dims[:, 0] * dims[:, 1]).sum())
+
+    def read_values(f, start, end, size):
+        f.seek(start)
+        values = np.fromstring(f.read(end - start).decode(), sep=" ")
+        if values.size != size:
+            raise ValueError("Scan grid file {} has {} values where {} were expected".format(
+                filename, values.size, size))
+        return values
+
+    if mode == "memory":
+        with open(filename, "rb") as f:
+            data = read_values(f, data_start, os.path.getsize(filename), num_psi * row_size).reshape(num_psi, row_size)
+        # add the freestream in place so the frames are views
+        grid_values = data[:, num_rotors:].reshape(num_psi, -1, SCAN_GRID_NUM_COLS)
+        grid_values[:, :, 3:6] += freestream_velocity
+        return CharmScanGridResults(num_psi=num_psi, num_grids=num_grids, data=data, dims=dims,
+                                    num_rotors=num_rotors)
+
+    if mode == "mmap":
+        cache_name = filename + ".npy"
+        data = None
+        if os.path.isfile(cache_name) and os.path.getmtime(cache_name) >= os.path.getmtime(filename):
+            data = np.load(cache_name, mmap_mode="r")
+            if data.shape != (num_psi, row_size):
+                data = None
+        if data is None:
+            offsets = _scan_grid_azimuth_offsets(filename, data_start, lines_per_psi, num_psi)
+            data = np.lib.format.open_memmap(cache_name, mode="w+", dtype=float, shape=(num_psi, row_size))
+            with open(filename, "rb") as f:
+                for ipsi in range(num_psi):
+                    data[ipsi] = read_values(f, offsets[ipsi], offsets[ipsi + 1], row_size)
+            data.flush()
+            del data
+            data = np.load(cache_name, mmap_mode="r")
+        return CharmScanGridResults(num_psi=num_psi, num_grids=num_grids, data=data, dims=dims,
+                                    num_rotors=num_rotors, freestream_velocity=freestream_velocity)
+
+    offsets = _scan_grid_azimuth_offsets(filename, data_start, lines_per_psi, num_psi)
+    data = np.empty((num_psi, row_size))
+
+    def load_azimuth(ipsi):
+        with open(filename, "rb") as f:
+            data[ipsi] = read_values(f, offsets[ipsi], offsets[ipsi + 1], row_size)
+        data[ipsi, num_rotors:].reshape(-1, SCAN_GRID_NUM_COLS)[:, 3:6] += freestream_velocity
+
+    return CharmScanGridResults(num_psi=num_psi, num_grids=num_grids, data=data, dims=dims, num_rotors=num_rotors,
+                                loader=load_azimuth)
+
+
+def _scan_grid_azimuth_offsets(filename, start, lines_per_psi, num_psi, chunk_size=1 << 24):
+    """
+    Finds the byte offset of each azimuth block of a scan grid file by counting lines
+
+    :param filename: scan grid output file
+    :param start: byte offset of the first azimuth
+    :param lines_per_psi: number of lines in each azimuth block
+    :param num_psi: number of azimuths
+    :return: list of num_psi + 1 offsets, the last being the end of the final block
+    """
+    offsets = [start]
+    num_newlines = 0
+    with open(filename, "rb") as f:
+        f.seek(start)
+        pos = start
+        while len(offsets) <= num_psi:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == ord("\n"))
+            first = lines_per_psi - 1 - num_newlines % lines_per_psi
+            offsets += (pos + newlines[first::lines_per_psi] + 1).tolist()
+            num_newlines += len(newlines)
+            pos += len(chunk)
+    # the last line may not end in a newline
+    if len(offsets) == num_psi and num_newlines % lines_per_psi == lines_per_psi - 1:
+        offsets.append(pos)
+    if len(offsets) <= num_psi:
+        raise ValueError("Scan grid file {} has fewer than {} azimuths".format(filename, num_psi))
+    return offsets[:num_psi + 1]
 
 
 def run_charm(files_to_write, case_name, run=True, print_log_stream=False, run_cmd="runv6", timeout=None, **kwargs):
@@ -1093,169 +1410,229 @@ def __parse_omega(rw_filename):
     return omega
 
 
-def _parse_log_file(log_filename):
-    """
-    Parses integrated rotor quantities from log file
-    :param log_filename: name of the log file
-    :return: history or quantities for each rotor
-    """
-
-    with open(log_filename, "r") as f:
-        # Count the number of rotors
-        rotor_expr = re.compile(r"(^|\s)Rotor:\s+([0-9]+)")
-        _ = __find_line(f, rotor_expr)
-        num_rotors = 1
-        while True:
-            # Skip 7 lines
-            line = ""
-            current_position = f.tell()
-            for i in range(7):
-                line = f.readline()
-            if re.search(rotor_expr, line):
-                num_rotors += 1
-            else:
-                f.seek(current_position)
-                break
-
-        tip_speed_expr = re.compile(r"(^|\s)Tip speed \(OMEGAR\):\s+(.*)\s")
-
-        shaft_axes_expr = re.compile(r"(^|\s)SHAFT AXES:")
-        shaft_thrust_expr = re.compile(r"(^|\s)Thrust \(\+up\)\s+(\S*)\s+(\S*)")
-        shaft_h_force_expr = re.compile(r"(^|\s)H-force \(\+back\)\s+(\S*)\s+(\S*)")
-        shaft_y_force_expr = re.compile(r"(^|\s)Y-force \(\+adv side\)\s+(\S*)\s+(\S*)")
-        shaft_power_expr = re.compile(r"(^|\s)Shaft Power\s+(\S*)\s+(\S*)")
-        shaft_roll_mom_expr = re.compile(r"(^|\s)Roll moment  \(about \+x\)\s+(\S*)\s+(\S*)")
-        shaft_pitch_mom_expr = re.compile(r"(^|\s)Pitch moment \(about \+y\)\s+(\S*)\s+(\S*)")
-        shaft_yaw_mom_expr = re.compile(r"(^|\s)Yaw moment   \(about \+z\)\s+(\S*)\s+(\S*)")
-
-        wind_axes_expr = re.compile(r"(^|\s)WIND AXES:")
-        wind_thrust_expr = re.compile(r"(^|\s)Lift \(\+up\)\s+(\S*)\s+(\S*)")
-        wind_x_force_expr = re.compile(r"(^|\s)X-force \(\+back\)\s+(\S*)\s+(\S*)")
-        wind_side_force_expr = re.compile(r"(^|\s)Side force \(\+adv side\)\s+(\S*)\s+(\S*)")
-        wind_power_expr = re.compile(r"(^|\s)Total Power \(energy balance\)\s+(\S*)\s+(\S*)")
-        wind_ideal_ind_power_expr = re.compile(r"(^|\s)Ideal Induced Power\s+(\S*)\s(\S*)")
-        wind_rotor_eff_expr = re.compile(r"(^|\s)Rotor efficiency\s+(\S+)")
-
-        aircraft_loads_expr = re.compile(r"(^|\s)Hub loads \(aircraft frame\)")
-        aircraft_x_force_expr = re.compile(r"(^|\s)Rearward force \(-x-dir\)\s+(\S*)\s+(\S*)")
-        aircraft_y_force_expr = re.compile(r"(^|\s)Sideward force \(\+y-dir\)\s+(\S*)\s+(\S*)")
-        aircraft_z_force_expr = re.compile(r"(^|\s)Vertical force \(-z-dir\)\s+(\S*)\s+(\S*)")
-        aircraft_roll_mom_expr = re.compile(r"(^|\s)Roll moment  \(about \+x\)\s+(\S*)\s+(\S*)")
-        aircraft_pitch_mom_expr = re.compile(r"(^|\s)Pitch moment \(about \+y\)\s+(\S*)\s+(\S*)")
-        aircraft_yaw_mom_expr = re.compile(r"(^|\s)Yaw moment   \(about \+z\)\s+(\S*)\s+(\S*)")
-
-        collective_expr = re.compile(r"(^|\s)Collective Pitch:\s+(\S*)")
-        fom_expr = re.compile(r"(^|\s)Figure of Merit \(FM\)\.+\s+(\S+)")
-        sigma_expr = re.compile(r"(^|\s)Solidity\s+=\s+\S+\s+(\S+)")
-
-        rotor_results = []
-        for irotor in range(num_rotors):
-            rotor_results.append([])
+_INTEGRATED_PERF_EXPR = re.compile(r"(^|\s)INTEGRATED PERFORMANCE THIS REVOLUTION - ROTOR ([0-9]+)")
 
-        line = "a"
-        while line:
-            # Find Integrated Performance for each rotor
-            for irotor in range(num_rotors):
-                integrated_perf_expr = re.compile(r"(^|\s)INTEGRATED PERFORMANCE THIS REVOLUTION - ROTOR ([0-9]+)")
-                line = __find_line(f, integrated_perf_expr)
+_TIP_SPEED_EXPR = re.compile(r"(^|\s)Tip speed \(OMEGAR\):\s+(.*)\s")
 
-                if not line:
-                    break
+_SHAFT_AXES_EXPR = re.compile(r"(^|\s)SHAFT AXES:")
+_SHAFT_THRUST_EXPR = re.compile(r"(^|\s)Thrust \(\+up\)\s+(\S*)\s+(\S*)")
+_SHAFT_H_FORCE_EXPR = re.compile(r"(^|\s)H-force \(\+back\)\s+(\S*)\s+(\S*)")
+_SHAFT_Y_FORCE_EXPR = re.compile(r"(^|\s)Y-force \(\+adv side\)\s+(\S*)\s+(\S*)")
+_SHAFT_POWER_EXPR = re.compile(r"(^|\s)Shaft Power\s+(\S*)\s+(\S*)")
+_SHAFT_ROLL_MOM_EXPR = re.compile(r"(^|\s)Roll moment  \(about \+x\)\s+(\S*)\s+(\S*)")
+_SHAFT_PITCH_MOM_EXPR = re.compile(r"(^|\s)Pitch moment \(about \+y\)\s+(\S*)\s+(\S*)")
+_SHAFT_YAW_MOM_EXPR = re.compile(r"(^|\s)Yaw moment   \(about \+z\)\s+(\S*)\s+(\S*)")
 
-                # Parse individual quantities
+_WIND_AXES_EXPR = re.compile(r"(^|\s)WIND AXES:")
+_WIND_THRUST_EXPR = re.compile(r"(^|\s)Lift \(\+up\)\s+(\S*)\s+(\S*)")
+_WIND_X_FORCE_EXPR = re.compile(r"(^|\s)X-force \(\+back\)\s+(\S*)\s+(\S*)")
+_WIND_SIDE_FORCE_EXPR = re.compile(r"(^|\s)Side force \(\+adv side\)\s+(\S*)\s+(\S*)")
+_WIND_POWER_EXPR = re.compile(r"(^|\s)Total Power \(energy balance\)\s+(\S*)\s+(\S*)")
+_WIND_IDEAL_IND_POWER_EXPR = re.compile(r"(^|\s)Ideal Induced Power\s+(\S*)\s(\S*)")
+_WIND_ROTOR_EFF_EXPR = re.compile(r"(^|\s)Rotor efficiency\s+(\S+)")
 
-                line = __find_line(f, tip_speed_expr, integrated_perf_expr)
-                tip_speed = float(re.search(tip_speed_expr, line).groups()[1].split()[0])
+_AIRCRAFT_LOADS_EXPR = re.compile(r"(^|\s)Hub loads \(aircraft frame\)")
+_AIRCRAFT_X_FORCE_EXPR = re.compile(r"(^|\s)Rearward force \(-x-dir\)\s+(\S*)\s+(\S*)")
+_AIRCRAFT_Y_FORCE_EXPR = re.compile(r"(^|\s)Sideward force \(\+y-dir\)\s+(\S*)\s+(\S*)")
+_AIRCRAFT_Z_FORCE_EXPR = re.compile(r"(^|\s)Vertical force \(-z-dir\)\s+(\S*)\s+(\S*)")
+_AIRCRAFT_ROLL_MOM_EXPR = _SHAFT_ROLL_MOM_EXPR
+_AIRCRAFT_PITCH_MOM_EXPR = _SHAFT_PITCH_MOM_EXPR
+_AIRCRAFT_YAW_MOM_EXPR = _SHAFT_YAW_MOM_EXPR
 
-                # Shaft axes
-                line = __find_line(f, shaft_axes_expr, integrated_perf_expr)
-                line = __find_line(f, shaft_thrust_expr, integrated_perf_expr)
-                shaft_thrust = float(re.search(shaft_thrust_expr, line).groups()[1])
+_COLLECTIVE_EXPR = re.compile(r"(^|\s)Collective Pitch:\s+(\S*)")
+_FOM_EXPR = re.compile(r"(^|\s)Figure of Merit \(FM\)\.+\s+(\S+)")
+_SIGMA_EXPR = re.compile(r"(^|\s)Solidity\s+=\s+\S+\s+(\S+)")
 
-                line = __find_line(f, shaft_h_force_expr, integrated_perf_expr)
-                shaft_h_force = float(re.search(shaft_h_force_expr, line).groups()[1])
 
-                line = __find_line(f, shaft_y_force_expr, integrated_perf_expr)
-                shaft_y_force = float(re.search(shaft_y_force_expr, line).groups()[1])
-
-                line = __find_line(f, shaft_power_expr, integrated_perf_expr)
-                shaft_power = float(re.search(shaft_power_expr, line).groups()[1])
-
-                line = __find_line(f, shaft_roll_mom_expr, integrated_perf_expr)
-                shaft_roll_mom = float(re.search(shaft_roll_mom_expr, line).groups()[1])
-
-                line = __find_line(f, shaft_pitch_mom_expr, integrated_perf_expr)
-                shaft_pitch_mom = float(re.search(shaft_pitch_mom_expr, line).groups()[1])
+def _parse_log_file(log_filename, sections=None):
+    """
+    Parses integrated rotor quantities from log file
+    :param log_filename: name of the log file
+    :param sections: [rotor number, start, end] byte offsets of the integrated performance sections from
+        :func:`_index_log_file`, found if None
+    :return: history or quantities for each rotor
+    """
+    with open(log_filename, "rb") as f:
+        text = f.read().decode("latin-1")
+    if sections is None:
+        sections = _index_log_file(text=text)
 
-                line = __find_line(f, shaft_yaw_mom_expr, integrated_perf_expr)
-                shaft_yaw_mom = float(re.search(shaft_yaw_mom_expr, line).groups()[1])
+    rotor_ids = sorted(set(rotor for rotor, _, _ in sections))
+    rotor_results = [[] for _ in rotor_ids]
+    for rotor, start, end in sections:
+        rotor_results[rotor_ids.index(rotor)].append(_parse_log_section(text[start:end]))
 
-                # Wind Axes
-                line = __find_line(f, wind_axes_expr, integrated_perf_expr)
-                line = __find_line(f, wind_thrust_expr, integrated_perf_expr)
-                wind_thrust = float(re.search(wind_thrust_expr, line).groups()[1])
+    return rotor_results
 
-                line = __find_line(f, wind_x_force_expr, integrated_perf_expr)
-                wind_x_force = float(re.search(wind_x_force_expr, line).groups()[1])
 
-                line = __find_line(f, wind_side_force_expr, integrated_perf_expr)
-                wind_side_force = float(re.search(wind_side_force_expr, line).groups()[1])
+def _index_log_file(log_filename=None, text=None):
+    """
+    Finds the integrated performance sections of a log file in a single pass
 
-                line = __find_line(f, wind_power_expr, integrated_perf_expr)
-                wind_power = float(re.search(wind_power_expr, line).groups()[1])
+    :param log_filename: name of the log file, read if text is None
+    :param text: latin-1 decoded log file contents
+    :return: list of [rotor number, start, end] byte offsets of each section
+    """
+    if text is None:
+        with open(log_filename, "rb") as f:
+            text = f.read().decode("latin-1")
+    matches = list(_INTEGRATED_PERF_EXPR.finditer(text))
+    starts = [m.end(1) for m in matches] + [len(text)]
+    return [[int(m.group(2)), starts[i], starts[i + 1]] for i, m in enumerate(matches)]
 
-                line = __find_line(f, wind_ideal_ind_power_expr, integrated_perf_expr)
-                wind_ideal_ind_power = float(re.search(wind_ideal_ind_power_expr, line).groups()[1])
 
-                line = __find_line(f, wind_rotor_eff_expr, integrated_perf_expr)
-                wind_rotor_eff = float(re.search(wind_rotor_eff_expr, line).groups()[1])
+def _parse_log_section(text):
+    """
+    Parses the integrated performance section of a single rotor and revolution
 
-                line = __find_line(f, aircraft_loads_expr, integrated_perf_expr)
-                if line != '':
-                    line = __find_line(f, aircraft_x_force_expr, integrated_perf_expr)
-                    aircraft_x_force = float(re.search(aircraft_x_force_expr, line).groups()[1])
+    :param text: section text, starting at its INTEGRATED PERFORMANCE line
+    :return: :class:`RotorTuple`
+    """
+    pos = 0
+
+    def find(expr, required=True):
+        """
+        Finds the next line matching expr, returns the match on that line or None
+        """
+        nonlocal pos
+        match, end = _search_line(expr, text, pos)
+        if match is None:
+            if required:
+                raise ValueError("'{}' not found in log section".format(expr.pattern))
+            return None
+        pos = end
+        return match
+
+    tip_speed = float(find(_TIP_SPEED_EXPR).groups()[1].split()[0])
+
+    # Shaft axes
+    find(_SHAFT_AXES_EXPR, required=False)
+    shaft_thrust = float(find(_SHAFT_THRUST_EXPR).groups()[1])
+    shaft_h_force = float(find(_SHAFT_H_FORCE_EXPR).groups()[1])
+    shaft_y_force = float(find(_SHAFT_Y_FORCE_EXPR).groups()[1])
+    shaft_power = float(find(_SHAFT_POWER_EXPR).groups()[1])
+    shaft_roll_mom = float(find(_SHAFT_ROLL_MOM_EXPR).groups()[1])
+    shaft_pitch_mom = float(find(_SHAFT_PITCH_MOM_EXPR).groups()[1])
+    shaft_yaw_mom = float(find(_SHAFT_YAW_MOM_EXPR).groups()[1])
+
+    # Wind Axes
+    find(_WIND_AXES_EXPR, required=False)
+    wind_thrust = float(find(_WIND_THRUST_EXPR).groups()[1])
+    wind_x_force = float(find(_WIND_X_FORCE_EXPR).groups()[1])
+    wind_side_force = float(find(_WIND_SIDE_FORCE_EXPR).groups()[1])
+    wind_power = float(find(_WIND_POWER_EXPR).groups()[1])
+    wind_ideal_ind_power = float(find(_WIND_IDEAL_IND_POWER_EXPR).groups()[1])
+    wind_rotor_eff = float(find(_WIND_ROTOR_EFF_EXPR).groups()[1])
+
+    # Hub loads in the aircraft frame are not written by every charm version
+    aircraft_x_force = aircraft_y_force = aircraft_z_force = np.nan
+    aircraft_roll_mom = aircraft_pitch_mom = aircraft_yaw_mom = np.nan
+    if find(_AIRCRAFT_LOADS_EXPR, required=False) is not None:
+        aircraft_x_force = float(find(_AIRCRAFT_X_FORCE_EXPR).groups()[1])
+        aircraft_y_force = float(find(_AIRCRAFT_Y_FORCE_EXPR).groups()[1])
+        aircraft_z_force = float(find(_AIRCRAFT_Z_FORCE_EXPR).groups()[1])
+        aircraft_roll_mom = float(find(_AIRCRAFT_ROLL_MOM_EXPR).groups()[1])
+        aircraft_pitch_mom = float(find(_AIRCRAFT_PITCH_MOM_EXPR).groups()[1])
+        aircraft_yaw_mom = float(find(_AIRCRAFT_YAW_MOM_EXPR).groups()[1])
+
+    sigma = float(find(_SIGMA_EXPR).groups()[1])
+
+    match = find(_FOM_EXPR, required=False)
+    fom = 0.0 if match is None else float(match.groups()[1])
+
+    collective = float(find(_COLLECTIVE_EXPR).groups()[1])
+
+    return RotorTuple(
+        shaft_thrust, shaft_power, shaft_h_force, shaft_y_force, shaft_roll_mom,
+        shaft_pitch_mom, shaft_yaw_mom, wind_thrust, wind_power, wind_x_force, wind_side_force,
+        aircraft_roll_mom, aircraft_pitch_mom, aircraft_yaw_mom, collective, tip_speed, fom,
+        sigma, wind_ideal_ind_power, wind_rotor_eff,
+        aircraft_x_force, aircraft_y_force, aircraft_z_force,
+    )
+
+
+def _search_line(expr, text, pos):
+    r"""
+    Finds the first line at or after pos that matches expr, matching each line on its own as a line by line scan
+    would
+
+    :param expr: compiled expression, starting with a (^|\s) group
+    :param text: text to search
+    :param pos: offset of the start of a line in text
+    :return: (match, end) tuple of the match against the line and the offset of the start of the next line, or
+        (None, pos) if no line matches
+    """
+    while True:
+        match = expr.search(text, pos)
+        if match is None:
+            return None, pos
+        start = text.rfind("\n", 0, match.end(1)) + 1
+        end = text.find("\n", match.end(1))
+        end = len(text) if end < 0 else end + 1
+        line_match = expr.search(text[start:end])
+        if line_match is not None:
+            return line_match, end
+        pos = end
+
+
+def _index_perf_file(perf_filename=None, text=None):
+    """
+    Finds the rotor blocks of a perf file in a single pass
 
-                    line = __find_line(f, aircraft_y_force_expr, integrated_perf_expr)
-                    aircraft_y_force = float(re.search(aircraft_y_force_expr, line).groups()[1])
+    :param perf_filename: name of the perf file, read if text is None
+    :param text: latin-1 decoded perf file contents
+    :return: list of [start, end] byte offsets of each block, starting at its metadata variable names line
+    """
+    if text is None:
+        with open(perf_filename, "rb") as f:
+            text = f.read().decode("latin-1")
+    starts = [m.start() for m in _PERF_BLOCK_EXPR.finditer(text)] + [len(text)]
+    return [[starts[i], starts[i + 1]] for i in range(len(starts) - 1)]
 
-                    line = __find_line(f, aircraft_z_force_expr, integrated_perf_expr)
-                    aircraft_z_force = float(re.search(aircraft_z_force_expr, line).groups()[1])
 
-                    line = __find_line(f, aircraft_roll_mom_expr, integrated_perf_expr)
-                    aircraft_roll_mom = float(re.search(aircraft_roll_mom_expr, line).groups()[1])
+_PERF_BLOCK_EXPR = re.compile(r"^ *ROTOR +NPSI", re.MULTILINE)
 
-                    line = __find_line(f, aircraft_pitch_mom_expr, integrated_perf_expr)
-                    aircraft_pitch_mom = float(re.search(aircraft_pitch_mom_expr, line).groups()[1])
+_PERF_META_READER = ff.FortranRecordReader("(I9, 2I5, F11.2, F10.2, E10.4, F12.4, F12.3, 2E11.3)")
 
-                    line = __find_line(f, aircraft_yaw_mom_expr, integrated_perf_expr)
-                    aircraft_yaw_mom = float(re.search(aircraft_yaw_mom_expr, line).groups()[1])
 
-                line = __find_line(f, sigma_expr, integrated_perf_expr)
-                sigma = float(re.search(sigma_expr, line).groups()[1])
+def _parse_perf_meta_line(line):
+    """
+    :return: (rotor, num_psi, num_radial_locs, list of the remaining metadata values) tuple
+    """
+    data = _PERF_META_READER.read(line)
+    return int(data[0]), int(data[1]), int(data[2]), list(map(float, data[3:]))
 
-                line = __find_line(f, fom_expr, integrated_perf_expr)
-                if line == '':
-                    fom = 0.0
-                else:
-                    fom = float(re.search(fom_expr, line).groups()[1])
 
-                line = __find_line(f, collective_expr, integrated_perf_expr)
-                collective = float(re.search(collective_expr, line).groups()[1])
+def _parse_perf_rows(data, num_rows, num_cols):
+    """
+    Parses the radial data of a perf file block, with a single bulk read when the block is complete
 
-                rotor_results[irotor].append(
-                    RotorTuple(
-                        shaft_thrust, shaft_power, shaft_h_force, shaft_y_force, shaft_roll_mom,
-                        shaft_pitch_mom, shaft_yaw_mom, wind_thrust, wind_power, wind_x_force, wind_side_force,
-                        aircraft_roll_mom, aircraft_pitch_mom, aircraft_yaw_mom, collective, tip_speed, fom,
-                        sigma, wind_ideal_ind_power, wind_rotor_eff,
-                        aircraft_x_force, aircraft_y_force, aircraft_z_force,
-                    )
-                )
+    Incomplete blocks are read line by line up to the first line that cannot be parsed.
 
-        return rotor_results
+    :param data: block text after the variable names line
+    :param num_rows: expected number of rows
+    :param num_cols: number of variables
+    :return: rows x num_cols array
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        values = np.fromstring(data, sep=" ")
+    if values.size == num_rows * num_cols:
+        return values.reshape(num_rows, num_cols)
+
+    rows = []
+    for line in data.splitlines()[:num_rows]:
+        try:
+            row = [float(d) for d in line.split()]
+        except ValueError:
+            break
+        if len(row) != num_cols:
+            break
+        rows.append(row)
+    return np.array(rows).reshape(-1, num_cols)
 
 
-def __parse_cq_file(filename, num_rotors):
+def _parse_cq_file(filename, num_rotors):
     """
     Parses the [name]cq.dat file which contains coefficients for each rotor as a history of iteration
     :param filename: [name]cq.dat file name
@@ -1267,23 +1644,3 @@ def __parse_cq_file(filename, num_rotors):
     for irotor in range(num_rotors):
         rotor_data.append(CharmCQData(*data[irotor::num_rotors, :8].T))
     return rotor_data
-
-
-def __find_line(file: io.IOBase, expr, stop_expr=None):
-    """
-    Moves file forward until expression is matched
-    :param file: file object
-    :param expr: regex
-    :param stop_expr: optional expression used to stop search. If this expression is found, then fail to find line
-    :return: line
-    """
-    line = "a"
-    current_position = file.tell()
-    while line:
-        line = file.readline()
-        if re.search(expr, line):
-            return line
-        if stop_expr is not None and re.search(stop_expr, line):
-            break
-    file.seek(current_position)
-    return ''
@@ -0,0 +1,312 @@
+# Copyright (c) 2023 United States Government as represented by the
+# Administrator of the National Aeronautics and Space Administration.  All Other
+# Rights Reserved.
+
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+
+#      http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+import copy
+import itertools
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from charm.output import parse_charm_run
+
+
+class CharmJob:
+    """
+    A single CHARM case run by :class:`CharmJobRunner`
+    """
+
+    def __init__(self, case_name, files_to_write=None, build_files=None, params=None):
+        """
+
+        :param case_name: name of the charm case
+        :param files_to_write: dictionary of filenames and contents to write
+        :param build_files: function returning files_to_write, called on a worker thread when the job starts
+            (used if files_to_write is None)
+        :param params: dictionary of parameters describing this case, added as columns to the harvested results
+        """
+        self.case_name = case_name
+        self.files_to_write = files_to_write
+        self.build_files = build_files
+        self.params = {} if params is None else params
+
+        self.run_dir = None
+        """
+        Directory the last attempt ran in, None once it has been removed
+        """
+
+        self.attempts = 0
+        self.returncode = None
+        self.error = None
+        """
+        Exception raised by the last attempt, None if the job succeeded
+        """
+
+        self.elapsed = 0.0
+
+        self.harvest = {}
+        """
+        Dictionary of scalar results harvested from this case
+        """
+
+    @property
+    def succeeded(self):
+        return self.attempts > 0 and self.error is None
+
+
+class CharmJobRunner:
+    """
+    Runs many CHARM cases concurrently, each in its own temporary directory, and harvests scalar results from
+    every case into a single table.
+
+    Any stand-in executable can be used for ``run_cmd``. It is called as ``run_cmd . case_name`` from the case
+    directory, like ``runv6``.
+    """
+
+    def __init__(self, num_cores=None, run_cmd="runv6", timeout=None, retries=1, work_dir=None,
+                 keep_run_dirs=False, stream_log=False, harvest=None):
+        """
+
+        :param num_cores: maximum number of cases run at once, defaults to the number of cpus
+        :param run_cmd: command to run charm, either a string or a list of arguments, this defaults to ``runv6``
+        :param timeout: timeout in seconds for each attempt. If the process is still running after timeout seconds,
+            it will be killed. If none, no timeout will be applied.
+        :param retries: number of times a failed case is run again
+        :param work_dir: directory the case directories are created in, defaults to the system temporary directory
+        :param keep_run_dirs: if False, case directories are removed once their results have been harvested
+        :param stream_log: if True, lines of each case's log file are printed as they are written, prefixed with the
+            case directory name. A function taking (job, line) can be given instead
+        :param harvest: function taking (job, run_dir) and returning a dictionary of scalar results, defaults to
+            :func:`harvest_rotor_performance`
+        """
+        self.num_cores = os.cpu_count() if num_cores is None else num_cores
+        self.run_cmd = [run_cmd] if isinstance(run_cmd, str) else list(run_cmd)
+        self.timeout = timeout
+        self.retries = retries
+        self.work_dir = work_dir
+        self.keep_run_dirs = keep_run_dirs
+        self.stream_log = stream_log
+        self.harvest = harvest_rotor_performance if harvest is None else harvest
+        self.jobs = []
+        self._print_lock = threading.Lock()
+
+    def submit(self, case_name, files_to_write=None, build_files=None, params=None):
+        """
+        Adds a case to the queue
+
+        :return: :class:`CharmJob` object
+        """
+        job = CharmJob(case_name, files_to_write=files_to_write, build_files=build_files, params=params)
+        self.jobs.append(job)
+        return job
+
+    def run(self, jobs=None):
+        """
+        Runs queued cases, at most num_cores at a time. This function is blocking.
+
+        :param jobs: jobs to run, defaults to all submitted jobs that have not been run
+        :return: :class:`pandas.DataFrame` with one row per job, in submission order
+        """
+        if jobs is None:
+            jobs = [job for job in self.jobs if job.attempts == 0]
+        with ThreadPoolExecutor(max_workers=max(1, self.num_cores)) as executor:
+            list(executor.map(self._run_job, jobs))
+        return self.results_frame(jobs)
+
+    def map(self, build_files, variants, case_name="case"):
+        """
+        Runs one case per variant, for example the rotor settings of an rpm/collective sweep from
+        :func:`sweep_rotor_settings`
+
+        Input files are built on the worker threads, so building the next cases overlaps running the current ones.
+
+        :param build_files: function taking a variant and returning the dictionary of filenames and contents to
+            write, e.g. a call to :func:`charm.input_automation.build_charm_input_files`
+        :param variants: iterable of variants or of (params, variant) tuples
+        :param case_name: charm case name used for every case
+        :return: :class:`pandas.DataFrame` with one row per variant, in order
+        """
+        jobs = []
+        for i, variant in enumerate(variants):
+            if isinstance(variant, tuple) and len(variant) == 2 and isinstance(variant[0], dict):
+                params, variant = variant
+            else:
+                params = {"variant": i}
+            jobs.append(self.submit(case_name, build_files=lambda v=variant: build_files(v), params=params))
+        return self.run(jobs)
+
+    def results_frame(self, jobs=None):
+        """
+        Collects the parameters, status and harvested results of jobs into a single table
+
+        :param jobs: jobs to include, defaults to all submitted jobs
+        :return: :class:`pandas.DataFrame` with one row per job
+        """
+        if jobs is None:
+            jobs = self.jobs
+        columns = {}
+        rows = [dict(job.params, case_name=job.case_name, succeeded=job.succeeded, attempts=job.attempts,
+                     returncode=job.returncode, elapsed=job.elapsed, run_dir=job.run_dir,
+                     error=None if job.error is None else repr(job.error), **job.harvest) for job in jobs]
+        for irow, row in enumerate(rows):
+            for key, value in row.items():
+                columns.setdefault(key, [None] * len(rows))[irow] = value
+        return pd.DataFrame(columns)
+
+    def _run_job(self, job: CharmJob):
+        for attempt in range(self.retries + 1):
+            job.attempts += 1
+            job.error = None
+            start_time = time.time()
+            run_dir = tempfile.mkdtemp(prefix=job.case_name + "_", dir=self.work_dir)
+            job.run_dir = run_dir
+            try:
+                if job.files_to_write is None:
+                    job.files_to_write = job.build_files()
+                for filename, file_contents in job.files_to_write.items():
+                    with open(os.path.join(run_dir, filename), "w") as f:
+                        f.write(file_contents)
+
+                job.returncode = self._run_process(job, run_dir)
+                if job.returncode != 0:
+                    raise RuntimeError("{} exited with code {}".format(" ".join(self.run_cmd), job.returncode))
+                job.harvest = self.harvest(job, run_dir)
+            except Exception as e:
+                job.error = e
+            finally:
+                job.elapsed = time.time() - start_time
+                if not self.keep_run_dirs:
+                    shutil.rmtree(run_dir, ignore_errors=True)
+                    job.run_dir = None
+
+            if job.error is None:
+                break
+        return job
+
+    def _run_process(self, job, run_dir):
+        """
+        Runs the charm command for one case, streaming its log file if requested
+
+        :return: process return code
+        """
+        p = subprocess.Popen(self.run_cmd + [".", job.case_name], cwd=run_dir, start_new_session=True,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        start_time = time.time()
+        log_file = None
+        try:
+            while True:
+                returncode = p.poll()
+                if self.stream_log:
+                    log_file = self._stream_log(job, run_dir, log_file)
+                if returncode is not None:
+                    return returncode
+                if self.timeout is not None and (time.time() - start_time) > self.timeout:
+                    _kill_process_group(p)
+                    raise TimeoutError("{} did not finish in {} s".format(job.case_name, self.timeout))
+                if self.stream_log:
+                    time.sleep(0.1)
+                else:
+                    try:
+                        p.wait(timeout=None if self.timeout is None else
+                               max(0.0, self.timeout - (time.time() - start_time)))
+                    except subprocess.TimeoutExpired:
+                        pass
+        finally:
+            if log_file is not None:
+                log_file.close()
+            if p.poll() is None:
+                _kill_process_group(p)
+
+    def _stream_log(self, job, run_dir, log_file):
+        if log_file is None:
+            for log_name in (os.path.join(run_dir, job.case_name + "dir", job.case_name + ".log"),
+                             os.path.join(run_dir, job.case_name + ".log")):
+                if os.path.exists(log_name):
+                    log_file = open(log_name, "r")
+                    break
+            else:
+                return None
+        for line in log_file.readlines():
+            if callable(self.stream_log):
+                self.stream_log(job, line.rstrip())
+            else:
+                with self._print_lock:
+                    print("[{}] {}".format(os.path.basename(job.run_dir), line.rstrip()))
+        return log_file
+
+
+def _kill_process_group(p):
+    try:
+        os.killpg(os.getpgid(p.pid), signal.SIGTERM)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        p.kill()
+    p.wait()
+
+
+def harvest_rotor_performance(job, run_dir):
+    """
+    Default harvest function of :class:`CharmJobRunner`. Collects the integrated performance of the last revolution
+    of each rotor from the log file and the final iteration of the cq.dat history.
+
+    :param job: :class:`CharmJob` that ran
+    :param run_dir: directory the case ran in
+    :return: dictionary with ``rotor[i]_[field]`` keys
+    """
+    results = parse_charm_run(run_dir, job.case_name, lazy=True)
+    harvest = {}
+    for irotor in itertools.count():
+        try:
+            performance = results.rotor_performance(irotor)
+        except IndexError:
+            break
+        for field, value in performance._asdict().items():
+            harvest["rotor{}_{}".format(irotor + 1, field)] = value
+    for (field, rotor), values in results.cq_data.items():
+        harvest["rotor{}_{}".format(rotor, field)] = values.iloc[-1]
+    return harvest
+
+
+def sweep_rotor_settings(rotor_settings, values):
+    """
+    Creates the rotor settings of a full factorial sweep, e.g. over rpm and collective
+
+    :param rotor_settings: base :class:`charm.input_automation.CharmRotorSettingsCollection`, it is not modified
+    :param values: dictionary of setting name to list of values. A name applies to every rotor in the collection,
+        a (rotor key, name) tuple applies to a single rotor
+    :return: list of (params, rotor settings) tuples for :meth:`CharmJobRunner.map`
+    """
+    names = list(values.keys())
+    variants = []
+    for combination in itertools.product(*[values[name] for name in names]):
+        settings = copy.deepcopy(rotor_settings)
+        params = {}
+        for name, value in zip(names, combination):
+            if isinstance(name, tuple):
+                key, attribute = name
+                setattr(settings[key], attribute, value)
+                params["{}_{}".format(key, attribute)] = value
+            else:
+                setattr(settings, name, value)
+                params[name] = value
+        variants.append((params, settings))
+    return variants
+
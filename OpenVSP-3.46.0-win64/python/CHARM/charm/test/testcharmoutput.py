@@ -22,6 +22,12 @@ path = os.path.dirname(__file__)
 
 class Test(unittest.TestCase):
 
+    def tearDown(self):
+        # parsing a run caches an index of its outputs in the run directory
+        index_file = os.path.join(path, "test_run", "test.charm_index.json")
+        if os.path.exists(index_file):
+            os.remove(index_file)
+
     def test_parse_perf_file(self):
         import charm.output as charmo
 
@@ -142,6 +148,73 @@ class Test(unittest.TestCase):
         ideal_ind_power = results.rotor_results[0].ideal_ind_power_wind[-1]
         self.assertEqual(ideal_ind_power_exp, ideal_ind_power, msg="Wind frame ")
 
+    def test_lazy_charm_run(self):
+        import charm.output as charmo
+
+        run_dir = os.path.join(path, "test_run")
+        results = charmo.CharmResults.from_run(run_dir, "test")
+        self.assertEqual(1049.41, results.rotor_performance(0).shaft_thrust_total)
+        self.assertNotIn("perf_data", vars(results))
+
+        # Re-open using the cached index
+        results = charmo.parse_charm_run(run_dir, "test", lazy=True)
+        self.assertTrue(os.path.exists(os.path.join(run_dir, "test.charm_index.json")))
+        self.assertEqual(0.746, results.rotor_results[0].rotor_eff_wind[-1])
+        self.assertEqual(results.rotor_results[0].omega, results.perf_data.rotor_metadata["OMEGA"].iloc[-1])
+
+    def test_scan_grid_modes(self):
+        import tempfile
+        import numpy as np
+        import charm.output as charmo
+
+        # two 2x3 grids at 4 azimuths of 2 rotors
+        num_psi, num_rotors, dim1, dim2 = 4, 2, 2, 3
+        rng = np.random.default_rng(0)
+        values = np.round(rng.uniform(-1.0, 1.0, (num_psi, 2 * dim1 * dim2, charmo.SCAN_GRID_NUM_COLS)), 6)
+        freestream = np.array([10.0, 0.5, -1.0])
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "testsg.off")
+            with open(filename, "w") as f:
+                f.write("2\n{0} {0}\n{1} {1}\n{2}\n".format(dim1, dim2, num_psi))
+                for ipsi in range(num_psi):
+                    f.write("{} {}\n".format(15.0 * ipsi, 15.0 * ipsi + 180.0))
+                    for point in values[ipsi]:
+                        f.write(" ".join("{:.6f}".format(v) for v in point) + "\n")
+
+            results = {mode: charmo.parse_scan_grid_output(filename, freestream, num_rotors, mode=mode)
+                       for mode in ("memory", "lazy", "mmap")}
+
+            expected = values.reshape(num_psi, 2, dim1, dim2, charmo.SCAN_GRID_NUM_COLS).copy()
+            expected[..., 3:6] += freestream
+            for mode, res in results.items():
+                np.testing.assert_allclose(expected, res.data, err_msg=mode)
+                np.testing.assert_allclose(expected[:, 1], res.grid_data(1), err_msg=mode)
+                np.testing.assert_allclose(expected[2, 0, :, :, 3], res.grids[2][0].u, err_msg=mode)
+                np.testing.assert_allclose(expected[:, 1, :, :, 5].mean(axis=0), res.average_grids[1].w,
+                                           err_msg=mode)
+            del results
+
+    def test_job_runner(self):
+        import sys
+        from charm.runner import CharmJobRunner
+
+        # Stand-in for charm that copies the outputs of the test run into the case directory
+        stand_in = "import shutil, sys; shutil.copytree(sys.argv[1], '.', dirs_exist_ok=True)"
+        runner = CharmJobRunner(num_cores=2, run_cmd=[sys.executable, "-c", stand_in, os.path.join(path, "test_run")],
+                                retries=0)
+        variants = [({"rpm": rpm}, rpm) for rpm in (1000, 1100, 1200)]
+        df = runner.map(lambda rpm: {"rpm.txt": str(rpm)}, variants, case_name="test")
+        self.assertEqual([1000, 1100, 1200], list(df["rpm"]))
+        self.assertTrue(df["succeeded"].all())
+        self.assertTrue((df["rotor1_shaft_thrust_total"] == df["rotor1_shaft_thrust_total"].iloc[0]).all())
+
+        failing = CharmJobRunner(num_cores=2, run_cmd=[sys.executable, "-c", "import sys; sys.exit(3)"], retries=2)
+        failing.submit("test", files_to_write={})
+        df = failing.run()
+        self.assertFalse(df["succeeded"].iloc[0])
+        self.assertEqual(3, df["attempts"].iloc[0])
+        self.assertEqual(3, df["returncode"].iloc[0])
+
 
 if __name__ == "__main__":
     t = Test()
@@ -0,0 +1,104 @@
+# Copyright (c) 2023 United States Government as represented by the
+# Administrator of the National Aeronautics and Space Administration.  All Other
+# Rights Reserved.
+
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+
+#      http://www.apache.org/licenses/LICENSE-2.0
+
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations under
+#  the License.
+
+import unittest
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Stand-in for bg2charm that echoes the blade stations and records each run
+STUB_BG2CHARM = """#!{python}
+import os, sys
+blade_file, bg_file = sys.stdin.readline().strip(), sys.stdin.readline().strip()
+with open(os.path.join({tmp!r}, "runs.txt"), "a") as f:
+    f.write("run\\n")
+with open(blade_file) as f_in, open(bg_file, "w") as f_out:
+    f_out.write("{version}\\n" + f_in.read())
+"""
+
+
+@unittest.skipIf(sys.platform == "win32", "the bg2charm stand-in is a python script")
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bg2charm = os.path.join(self.tmp.name, "bg2charm")
+        self.write_stub("version 1")
+        le = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.0, 0.0]]).T
+        te = le + np.array([[0.0], [0.5], [0.0]])
+        self.blade = (le, te, np.array([0.12, 0.1, 0.08]))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_stub(self, version):
+        with open(self.bg2charm, "w") as f:
+            f.write(STUB_BG2CHARM.format(python=sys.executable, tmp=self.tmp.name, version=version))
+        os.chmod(self.bg2charm, 0o755)
+
+    @property
+    def num_runs(self):
+        runs_file = os.path.join(self.tmp.name, "runs.txt")
+        if not os.path.exists(runs_file):
+            return 0
+        with open(runs_file) as f:
+            return len(f.readlines())
+
+    def create(self, *args, **kwargs):
+        from charm.input_automation import create_charm_blade_geom_file
+        return create_charm_blade_geom_file(*args, bg2charm_path=self.bg2charm, **kwargs)
+
+    def test_no_cache(self):
+        first = self.create(*self.blade)
+        self.assertTrue(first.startswith("version 1"))
+        self.assertEqual(first, self.create(*self.blade))
+        self.assertEqual(2, self.num_runs)
+
+    def test_bg_cache(self):
+        bg_cache = {}
+        first = self.create(*self.blade, bg_cache=bg_cache)
+        self.assertEqual(first, self.create(*self.blade, bg_cache=bg_cache))
+        self.assertEqual(1, self.num_runs)
+
+        self.create(*self.blade, unit_factor=1.0, bg_cache=bg_cache)
+        self.assertEqual(2, self.num_runs)
+
+        # a rebuilt bg2charm at the same path invalidates the cached outputs
+        self.write_stub("version 2")
+        self.assertTrue(self.create(*self.blade, bg_cache=bg_cache).startswith("version 2"))
+        self.assertEqual(3, self.num_runs)
+        self.assertEqual(3, len(bg_cache))
+
+    def test_process_cache(self):
+        import charm.input_automation as cia
+
+        cia._BG_FILE_CACHE.clear()
+        le, te, toc = self.blade
+        for i in range(cia._BG_FILE_CACHE.max_entries + 10):
+            self.create(le * (1.0 + i), te, toc, bg_cache=True)
+        self.assertEqual(cia._BG_FILE_CACHE.max_entries, len(cia._BG_FILE_CACHE))
+        num_runs = self.num_runs
+        self.create(le * (cia._BG_FILE_CACHE.max_entries + 10.0), te, toc, bg_cache=True)
+        self.assertEqual(num_runs, self.num_runs)
+        self.create(le, te, toc, bg_cache=True)
+        self.assertEqual(num_runs + 1, self.num_runs)
+        cia._BG_FILE_CACHE.clear()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -23,44 +23,32 @@ import openvsp as vsp_module
 
 def parse_degen_geom(degen_geom_res_id, vsp_instance=None):
     vsp = vsp_module.get_instance(vsp_instance)
-    # Get all of the degen geom results managers ids
-    degen_ids = vsp.GetStringResults(degen_geom_res_id, "Degen_DegenGeoms")
+    # Get all of the degen geom results in one bulk request
+    degen_res = vsp.parse_results_tree(degen_geom_res_id, children=("Degen_DegenGeoms", "surf", "sticks", "hinges",
+                                                                    "point", "disk", "plates"))
 
     degen_objects = []
     # loop over all degen objects
-    for degen_id in degen_ids:
-        res = vsp.parse_results_object(degen_id)
+    for res in degen_res.Degen_DegenGeoms:
         degen_obj = dg.DegenGeom(res)
 
-        surf_ids = vsp.GetStringResults(degen_id, 'surf')
-        for surf_id in surf_ids:
-            res = vsp.parse_results_object(surf_id)
-            degen_obj.surf = dg.DegenSurf(res)
+        for surf_res in getattr(res, "surf", []):
+            degen_obj.surf = dg.DegenSurf(surf_res)
 
-        stick_ids = vsp.GetStringResults(degen_id, 'sticks')
-        for stick_id in stick_ids:
-            res = vsp.parse_results_object(stick_id)
-            degen_obj.sticks.append(dg.DegenStick(res))
+        for stick_res in getattr(res, "sticks", []):
+            degen_obj.sticks.append(dg.DegenStick(stick_res))
 
-        hinge_ids = vsp.GetStringResults(degen_id, "hinges")
-        for hinge_id in hinge_ids:
-            res = vsp.parse_results_object(hinge_id)
-            degen_obj.hinge_lines.append(dg.DegenHinge(res))
+        for hinge_res in getattr(res, "hinges", []):
+            degen_obj.hinge_lines.append(dg.DegenHinge(hinge_res))
 
-        point_ids = vsp.GetStringResults(degen_id, "point")
-        for point_id in point_ids:
-            res = vsp.parse_results_object(point_id)
-            degen_obj.point = dg.DegenPoint(res)
+        for point_res in getattr(res, "point", []):
+            degen_obj.point = dg.DegenPoint(point_res)
 
-        disk_ids = vsp.GetStringResults(degen_id, "disk")
-        for disk_id in disk_ids:
-            res = vsp.parse_results_object(disk_id)
-            degen_obj.disk = dg.DegenDisk(res)
+        for disk_res in getattr(res, "disk", []):
+            degen_obj.disk = dg.DegenDisk(disk_res)
 
-        plate_ids = vsp.GetStringResults(degen_id, "plates")
-        for plate_id in plate_ids:
-            res = vsp.parse_results_object(plate_id)
-            degen_obj.plates.append(dg.DegenPlate(res))
+        for plate_res in getattr(res, "plates", []):
+            degen_obj.plates.append(dg.DegenPlate(plate_res))
 
         degen_objects.append(degen_obj)
 
@@ -4,10 +4,10 @@
 import os
 import sys
 import socket
-from time import sleep, time
 import subprocess
 import pickle
-from openvsp.facade_server import pack_data, unpack_data
+from openvsp.facade_server import pack_data, unpack_data, read_ready, send_message, recv_message, zygote_registry_path, \
+    read_zygote_registry
 from traceback import format_exception
 import openvsp_config
 # Import the low-level C/C++ module
@@ -43,6 +43,61 @@ def _exception_hook(exc_type, exc_value, tb):
     for line in regular_traceback:
         print(line)
 
+def _python_exe():
+    if "python" in os.path.basename(sys.executable):
+        return sys.executable
+    elif "python" in os.path.basename(os.__file__):
+        return os.__file__
+    return "python"
+def _server_file():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'facade_server.py')
+def _ready_pipe():
+    # returns the pipe, the token the child uses to open the write end and the Popen kwargs that let it inherit it
+    r, w = os.pipe()
+    if sys.platform == 'win32':
+        import msvcrt
+        handle = msvcrt.get_osfhandle(w)
+        os.set_handle_inheritable(handle, True)
+        return r, w, str(handle), {"close_fds": False}
+    return r, w, str(w), {"pass_fds": (w,)}
+def _start_zygote():
+    r, w, token, popen_kwargs = _ready_pipe()
+    try:
+        subprocess.Popen([_python_exe(), _server_file(), "0", str(openvsp_config.LOAD_GRAPHICS), "--zygote", "--ready-fd", token,
+                          "--registry", zygote_registry_path()],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True, **popen_kwargs)
+        os.close(w)
+        w = None
+        read_ready(r)
+    finally:
+        os.close(r)
+        if w is not None:
+            os.close(w)
+def _zygote_request(request, start=True):
+    """
+    Sends a request to the facade zygote, starting one if none is advertised or the advertised one is gone
+
+    :param request: tuple of command name and arguments, see facade_server._Zygote
+    :param start: start a zygote if none is reachable
+    :return: reply dictionary
+    """
+    for attempt in range(2):
+        try:
+            registry = read_zygote_registry()
+            with socket.create_connection(('localhost', registry["port"])) as sock:
+                send_message(sock, {"token": registry["token"], "request": list(request)})
+                reply = recv_message(sock)
+            break
+        except PermissionError:
+            # a registry planted by another user, never start a zygote over it
+            raise
+        except (OSError, ValueError, KeyError, EOFError):
+            if attempt or not start:
+                raise
+            _start_zygote()
+    if isinstance(reply, dict) and "error" in reply:
+        raise RuntimeError(reply["error"])
+    return reply
 class _vsp_server():
     def __init__(self, name, funcs=[], port=-1):
         self.server_name = name
@@ -51,42 +106,17 @@ class _vsp_server():
             self.port = port
         else:
             self.port = 0
-        python_exe = None
-        if "python" in os.path.basename(sys.executable):
-            python_exe = sys.executable
-        elif "python" in os.path.basename(os.__file__):
-            python_exe = os.__file__
-        else:
-            python_exe = "python"
-        server_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'facade_server.py')
-        for i in range(openvsp_config.FACADE_SERVER_ATTEMPTS):
+        self._proc = None
+        self._zygote = False
+        if getattr(openvsp_config, "FACADE_ZYGOTE", False) and hasattr(os, "fork"):
             try:
-                self._proc = subprocess.Popen([python_exe, server_file, str(self.port), str(openvsp_config.LOAD_GRAPHICS)], stderr=subprocess.PIPE)
-                start_time = time()
-                timeout = openvsp_config.FACADE_SERVER_TIMEOUT  # seconds
-                while True:
-                    line = self._proc.stderr.readline().strip().decode()
-                    # print(line)
-                    if not line:
-                        if self._proc.poll() is not None:
-                            raise RuntimeError("Server process exited unexpectedly")
-                        if time() - start_time > timeout:
-                            raise TimeoutError("Waiting for server timed out")
-                        continue  # No line, but process still alive wait more
-
-                    if line.startswith("Server Socket Thread: Bound to"):
-                        self.port = int(line.split()[6][:-2])
-                        break
-                break
+                reply = _zygote_request(("acquire", name, self.port))
+                self.port = reply["port"]
+                self._zygote = True
             except Exception as e:
-                print(f'Failed to start server, attempt {i+1}, trying again; "{str(e)}"')
-                try:
-                    self._proc.close()
-                    self._proc = None
-                except:
-                    pass
-        if self._proc is None:
-            raise RuntimeError("Facade failed to start the server")
+                print(f'Failed to get server "{name}" from the zygote, starting a new process; "{str(e)}"')
+        if not self._zygote:
+            self._start_process()
         self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._sock.connect((HOST, self.port))
 
@@ -4210,6 +4240,30 @@ class _vsp_server():
     # Register Matrix4d in _vsp:
     
 
+    def _start_process(self):
+        for i in range(openvsp_config.FACADE_SERVER_ATTEMPTS):
+            r, w, token, popen_kwargs = _ready_pipe()
+            try:
+                self._proc = subprocess.Popen([_python_exe(), _server_file(), str(self.port), str(openvsp_config.LOAD_GRAPHICS), "--ready-fd", token], **popen_kwargs)
+                os.close(w)
+                w = None
+                # blocks until the server has bound its socket, a dead server closes the pipe
+                self.port = read_ready(r)
+                break
+            except Exception as e:
+                print(f'Failed to start server, attempt {i+1}, trying again; "{str(e)}"')
+                try:
+                    self._proc.kill()
+                except:
+                    pass
+                self._proc = None
+            finally:
+                os.close(r)
+                if w is not None:
+                    os.close(w)
+        if self._proc is None:
+            raise RuntimeError("Facade failed to start the server")
+
     # function to send and receive data from the facade server
     def _send_receive(self, func_name, args, kwargs):
         b_data = pack_data([func_name, args, kwargs], True)
@@ -4230,6 +4284,12 @@ class _vsp_server():
             raise Exception(result[1])
         return result
 
+    def GetResultsTree(self, res_id, fields=None, children=()):
+        """
+        Parses a results tree on the server in a single request, see openvsp.utilities.parse_results_tree
+        """
+        return self._send_receive('GetResultsTree', [res_id, fields, children], {})
+
     def IsFacade(self):
         """
         Returns True if the facade API is in use.
@@ -4268,6 +4328,15 @@ class _vsp_server():
             self._proc.terminate()
         except:
             pass
+        self._detach_server()
+        if self._zygote:
+            try:
+                _zygote_request(("release", self.server_name), start=False)
+            except Exception:
+                pass
+
+    def _detach_server(self):
+        # without the socket a zygote server goes back to idle and can be reattached by name
         try:
             self._sock.shutdown(socket.SHUT_RDWR)
             self._sock.close()
@@ -4349,6 +4418,25 @@ class _server_controller():
         self._name_to_server[server_name]._close_server()
         del self._name_to_server[server_name]
 
+    def detach_vsp_instance(self, name):
+        """
+        Disconnects from a server without stopping it.  With openvsp_config.FACADE_ZYGOTE the server stays idle
+        and a later start_vsp_instance with the same name, from this or another client, reattaches to it.
+        """
+        if name == "vsp_singleton":
+            print("Can't detach vsp_singleton")
+            return
+        server_port = self._name_to_port.pop(name)
+        self._port_to_name.pop(server_port)
+        self._name_to_server[name]._detach_server()
+        del self._name_to_server[name]
+
+    def list_zygote_instances(self):
+        """
+        Lists the servers forked by the facade zygote as {name: {"port", "pid", "idle"}}
+        """
+        return _zygote_request(("list",), start=False)
+
     def set_functions(self, funcs):
         self.funcs = funcs
 
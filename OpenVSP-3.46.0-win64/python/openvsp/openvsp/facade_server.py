@@ -1,9 +1,19 @@
 
 from threading import Thread, Event
+import hmac
 import pickle
+import secrets
+import select
+import stat
 import traceback
+import struct
+import json
+import os
+import signal
+import socket
 import sys
-from time import sleep
+import tempfile
+from time import sleep, time
 
 #special code that is not generalizable
 import openvsp_config
@@ -17,7 +27,8 @@ import openvsp as module
 HOST = 'localhost'
 try:
     PORT = int(sys.argv[1])
-except IndexError:
+except (IndexError, ValueError):
+    # imported by a client or test runner rather than started as a server
     PORT = 0
 event = Event()
 global gui_wait
@@ -97,103 +108,284 @@ def unpack_data(b_data, is_command_list=False):
 
     return new_data
 
-def start_server():
-    import socket
+def open_ready_pipe(token):
+    """
+    Opens the write end of a readiness pipe handed to this process by its parent
+
+    :param token: file descriptor (POSIX) or inheritable OS handle (Windows) given on the command line
+    :return: unbuffered binary file object
+    """
+    if sys.platform == 'win32':
+        import msvcrt
+        fd = msvcrt.open_osfhandle(int(token), os.O_WRONLY)
+    else:
+        fd = int(token)
+    return os.fdopen(fd, 'wb', buffering=0)
+
+def write_ready(ready, port):
+    """
+    Reports that a server is bound and listening by writing its port to a readiness pipe
+
+    :param ready: writable binary file object
+    :param port: port the server socket is bound to
+    """
+    ready.write(struct.pack("!H", port))
+    ready.flush()
+
+def read_ready(fd, timeout=None):
+    """
+    Blocks until a server reports its port over a readiness pipe
+
+    :param fd: read end of the readiness pipe
+    :param timeout: seconds to wait for the port, defaults to openvsp_config.FACADE_SERVER_TIMEOUT. None waits forever
+    :return: port the server is listening on
+    """
+    if timeout is None:
+        timeout = openvsp_config.FACADE_SERVER_TIMEOUT
+    deadline = None if timeout is None else time() + timeout
+    b_port = b""
+    while len(b_port) < 2:
+        remaining = None if deadline is None else max(0.0, deadline - time())
+        if not _wait_readable(fd, remaining):
+            raise TimeoutError("Waiting for server timed out")
+        chunk = os.read(fd, 2 - len(b_port))
+        if not chunk:
+            raise RuntimeError("Server process exited unexpectedly")
+        b_port += chunk
+    return struct.unpack("!H", b_port)[0]
+
+def _wait_readable(fd, timeout):
+    """
+    Waits until a pipe has data or is closed
+
+    :return: False if timeout seconds passed first
+    """
+    if sys.platform != 'win32':
+        return bool(select.select([fd], [], [], timeout)[0])
+
+    # select only supports sockets on Windows, peek at the pipe instead
+    import msvcrt
+    import ctypes
+    from ctypes import wintypes
+    handle = msvcrt.get_osfhandle(fd)
+    available = wintypes.DWORD()
+    deadline = None if timeout is None else time() + timeout
+    while True:
+        if not ctypes.windll.kernel32.PeekNamedPipe(handle, None, 0, None, ctypes.byref(available), None) \
+                or available.value > 0:
+            # a failed peek means the write end was closed, os.read will report it
+            return True
+        if deadline is not None and time() >= deadline:
+            return False
+        sleep(0.01)
+
+ZYGOTE_MAX_MESSAGE = 2**20
+
+def send_message(sock, obj):
+    """
+    Sends a length prefixed JSON message over a socket, used for the zygote control protocol
+    """
+    b_obj = json.dumps(obj).encode()
+    sock.sendall(struct.pack("!I", len(b_obj)) + b_obj)
+
+def recv_message(sock):
+    """
+    Receives a message sent with :func:`send_message`
+    """
+    def recv_exact(n):
+        b_data = b""
+        while len(b_data) < n:
+            packet = sock.recv(n - len(b_data))
+            if not packet:
+                raise EOFError("Socket closed before the full message was received")
+            b_data += packet
+        return b_data
+    size = struct.unpack("!I", recv_exact(4))[0]
+    if size > ZYGOTE_MAX_MESSAGE:
+        raise ValueError(f"Zygote message of {size} bytes is too large")
+    return json.loads(recv_exact(size).decode())
+
+def _check_private(path, st):
+    # the registry grants control of the user's servers, so it must not be planted or read by another user
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(f"{path} must be owned by the current user and not accessible by other users")
+
+def _private_dir():
+    """
+    Gets a directory in the temp directory that only the current user can access, creating it if needed
+    """
+    path = os.path.join(tempfile.gettempdir(), "openvsp_facade_%d" % os.getuid())
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    _check_private(path, st)
+    return path
+
+def zygote_registry_path():
+    """
+    Gets the path of the file a zygote uses to advertise its control port and token
+
+    :return: :attr:`openvsp_config.FACADE_ZYGOTE_REGISTRY` if set, otherwise a file in a per user directory with mode
+        0700 in the temp directory
+    """
+    path = getattr(openvsp_config, "FACADE_ZYGOTE_REGISTRY", None)
+    if path:
+        return path
+    return os.path.join(_private_dir(), "zygote.json")
+
+def read_zygote_registry(path=None):
+    """
+    Reads the port, pid and token a zygote advertises
+
+    :param path: registry file, defaults to :func:`zygote_registry_path`
+    :return: dictionary with "port", "pid" and "token"
+    :raises PermissionError: if the file is not owned by the current user or is accessible by other users
+    """
+    if path is None:
+        path = zygote_registry_path()
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    with os.fdopen(fd) as f:
+        _check_private(path, os.fstat(f.fileno()))
+        return json.load(f)
+
+def _write_zygote_registry(path, registry):
+    tmp = path + ".tmp%d" % os.getpid()
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(registry, f)
+    os.replace(tmp, path)
+
+def _server_function(func_name):
+    # functions that run next to the results manager so bulk requests take a single round trip
+    if func_name == 'GetResultsTree':
+        from openvsp.utilities import _results_tree
+        return lambda *args, **kwargs: _results_tree(module, *args, **kwargs)
+    return getattr(module, func_name)
+
+def _serve_connection(conn, addr):
     global gui_active
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        s.bind((HOST, PORT))
-        s.listen()
-        print(f"Server Socket Thread: Bound to {s.getsockname()}. Listening...", file=sys.stderr)
-        conn, addr = s.accept()
-        with conn:
-            print("Server Socket Thread: Connected by %s, %s"%(addr[0], addr[1]))
+    with conn:
+        print("Server Socket Thread: Connected by %s, %s"%(addr[0], addr[1]))
+        while True:
+            b_data = []
+            data = []
+            # Wait for command
             while True:
-                b_data = []
-                data = []
-                # Wait for command
-                while True:
-                    try:
-                        packet = conn.recv(1024)
-                    except ConnectionResetError:
-                        print("Socket ConnectionResetError")
-                        break
-                    if not packet: break
-                    b_data.append(packet)
-                    try:
-                        data = unpack_data(b_data, is_command_list=True)
-                        break
-                    except (pickle.UnpicklingError, EOFError):
-                        pass
-                if b_data == [] or data == []:
-                    print("Server Socket Thread: Unable to receive data from socket, closing server.")
+                try:
+                    packet = conn.recv(1024)
+                except ConnectionResetError:
+                    print("Socket ConnectionResetError")
+                    break
+                if not packet: break
+                b_data.append(packet)
+                try:
+                    data = unpack_data(b_data, is_command_list=True)
                     break
+                except (pickle.UnpicklingError, EOFError):
+                    pass
+            if b_data == [] or data == []:
+                print("Server Socket Thread: Unable to receive data from socket, closing server.")
+                break
 
-                # Special functionality for StartGUI
-                if data[0] == 'StartGUI':
-                    if debug:
-                        print("Server Socket Thread: StartGUI called")
-                    if debug and event.is_set():
-                        print("Server Socket Thread: The OpenVSP GUI should already be running")
-                    result = 0
-                    b_result = pack_data(result)
-                    event.set()
-                    if module.IsGUIBuild():
-                        while not module.IsEventLoopRunning():
-                            sleep(.01)
-
-                # Special functionality for StopGUI
-                elif data[0] == 'StopGUI':
-                    if debug and not event.is_set():
-                        print("Server Socket Thread: The OpenVSP GUI is not running")
-                    if debug:
-                        print("Server Socket Thread: About to call StopGUI()")
-                    if module.IsEventLoopRunning():
-                        module.StopGUI()
-                    gui_active = False
+            # Special functionality for StartGUI
+            if data[0] == 'StartGUI':
+                if debug:
+                    print("Server Socket Thread: StartGUI called")
+                if debug and event.is_set():
+                    print("Server Socket Thread: The OpenVSP GUI should already be running")
+                result = 0
+                b_result = pack_data(result)
+                event.set()
+                if module.IsGUIBuild():
+                    while not module.IsEventLoopRunning():
+                        sleep(.01)
+
+            # Special functionality for StopGUI
+            elif data[0] == 'StopGUI':
+                if debug and not event.is_set():
+                    print("Server Socket Thread: The OpenVSP GUI is not running")
+                if debug:
+                    print("Server Socket Thread: About to call StopGUI()")
+                if module.IsEventLoopRunning():
+                    module.StopGUI()
+                gui_active = False
+                if debug:
+                    print("Server Socket Thread: After StopGUI() called")
+                result = 0
+                b_result = pack_data(result)
+
+            # Special functionality for IsGUIRunning
+            elif data[0] == 'IsGUIRunning':
+                result = gui_active
+                b_result = pack_data(result)
+
+            # Regular functionality
+            else:
+                func_name = data[0]
+                args = data[1]
+                kwargs = data[2]
+                foo = _server_function(func_name)
+                try:
                     if debug:
-                        print("Server Socket Thread: After StopGUI() called")
-                    result = 0
-                    b_result = pack_data(result)
-
-                # Special functionality for IsGUIRunning
-                elif data[0] == 'IsGUIRunning':
-                    result = gui_active
-                    b_result = pack_data(result)
-
-                # Regular functionality
-                else:
-                    func_name = data[0]
-                    args = data[1]
-                    kwargs = data[2]
-                    foo = getattr(module, func_name)
-                    try:
+                        print("Server Socket Thread: A1 Waiting for Lock")
+                    if gui_active:
+                        module.Lock()
                         if debug:
-                            print("Server Socket Thread: A1 Waiting for Lock")
-                        if gui_active:
-                            module.Lock()
-                            if debug:
-                                print("Server Socket Thread: A2 Lock obtained")
-                        result = foo(*args, **kwargs)
-                        if debug:
-                            print("Server Socket Thread: A3 VSP function called")
-                        if gui_active:
-                            module.Unlock()
-                            if debug:
-                                print("Server Socket Thread: A4 Lock released")
-                    except Exception as e:
-                        exc_info = sys.exc_info()
-                        result = ["error", ''.join(traceback.format_exception(*exc_info))]
-                    b_result = pack_data(result)
-
-                # Try to send response back
-                try:
+                            print("Server Socket Thread: A2 Lock obtained")
+                    result = foo(*args, **kwargs)
                     if debug:
-                        print("Server Socket Thread: sending data back")
-                    conn.sendall(b_result)
-                except (ConnectionResetError, BrokenPipeError) as e:
-                    print("Server Socket Thread: Unable to send data to socket, closing server.")
-                    break
+                        print("Server Socket Thread: A3 VSP function called")
+                    if gui_active:
+                        module.Unlock()
+                        if debug:
+                            print("Server Socket Thread: A4 Lock released")
+                except Exception as e:
+                    exc_info = sys.exc_info()
+                    result = ["error", ''.join(traceback.format_exception(*exc_info))]
+                b_result = pack_data(result)
+
+            # Try to send response back
+            try:
+                if debug:
+                    print("Server Socket Thread: sending data back")
+                conn.sendall(b_result)
+            except (ConnectionResetError, BrokenPipeError) as e:
+                print("Server Socket Thread: Unable to send data to socket, closing server.")
+                break
+
+
+def start_server(port=None, ready=None, persistent=False, status=None):
+    """
+    Runs the facade socket server
+
+    :param port: port to bind, defaults to the port given on the command line
+    :param ready: optional writable file object, the bound port is written to it once the server is listening
+    :param persistent: if True, go back to listening after a client disconnects so a client can reattach later
+    :param status: optional writable file object, b"B" is written when a client connects and b"I" when it leaves
+    """
+    if port is None:
+        port = PORT
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind((HOST, port))
+        s.listen()
+        print(f"Server Socket Thread: Bound to {s.getsockname()}. Listening...", file=sys.stderr)
+        if ready is not None:
+            write_ready(ready, s.getsockname()[1])
+            ready.close()
+        while True:
+            conn, addr = s.accept()
+            if status is not None:
+                status.write(b"B")
+            _serve_connection(conn, addr)
+            if status is not None:
+                status.write(b"I")
+            if not persistent:
+                break
 
     print("Server Socket Thread: server closing")
     global gui_wait
@@ -202,9 +394,14 @@ def start_server():
     module.StopGUI()
     print("Server Socket Thread: End of thread")
 
+def run_server(port=None, ready=None, persistent=False, status=None):
+    """
+    Starts the socket thread and runs the GUI loop on the calling thread until the server closes
 
-if __name__ == "__main__":
-    t = Thread(target=start_server, args=())
+    See :func:`start_server` for the parameters
+    """
+    global gui_active
+    t = Thread(target=start_server, args=(port, ready, persistent, status))
     t.start()
     module.Lock()
     module.Unlock()
@@ -220,3 +417,155 @@ if __name__ == "__main__":
         event.clear()
     print("Server GUI Thread: End of thread")
 
+
+class _Zygote():
+    """
+    Warm process that has already imported the OpenVSP module and forks ready facade servers on demand.
+
+    Forked servers are persistent and registered by name, so a client that restarts can reattach to its idle
+    server instead of paying the module import again.  Requests arrive as JSON on a localhost control socket whose
+    port is advertised in :func:`zygote_registry_path`, together with a random token every request must carry.
+    POSIX only, since it relies on os.fork.
+    """
+    def __init__(self):
+        self.servers = {}
+
+    def serve(self, ready=None, registry=None):
+        if registry is None:
+            registry = zygote_registry_path()
+        token = secrets.token_hex(32)
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind((HOST, 0))
+            s.listen()
+            port = s.getsockname()[1]
+            _write_zygote_registry(registry, {"pid": os.getpid(), "port": port, "token": token})
+            if ready is not None:
+                write_ready(ready, port)
+                ready.close()
+            running = True
+            while running:
+                conn, addr = s.accept()
+                with conn:
+                    try:
+                        message = recv_message(conn)
+                    except (EOFError, ConnectionError, ValueError):
+                        continue
+                    if not isinstance(message, dict) or \
+                            not hmac.compare_digest(str(message.get("token", "")), token):
+                        reply = {"error": "Zygote request with a missing or wrong token refused"}
+                    else:
+                        self._reap()
+                        try:
+                            reply, running = self._handle(message["request"], s, conn)
+                        except Exception:
+                            reply = {"error": traceback.format_exc()}
+                    try:
+                        send_message(conn, reply)
+                    except (ConnectionError, BrokenPipeError):
+                        pass
+        for name in list(self.servers):
+            self._release(name)
+        try:
+            if read_zygote_registry(registry).get("pid") == os.getpid():
+                os.remove(registry)
+        except (OSError, ValueError):
+            pass
+
+    def _handle(self, request, listener, conn):
+        command = request[0]
+        if command == "acquire":
+            name, port = request[1], request[2]
+            server = self.servers.get(name)
+            if server is not None:
+                self._update_state(server)
+                if server["state"] != "I":
+                    return {"error": f"Server with name {name} is busy"}, True
+                server["state"] = "B"
+                return {"port": server["port"], "pid": server["pid"], "reused": True}, True
+            server = self._fork_server(name, port, listener, conn)
+            return {"port": server["port"], "pid": server["pid"], "reused": False}, True
+        elif command == "release":
+            self._release(request[1])
+            return {}, True
+        elif command == "list":
+            servers = {}
+            for name, server in self.servers.items():
+                self._update_state(server)
+                servers[name] = {"port": server["port"], "pid": server["pid"], "idle": server["state"] == "I"}
+            return servers, True
+        elif command == "shutdown":
+            return {}, False
+        return {"error": f"Unknown zygote command {command}"}, True
+
+    def _fork_server(self, name, port, listener, conn):
+        r_ready, w_ready = os.pipe()
+        r_status, w_status = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # forked server, drop everything that belongs to the zygote
+            try:
+                listener.close()
+                conn.close()
+                os.close(r_ready)
+                os.close(r_status)
+                for server in self.servers.values():
+                    os.close(server["status"])
+                run_server(port if port > 0 else 0, ready=os.fdopen(w_ready, 'wb', buffering=0),
+                           persistent=True, status=os.fdopen(w_status, 'wb', buffering=0))
+            finally:
+                os._exit(0)
+        os.close(w_ready)
+        os.close(w_status)
+        try:
+            server_port = read_ready(r_ready)
+        finally:
+            os.close(r_ready)
+        os.set_blocking(r_status, False)
+        server = {"pid": pid, "port": server_port, "status": r_status, "state": "B"}
+        self.servers[name] = server
+        return server
+
+    def _update_state(self, server):
+        while True:
+            try:
+                b_state = os.read(server["status"], 1024)
+            except BlockingIOError:
+                return
+            if not b_state:
+                server["state"] = "X"
+                return
+            server["state"] = b_state[-1:].decode()
+
+    def _release(self, name):
+        server = self.servers.pop(name, None)
+        if server is None:
+            return
+        try:
+            os.kill(server["pid"], signal.SIGTERM)
+            os.waitpid(server["pid"], 0)
+        except (OSError, ChildProcessError):
+            pass
+        os.close(server["status"])
+
+    def _reap(self):
+        for name, server in list(self.servers.items()):
+            try:
+                pid, _ = os.waitpid(server["pid"], os.WNOHANG)
+            except ChildProcessError:
+                pid = server["pid"]
+            if pid:
+                os.close(server["status"])
+                del self.servers[name]
+
+
+if __name__ == "__main__":
+    ready = None
+    if "--ready-fd" in sys.argv:
+        ready = open_ready_pipe(sys.argv[sys.argv.index("--ready-fd") + 1])
+    if "--zygote" in sys.argv:
+        registry = None
+        if "--registry" in sys.argv:
+            registry = sys.argv[sys.argv.index("--registry") + 1]
+        _Zygote().serve(ready, registry)
+    else:
+        run_server(ready=ready)
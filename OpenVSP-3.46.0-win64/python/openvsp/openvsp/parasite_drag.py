@@ -19,6 +19,8 @@
 # THE SOFTWARE.
 
 import openvsp as vsp_module
+import numpy as np
+import warnings
 
 
 class ParasiteDragResults:
@@ -124,17 +126,277 @@ class ParasiteDragResults:
             return lambda v, a: intrp(v)
 
 
+class ParasiteDragSweepResults:
+    """
+    Columnar results of a parasite drag sweep over a grid of speeds and altitudes. Point data is stored in flat arrays
+    ordered speed by speed like :class:`ParasiteDragResults`, component data in (npoints, ncomp) arrays. Only the
+    fields needed to evaluate the sweep are kept.
+    """
+    def __init__(self, speeds, alts, columns):
+        """
+        Constructor
+        :param speeds: speeds of the sweep grid
+        :param alts: altitudes of the sweep grid
+        :param columns: dictionary of column name to values
+        """
+        self.speeds = np.asarray(speeds, dtype=float)
+        self.alts = np.asarray(alts, dtype=float)
+        self.incremental = False
+        """
+        True if the sweep was evaluated from a cached drag breakdown, False if every point was run by vsp
+        """
+        for name, value in columns.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def from_results(cls, speeds, alts, results):
+        """
+        Creates columnar results from the parsed results of every point of a sweep
+        :param speeds: speeds of the sweep grid
+        :param alts: altitudes of the sweep grid
+        :param results: list of parsed ParasiteDrag results objects, ordered speed by speed
+        :return: sweep results
+        """
+        columns = {name: np.array([getattr(r, key)[0] for r in results]) for name, key in _SWEEP_POINT_FIELDS}
+        columns.update({name: np.array([getattr(r, key) for r in results]) for name, key in _SWEEP_COMP_FIELDS})
+        columns.update({name: getattr(results[0], key) for name, key in _SWEEP_LABEL_FIELDS})
+        columns["Geom_CD_Total"] = columns["CD_Total"] - columns["Excres_CD_Total"]
+        return cls(speeds, alts, columns)
+
+    def grid(self, name):
+        """
+        Gets a point column reshaped to the sweep grid
+        :param name: name of the column, e.g. CD_Total
+        :return: (nspeeds, nalts) array, or (nspeeds, nalts, ncomp) for component columns
+        """
+        value = np.asarray(getattr(self, name))
+        return value.reshape((len(self.speeds), len(self.alts)) + value.shape[1:])
+
+    def plot(self, ax=None):
+        """
+        Creates plot of CD0 vs speed and altitude
+        """
+        import matplotlib.pyplot as plt
+
+        if ax is None:
+            plt.figure()
+            ax = plt.gca()
+
+        speed_order = np.argsort(self.speeds)
+        cd = self.grid("CD_Total")[speed_order]
+        for i, alt in enumerate(self.alts):
+            ax.plot(self.speeds[speed_order], cd[:, i], label=f"Alt = {alt:.0f}")
+
+        ax.set_xlabel(self.Vinf_Label[0])
+        ax.set_ylabel('CD_0')
+        ax.set_xlim(xmin=0.0)
+        ax.set_ylim(ymin=0.0)
+        return ax
+
+    def build_interpolator(self, name="CD_Total"):
+        """ Returns interpolator to interpolate results on the sweep grid as a function of speed and altitude """
+        from scipy.interpolate import RegularGridInterpolator, interp1d
+
+        speed_order = np.argsort(self.speeds)
+        alt_order = np.argsort(self.alts)
+        values = self.grid(name)[speed_order][:, alt_order]
+
+        if len(self.alts) > 1:
+            intrp = RegularGridInterpolator((self.speeds[speed_order], self.alts[alt_order]), values)
+            return lambda v, a: intrp(np.stack(np.broadcast_arrays(v, a), axis=-1))
+        else:
+            intrp = interp1d(self.speeds[speed_order], values[:, 0], axis=0)
+            return lambda v, a: intrp(v)
+
+
+# (attribute, result name) of the data copied from ParasiteDrag results by ParasiteDragSweepResults
+_SWEEP_POINT_FIELDS = (("Vinf", "FC_Vinf"), ("Alt", "FC_Alt"), ("Mach", "FC_Mach"), ("Rho", "FC_Rho"),
+                       ("Temp", "FC_Temp"), ("Pres", "FC_Pres"), ("Sref", "FC_Sref"), ("CD_Total", "Total_CD_Total"),
+                       ("Excres_CD_Total", "Excres_CD_Total"))
+_SWEEP_COMP_FIELDS = (("Comp_Re", "Comp_Re"), ("Comp_Cf", "Comp_Cf"), ("Comp_FFOut", "Comp_FFOut"),
+                      ("Comp_CD", "Comp_CD"))
+_SWEEP_LABEL_FIELDS = (("Comp_Label", "Comp_Label"), ("Comp_ID", "Comp_ID"), ("Comp_Swet", "Comp_Swet"),
+                       ("Comp_Lref", "Comp_Lref"), ("Comp_FineRat", "Comp_FineRat"), ("Comp_Q", "Comp_Q"),
+                       ("Comp_PercLam", "Comp_PercLam"), ("Vinf_Label", "Vinf_Label"), ("Alt_Label", "Alt_Label"),
+                       ("TurbCfEqnName", "TurbCfEqnName"), ("LamCfEqnName", "LamCfEqnName"))
+_SWEEP_FIELDS = tuple(key for fields in (_SWEEP_POINT_FIELDS, _SWEEP_COMP_FIELDS, _SWEEP_LABEL_FIELDS)
+                      for _, key in fields)
+
+
+def _cf_implicit(re, a, b):
+    # 1 / sqrt(Cf) = a * log10(Re * Cf) + b, solved by fixed point iteration on 1 / sqrt(Cf)
+    log_re = np.log10(re)
+    s = np.full_like(log_re, 20.0)
+    for _ in range(50):
+        s = a * (log_re - 2.0 * np.log10(s)) + b
+    return 1.0 / s ** 2
+
+
+# Skin friction equations by the name vsp reports in TurbCfEqnName and LamCfEqnName. The roughness, heat transfer and
+# Spalding-Chi equations depend on component inputs that are not part of the cached breakdown, so sweeps using them
+# are run point by point
+_TURB_CF_EQNS = {
+    "Explicit Fit of Spalding": lambda re, mach: 0.523 / np.log(0.06 * re) ** 2,
+    "Explicit Fit of Schoenherr": lambda re, mach: 1.0 / (3.46 * np.log10(re) - 5.6) ** 2,
+    "Implicit Schoenherr": lambda re, mach: _cf_implicit(re, 1.0 / 0.242, 0.0),
+    "Implicit Karman-Schoenherr": lambda re, mach: _cf_implicit(re, 4.15, 1.7),
+    "Power Law Blasius": lambda re, mach: 0.0592 * re ** -0.2,
+    "Power Law Prandtl Low Re": lambda re, mach: 0.074 * re ** -0.2,
+    "Power Law Prandtl Medium Re": lambda re, mach: 0.027 * re ** (-1.0 / 7.0),
+    "Power Law Prandtl High Re": lambda re, mach: 0.455 / np.log10(re) ** 2.58,
+    "Schlichting Compressible": lambda re, mach: 0.455 / np.log10(re) ** 2.58 / (1.0 + 0.144 * mach ** 2) ** 0.65,
+    "Schultz-Grunow Estimate of Schoenherr": lambda re, mach: 0.427 / (np.log10(re) - 0.407) ** 2.64,
+}
+_LAM_CF_EQNS = {
+    "Blasius": lambda re: 1.32824 / np.sqrt(re),
+}
+
+
+def _blended_cf(turb_cf, lam_cf, re, mach, perc_lam):
+    """ Skin friction of a partially laminar component, removing the turbulent skin friction of the laminar run """
+    frac_lam = perc_lam / 100.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cf = turb_cf(re, mach)
+        re_lam = re * frac_lam
+        lam = frac_lam > 0.0
+        cf = np.where(lam, cf - frac_lam * (turb_cf(np.where(lam, re_lam, 1.0), mach) -
+                                            lam_cf(np.where(lam, re_lam, 1.0))), cf)
+    return cf
+
+
+def _incremental_sweep(vsp, speeds, alts_ft, rtol=1e-6):
+    """
+    Evaluates a parasite drag sweep from one vsp run per altitude. At a fixed altitude the Reynolds and Mach numbers
+    scale with speed, so the skin friction of each component is evaluated for all speeds from the cached wetted areas,
+    reference lengths, form and interference factors of the reference runs.
+
+    :return: sweep results, or None with a warning if the cached breakdown does not reproduce the reference runs
+    """
+    speeds = np.asarray(speeds, dtype=float)
+    alts = np.asarray(alts_ft, dtype=float)
+
+    # Reference runs at the first speed of every altitude and the last speed of the first altitude
+    ref_points = [(speeds[0], alt) for alt in alts]
+    if len(speeds) > 1:
+        ref_points.append((speeds[-1], alts[0]))
+
+    refs = []
+    for i, (speed, alt) in enumerate(ref_points):
+        vsp.SetDoubleAnalysisInput("ParasiteDrag", "Vinf", [float(speed)])
+        vsp.SetDoubleAnalysisInput("ParasiteDrag", "Altitude", [float(alt)])
+        vsp.SetIntAnalysisInput("ParasiteDrag", "RecomputeGeom", [i == 0])
+        refs.append(vsp.parse_results_tree(vsp.ExecAnalysis("ParasiteDrag"), fields=_SWEEP_FIELDS))
+
+    comp = {name: np.asarray(getattr(refs[0], key), dtype=float) for name, key in _SWEEP_LABEL_FIELDS
+            if name in ("Comp_Swet", "Comp_Q", "Comp_PercLam")}
+    sref = refs[0].FC_Sref[0]
+    ref_speed = np.array([speed for speed, _ in ref_points])
+    ref_re = np.array([r.Comp_Re for r in refs], dtype=float)
+    ref_cf = np.array([r.Comp_Cf for r in refs], dtype=float)
+    ref_ff = np.array([r.Comp_FFOut for r in refs], dtype=float)
+    ref_mach = np.array([r.FC_Mach[0] for r in refs], dtype=float)
+    ref_total = np.array([r.Total_CD_Total[0] for r in refs], dtype=float)
+    ref_excres = np.array([r.Excres_CD_Total[0] for r in refs], dtype=float)
+    ref_geom = ref_total - ref_excres
+
+    # Form factors must not depend on Mach number
+    if not np.allclose(ref_ff, ref_ff[0], rtol=rtol, atol=0.0):
+        return _sweep_fallback("form factors depend on Mach number")
+    ff = ref_ff[0]
+
+    # Look up the skin friction equations vsp reports using, and check them against the reference runs
+    turb_name, lam_name = refs[0].TurbCfEqnName[0], refs[0].LamCfEqnName[0]
+    if turb_name not in _TURB_CF_EQNS:
+        return _sweep_fallback("turbulent skin friction equation '{}' is not supported".format(turb_name))
+    if lam_name not in _LAM_CF_EQNS:
+        return _sweep_fallback("laminar skin friction equation '{}' is not supported".format(lam_name))
+    cf_eqn = (_TURB_CF_EQNS[turb_name], _LAM_CF_EQNS[lam_name])
+    valid = np.all(np.isfinite(ref_re) & (ref_re > 0.0), axis=0)
+    cf = _blended_cf(*cf_eqn, ref_re[:, valid], ref_mach[:, None], comp["Comp_PercLam"][valid])
+    if not np.allclose(cf, ref_cf[:, valid], rtol=rtol, atol=0.0):
+        return _sweep_fallback("skin friction does not match the '{}' and '{}' equations".format(turb_name,
+                                                                                                  lam_name))
+
+    # Excrescence drag is either constant or proportional to the drag of the geometry
+    if np.allclose(ref_excres, ref_excres[0], rtol=rtol, atol=1e-12):
+        excres_scale = None
+    elif np.allclose(ref_excres / ref_geom, ref_excres[0] / ref_geom[0], rtol=rtol, atol=0.0):
+        excres_scale = ref_excres[0] / ref_geom[0]
+    else:
+        return _sweep_fallback("excrescence drag is neither constant nor proportional to the geometry drag")
+
+    def drag_buildup(re, mach):
+        cf = np.where(valid, _blended_cf(*cf_eqn, np.where(valid, re, 1.0), mach[..., None], comp["Comp_PercLam"]),
+                      ref_cf[0])
+        comp_cd = np.where(valid, cf * ff * comp["Comp_Q"] * comp["Comp_Swet"] / sref, 0.0)
+        geom_cd = comp_cd.sum(axis=-1)
+        excres_cd = geom_cd * excres_scale if excres_scale is not None else np.full_like(geom_cd, ref_excres[0])
+        return cf, comp_cd, geom_cd, excres_cd
+
+    # The breakdown must reproduce the reference runs
+    _, _, geom_cd, excres_cd = drag_buildup(ref_re, ref_mach)
+    if not np.allclose(geom_cd + excres_cd, ref_total, rtol=rtol, atol=1e-12):
+        return _sweep_fallback("the drag breakdown does not reproduce the total drag")
+
+    # Reynolds and Mach numbers of every point scale from the reference run of its altitude
+    scale = speeds[:, None] / ref_speed[:len(alts)][None, :]
+    re = ref_re[:len(alts)][None, :, :] * scale[..., None]
+    mach = ref_mach[:len(alts)][None, :] * scale
+    cf, comp_cd, geom_cd, excres_cd = drag_buildup(re, mach)
+
+    npoints = len(speeds) * len(alts)
+    ncomp = ref_re.shape[1]
+
+    def per_point(values):
+        return np.broadcast_to(np.asarray(values, dtype=float)[None, :len(alts)], (len(speeds), len(alts))).ravel()
+
+    columns = {
+        "Vinf": np.repeat(speeds, len(alts)),
+        "Alt": np.tile(alts, len(speeds)),
+        "Mach": mach.ravel(),
+        "Rho": per_point([r.FC_Rho[0] for r in refs]),
+        "Temp": per_point([r.FC_Temp[0] for r in refs]),
+        "Pres": per_point([r.FC_Pres[0] for r in refs]),
+        "Sref": np.full(npoints, sref),
+        "CD_Total": (geom_cd + excres_cd).ravel(),
+        "Geom_CD_Total": geom_cd.ravel(),
+        "Excres_CD_Total": excres_cd.ravel(),
+        "Comp_Re": re.reshape(npoints, ncomp),
+        "Comp_Cf": cf.reshape(npoints, ncomp),
+        "Comp_FFOut": np.broadcast_to(ff, (npoints, ncomp)),
+        "Comp_CD": comp_cd.reshape(npoints, ncomp),
+    }
+    columns.update({name: getattr(refs[0], key) for name, key in _SWEEP_LABEL_FIELDS})
+
+    results = ParasiteDragSweepResults(speeds, alts, columns)
+    results.incremental = True
+    return results
+
+
+def _sweep_fallback(reason):
+    warnings.warn("Incremental parasite drag sweep is not possible, running every point: {}".format(reason))
+    return None
+
+
 def parasitedrag_sweep(speeds, alts_ft, sref=None, length_unit=None,
-                       speed_unit=vsp_module.V_UNIT_MACH, set=None, vsp_instance=None):
+                       speed_unit=vsp_module.V_UNIT_MACH, set=None, incremental=False, vsp_instance=None):
     """
     Runs a parasite drag sweep over a range of speeds and altitudes. For subsonic data only.
 
+    In incremental mode the geometry and drag breakdown are computed by one vsp run per altitude and the whole
+    speed/altitude grid is evaluated from them. The breakdown is checked against the vsp runs; if the skin friction
+    equation is not supported, a form factor depends on Mach number or the excrescences are not constant or
+    proportional to the geometry drag, a warning is issued and every point is run by vsp instead.
+
     :param speeds: list of speeds to sweep over
     :param alts_ft: list of altitudes to sweep over
     :param speed_unit: units of speed array
     :param set: vsp geometry set to use for build up
     :param length_unit: length unit of the vsp model
     :param sref: reference area
+    :param incremental: if true, evaluates the sweep from a cached drag breakdown and returns
+        :class:`ParasiteDragSweepResults`. If that is not possible, every point is run and
+        :class:`ParasiteDragResults` are returned as without incremental
     :param vsp_instance: optional instance of vsp if using the multifacade
     :return: named tuple with results
     """
@@ -160,6 +422,11 @@ def parasitedrag_sweep(speeds, alts_ft, sref=None, length_unit=None,
 
     vsp.SetVSP3FileName('/dev/null')
 
+    if incremental:
+        sweep_results = _incremental_sweep(vsp, speeds, alts_ft)
+        if sweep_results is not None:
+            return sweep_results
+
     results = []
     first_val = True
     for speed in speeds:
@@ -19,6 +19,7 @@
 # THE SOFTWARE.
 
 import openvsp as vsp_module
+import numpy as np
 from typing import List
 
 
@@ -74,76 +75,203 @@ class SurfacePatch:
         self.nz = nz
 
 
-def export_surface_patches(export_set: int, remove_degenerate=True, vsp_instance=None):
+class SurfacePatchMesh:
+    def __init__(self, points, normals, offsets, shapes, comp_index, surf_index, patch_index, comp_ids, comp_names,
+                 surfaces):
+        """
+        Constructor for surface patches stored in one concatenated vertex/normal buffer
+        :param points: (N, 3) array of the grid points of all patches, each patch flattened in C order
+        :param normals: (N, 3) array of the normal vectors at the grid points
+        :param offsets: (npatch + 1) array, the points of patch i are points[offsets[i]:offsets[i + 1]]
+        :param shapes: list of the grid shape of each patch
+        :param comp_index: index into comp_ids of the vsp component each patch belongs to
+        :param surf_index: surf index each patch belongs to
+        :param patch_index: index of each patch in its parent surface
+        :param comp_ids: ids of the vsp components
+        :param comp_names: names of the vsp components
+        :param surfaces: list of (component index, surf index) of every surface, including surfaces without patches
+        """
+        self.points = points
+        self.normals = normals
+        self.offsets = offsets
+        self.shapes = shapes
+        self.comp_index = comp_index
+        self.surf_index = surf_index
+        self.patch_index = patch_index
+        self.comp_ids = comp_ids
+        self.comp_names = comp_names
+        self.surfaces = surfaces
+
+    def __len__(self):
+        return len(self.shapes)
+
+    @classmethod
+    def from_components(cls, components: List[SurfaceComponent]):
+        """
+        Packs a list of surface components into a mesh
+        :param components: list of surface components
+        :return: surface patch mesh
+        """
+        patches = []
+        comp_index = []
+        surfaces = []
+        for icomp, comp in enumerate(components):
+            for surf in comp.surfaces:
+                patches.extend(surf.patches)
+                comp_index.extend([icomp] * len(surf.patches))
+                surfaces.append((icomp, surf.surf_index))
+        return cls._from_patches(patches, comp_index, [comp.id for comp in components],
+                                 [comp.name for comp in components], surfaces)
+
+    @classmethod
+    def _from_patches(cls, patches, comp_index, comp_ids, comp_names, surfaces):
+        shapes = [np.shape(patch.x) for patch in patches]
+        sizes = np.array([int(np.prod(shape)) for shape in shapes], dtype=int)
+        offsets = np.zeros(len(patches) + 1, dtype=int)
+        np.cumsum(sizes, out=offsets[1:])
+
+        points = np.empty((offsets[-1], 3))
+        normals = np.empty((offsets[-1], 3))
+        if len(patches) > 0:
+            for i, name in enumerate(("x", "y", "z")):
+                points[:, i] = np.concatenate([np.ravel(getattr(patch, name)) for patch in patches])
+            for i, name in enumerate(("nx", "ny", "nz")):
+                normals[:, i] = np.concatenate([np.ravel(getattr(patch, name)) for patch in patches])
+
+        return cls(points, normals, offsets, shapes, np.array(comp_index, dtype=int),
+                   np.array([patch.surf_index for patch in patches], dtype=int),
+                   np.array([patch.patch_index for patch in patches], dtype=int), list(comp_ids), list(comp_names),
+                   list(surfaces))
+
+    def patch(self, i):
+        """
+        Gets a single patch, its coordinates and normals are views into the mesh buffers
+        :param i: index of the patch
+        :return: surface patch
+        """
+        start, end = self.offsets[i], self.offsets[i + 1]
+        shape = self.shapes[i]
+        return SurfacePatch(self.comp_ids[self.comp_index[i]], self.surf_index[i], self.patch_index[i],
+                            *[self.points[start:end, j].reshape(shape) for j in range(3)],
+                            *[self.normals[start:end, j].reshape(shape) for j in range(3)])
+
+    def components(self):
+        """
+        Builds the component/surface/patch hierarchy returned by export_surface_patches, patch coordinates and normals
+        are views into the mesh buffers
+        :return: list of surface components
+        """
+        patches = {}
+        for i in range(len(self)):
+            patches.setdefault((self.comp_index[i], self.surf_index[i]), []).append(self.patch(i))
+
+        surfaces = [[] for _ in self.comp_ids]
+        for icomp, surf_index in self.surfaces:
+            surfaces[icomp].append(Surface(self.comp_ids[icomp], surf_index, patches.get((icomp, surf_index), [])))
+
+        return [SurfaceComponent(comp_name, comp_id, comp_surfaces)
+                for comp_id, comp_name, comp_surfaces in zip(self.comp_ids, self.comp_names, surfaces)]
+
+    def faces(self):
+        """
+        Gets the quadrilateral faces of all patches
+        :return: (nfaces, 4) array of indices into points, and (nfaces) array of the patch index of each face
+        """
+        grid = np.array([shape if len(shape) == 2 else (int(np.prod(shape)), 1) for shape in self.shapes],
+                        dtype=int).reshape(-1, 2)
+        nfaces = np.maximum(grid[:, 0] - 1, 0) * np.maximum(grid[:, 1] - 1, 0)
+        face_patch = np.repeat(np.arange(len(grid)), nfaces)
+        local = np.arange(nfaces.sum()) - np.repeat(np.cumsum(nfaces) - nfaces, nfaces)
+
+        ncol = grid[face_patch, 1]
+        k = self.offsets[:-1][face_patch] + (local // (ncol - 1)) * ncol + local % (ncol - 1)
+        return np.stack((k, k + 1, k + ncol + 1, k + ncol), axis=-1), face_patch
+
+
+_SURFACE_PATCH_FIELDS = ("name", "id", "comp_id", "surf_index", "patch_index", "x", "y", "z", "nx", "ny", "nz")
+
+
+def export_surface_patch_mesh(export_set: int, remove_degenerate=True, vsp_instance=None):
     """
-    Function that export surfaces patches of current set
+    Function that export surfaces patches of current set into a single mesh
     :param export_set: vsp set to export
     :param remove_degenerate: if true, degenerate surface patches are removed
     :param vsp_instance: optional instance of vsp if using the multifacade
-    :return: list components with surface patches
+    :return: surface patch mesh
     """
     vsp = vsp_module.get_instance(vsp_instance)
 
-    import numpy as np
-
-    components = []
-
     vsp.SetIntAnalysisInput("SurfacePatches", "Set", [export_set])
     surf_patch_res_id = vsp.ExecAnalysis("SurfacePatches")
 
-    patch_results = vsp.parse_results_object(surf_patch_res_id)
-    comp_ids = patch_results.components
-    for comp_id in comp_ids:
-        comp_res = vsp.parse_results_object(comp_id)
-        surface_ids = comp_res.surfaces
-
-        surfaces = []
-        for surf_id in surface_ids:
-            surf_res = vsp.parse_results_object(surf_id)
-            patch_ids = surf_res.patches
-
-            patches = []
-            for patch_id in patch_ids:
-                patch_res = vsp.parse_results_object(patch_id)
-
-                add_patch = True
-                if remove_degenerate and (len(patch_res.x) <= 1 or len(patch_res.x[0]) <= 1):
-                    add_patch = False
+    patch_results = vsp.parse_results_tree(surf_patch_res_id, fields=_SURFACE_PATCH_FIELDS,
+                                           children=("components", "surfaces", "patches"))
+    patches = []
+    comp_index = []
+    comp_ids = []
+    comp_names = []
+    surfaces = []
+    for comp_res in patch_results.components:
+        if len(comp_res.surfaces) == 0:
+            continue
+        for surf_res in comp_res.surfaces:
+            surfaces.append((len(comp_ids), surf_res.surf_index[0]))
+            for patch_res in surf_res.patches:
+                if remove_degenerate and (patch_res.x.ndim < 2 or patch_res.x.shape[0] <= 1 or
+                                          patch_res.x.shape[1] <= 1):
+                    continue
+                patches.append(SurfacePatch(patch_res.comp_id[0], patch_res.surf_index[0], patch_res.patch_index[0],
+                                            patch_res.x, patch_res.y, patch_res.z,
+                                            patch_res.nx, patch_res.ny, patch_res.nz))
+                comp_index.append(len(comp_ids))
+        comp_ids.append(comp_res.id[0])
+        comp_names.append(comp_res.name[0])
 
-                if add_patch:
-                    patches.append(SurfacePatch(patch_res.comp_id[0], patch_res.surf_index[0], patch_res.patch_index[0],
-                                                np.array(patch_res.x), np.array(patch_res.y), np.array(patch_res.z),
-                                                np.array(patch_res.nx), np.array(patch_res.ny), np.array(patch_res.nz)))
+    return SurfacePatchMesh._from_patches(patches, comp_index, comp_ids, comp_names, surfaces)
 
-            surfaces.append(Surface(surf_res.comp_id[0], surf_res.surf_index[0], patches))
-        if len(surfaces) > 0:
-            components.append(SurfaceComponent(comp_res.name[0], comp_res.id[0], surfaces))
 
-    return components
+def export_surface_patches(export_set: int, remove_degenerate=True, vsp_instance=None):
+    """
+    Function that export surfaces patches of current set
+    :param export_set: vsp set to export
+    :param remove_degenerate: if true, degenerate surface patches are removed
+    :param vsp_instance: optional instance of vsp if using the multifacade
+    :return: list components with surface patches
+    """
+    return export_surface_patch_mesh(export_set, remove_degenerate=remove_degenerate,
+                                     vsp_instance=vsp_instance).components()
 
 
-def plot_surface_components(components: List[SurfaceComponent], plot_normals=True, quiver_len=0.2, vsp_instance=None):
+def plot_surface_components(components, plot_normals=True, quiver_len=0.2, max_normals=2000, vsp_instance=None):
     """
-    Plots a list of surface components
-    :param components: list of surface components to plot
+    Plots a list of surface components as a single merged mesh
+    :param components: list of surface components or a surface patch mesh to plot
     :param plot_normals: set to true to plot normal vectors, set to false to turn off normal vector plotting
+    :param quiver_len: length of the plotted normal vectors
+    :param max_normals: maximum number of normal vectors plotted, normals are decimated evenly over the mesh
     :param vsp_instance: optional instance of vsp if using the multifacade
     :return: handle to plotted figure
     """
     vsp = vsp_module.get_instance(vsp_instance)
-    import  matplotlib.pyplot as plt
-    from mpl_toolkits.mplot3d import Axes3D
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+    mesh = components if isinstance(components, SurfacePatchMesh) else SurfacePatchMesh.from_components(components)
 
     fig = plt.figure()
-    ax = fig.gca(projection='3d')
+    ax = fig.add_subplot(projection='3d')
+
+    faces, face_patch = mesh.faces()
+    colors = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+    face_colors = np.array(colors, dtype=object)[np.arange(len(mesh)) % len(colors)][face_patch]
+    ax.add_collection3d(Poly3DCollection(mesh.points[faces], facecolors=face_colors, edgecolors="none"))
 
-    for comp in components:
-        for surf in comp.surfaces:
-            for patch in surf.patches:
-                ax.plot_surface(patch.x, patch.y, patch.z)
-                if plot_normals:
-                    ax.quiver(patch.x, patch.y, patch.z, patch.nx, patch.ny, patch.nz, length=quiver_len)
+    if plot_normals and len(mesh.points) > 0:
+        index = np.unique(np.linspace(0, len(mesh.points) - 1, min(len(mesh.points), max_normals)).astype(int))
+        ax.quiver(*mesh.points[index].T, *mesh.normals[index].T, length=quiver_len)
 
+    if len(mesh.points) > 0:
+        ax.auto_scale_xyz(mesh.points[:, 0], mesh.points[:, 1], mesh.points[:, 2])
     vsp.set_3d_axis_equal(ax)
 
     return ax
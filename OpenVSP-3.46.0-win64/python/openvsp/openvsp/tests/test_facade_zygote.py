@@ -0,0 +1,102 @@
+# Copyright (c) 2020 Uber Technologies, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from unittest import TestCase, skipUnless
+import os
+import pickle
+import shutil
+import socket
+import tempfile
+import time
+
+import openvsp_config
+from openvsp.facade import _zygote_request
+from openvsp.facade_server import pack_data, unpack_data, send_message, recv_message, read_zygote_registry
+
+
+@skipUnless(hasattr(os, "fork"), "the facade zygote relies on os.fork")
+class TestFacadeZygote(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.registry = os.path.join(self.tmp, "zygote.json")
+        self._old_registry = openvsp_config.FACADE_ZYGOTE_REGISTRY
+        openvsp_config.FACADE_ZYGOTE_REGISTRY = self.registry
+
+    def tearDown(self):
+        try:
+            _zygote_request(("shutdown",), start=False)
+        except Exception:
+            pass
+        openvsp_config.FACADE_ZYGOTE_REGISTRY = self._old_registry
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def call(self, port, func_name):
+        with socket.create_connection(("localhost", port)) as sock:
+            sock.sendall(pack_data([func_name, (), {}], is_command_list=True))
+            b_result = []
+            while True:
+                b_result.append(sock.recv(1024))
+                try:
+                    return unpack_data(b_result)
+                except (pickle.UnpicklingError, EOFError):
+                    pass
+
+    def wait_idle(self, name, timeout=10.0):
+        deadline = time.time() + timeout
+        while not _zygote_request(("list",), start=False)[name]["idle"]:
+            self.assertLess(time.time(), deadline, "server did not go idle")
+            time.sleep(0.01)
+
+    def test_reattach(self):
+        first = _zygote_request(("acquire", "zygote_test", 0))
+        self.assertFalse(first["reused"])
+        self.assertEqual(0o600, os.stat(self.registry).st_mode & 0o777)
+        version = self.call(first["port"], "GetVSPVersion")
+
+        # a disconnected server goes idle and is handed out again by name
+        self.wait_idle("zygote_test")
+        second = _zygote_request(("acquire", "zygote_test", 0))
+        self.assertTrue(second["reused"])
+        self.assertEqual((first["pid"], first["port"]), (second["pid"], second["port"]))
+        self.assertEqual(version, self.call(second["port"], "GetVSPVersion"))
+
+        _zygote_request(("release", "zygote_test"))
+        self.assertEqual({}, _zygote_request(("list",)))
+
+        _zygote_request(("shutdown",))
+        deadline = time.time() + 10.0
+        while os.path.exists(self.registry):
+            self.assertLess(time.time(), deadline, "zygote did not remove its registry")
+            time.sleep(0.01)
+
+    def test_wrong_token(self):
+        _zygote_request(("list",))
+        with socket.create_connection(("localhost", read_zygote_registry()["port"])) as sock:
+            send_message(sock, {"token": "0" * 64, "request": ["shutdown"]})
+            self.assertIn("error", recv_message(sock))
+        self.assertEqual({}, _zygote_request(("list",), start=False))
+
+    def test_foreign_registry(self):
+        with open(self.registry, "w") as f:
+            f.write('{"pid": 1, "port": 1, "token": ""}')
+        os.chmod(self.registry, 0o644)
+        with self.assertRaises(PermissionError):
+            _zygote_request(("list",))
@@ -0,0 +1,156 @@
+# Copyright (c) 2020 Uber Technologies, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from types import SimpleNamespace
+from unittest import TestCase, mock
+import numpy.testing as npt
+import numpy as np
+
+from openvsp import parasite_drag
+from openvsp.parasite_drag import ParasiteDragResults, ParasiteDragSweepResults, _incremental_sweep
+
+
+class FakeResults(SimpleNamespace):
+    """
+    Parsed ParasiteDrag results, fields the fake does not compute read as a single empty value
+    """
+    def __getattr__(self, name):
+        return [0.0]
+
+
+class FakeVsp:
+    """
+    Stands in for vsp in a parasite drag sweep, computing the drag of three components with the Schlichting
+    compressible and Blasius skin friction equations
+    """
+    def __init__(self, turb_name="Schlichting Compressible", ff_mach=False):
+        self.turb_name = turb_name
+        self.ff_mach = ff_mach
+        self.inputs = {}
+        self.num_runs = 0
+
+    def SetIntAnalysisInput(self, analysis, name, value):
+        self.inputs[name] = value[0]
+
+    def SetDoubleAnalysisInput(self, analysis, name, value):
+        self.inputs[name] = value[0]
+
+    def SetStringAnalysisInput(self, analysis, name, value):
+        self.inputs[name] = value[0]
+
+    def SetAnalysisInputDefaults(self, analysis):
+        self.inputs = {}
+
+    def SetVSP3FileName(self, file_name):
+        pass
+
+    def ExecAnalysis(self, analysis):
+        self.num_runs += 1
+        return self.run(self.inputs["Vinf"], self.inputs["Altitude"])
+
+    def parse_results_tree(self, results, fields=None):
+        return results
+
+    def parse_results_object(self, results):
+        return results
+
+    def run(self, speed, alt):
+        nu = 1.57e-4 * (1.0 + alt / 40000.0)
+        mach = speed / (1116.0 - 0.004 * alt)
+        lref = np.array([10.0, 3.0, 2.0])
+        swet = np.array([200.0, 40.0, 20.0])
+        q = np.array([1.0, 1.1, 1.05])
+        perc_lam = np.array([0.0, 20.0, 0.0])
+        re = speed * lref / nu
+
+        def turb_cf(r):
+            return 0.455 / np.log10(r) ** 2.58 / (1.0 + 0.144 * mach ** 2) ** 0.65
+
+        frac_lam = perc_lam / 100.0
+        re_lam = np.where(frac_lam > 0.0, re * frac_lam, re)
+        cf = np.where(frac_lam > 0.0, turb_cf(re) - frac_lam * (turb_cf(re_lam) - 1.32824 / np.sqrt(re_lam)),
+                      turb_cf(re))
+        ff = np.array([1.2, 1.4, 1.1]) * (1.0 + 0.3 * mach ** 2 if self.ff_mach else 1.0)
+        sref = 100.0
+        comp_cd = cf * ff * q * swet / sref
+        excres = 0.002
+        return FakeResults(
+            FC_Vinf=[speed], FC_Alt=[alt], FC_Mach=[mach], FC_Rho=[0.0023769 * np.exp(-alt / 30000.0)],
+            FC_Temp=[518.67], FC_Pres=[2116.2], FC_Sref=[sref], Total_CD_Total=[comp_cd.sum() + excres],
+            Excres_CD_Total=[excres], Comp_Re=re, Comp_Cf=cf, Comp_FFOut=ff, Comp_CD=comp_cd,
+            Comp_Label=["Wing", "Pod", "Tail"], Comp_ID=["A", "B", "C"], Comp_Swet=swet, Comp_Lref=lref,
+            Comp_FineRat=np.array([0.1, 5.0, 0.1]), Comp_Q=q, Comp_PercLam=perc_lam, Vinf_Label=["Vinf (ft/s)"],
+            Alt_Label=["Alt (ft)"], TurbCfEqnName=[self.turb_name], LamCfEqnName=["Blasius"])
+
+
+class TestParasiteDrag(TestCase):
+    speeds = np.array([100.0, 150.0, 200.0, 250.0])
+    alts = np.array([0.0, 5000.0, 10000.0])
+
+    def test_incremental_sweep(self):
+        vsp = FakeVsp()
+        sweep = _incremental_sweep(vsp, self.speeds, self.alts)
+        self.assertTrue(sweep.incremental)
+        self.assertEqual(len(self.alts) + 1, vsp.num_runs)
+
+        expected = ParasiteDragSweepResults.from_results(
+            self.speeds, self.alts, [vsp.run(speed, alt) for speed in self.speeds for alt in self.alts])
+        for name in ("Vinf", "Alt", "Mach", "CD_Total", "Geom_CD_Total", "Comp_Re", "Comp_Cf", "Comp_CD"):
+            npt.assert_allclose(getattr(expected, name), getattr(sweep, name), rtol=1e-9, err_msg=name)
+        self.assertEqual(["Schlichting Compressible"], sweep.TurbCfEqnName)
+
+    def test_unsupported_cf_equation(self):
+        with self.assertWarns(UserWarning):
+            self.assertIsNone(_incremental_sweep(FakeVsp(turb_name="Roughness Schlichting Avg"), self.speeds,
+                                                 self.alts))
+
+    def test_mismatched_cf_equation(self):
+        with self.assertWarns(UserWarning):
+            self.assertIsNone(_incremental_sweep(FakeVsp(turb_name="Power Law Blasius"), self.speeds, self.alts))
+
+    def test_mach_dependent_form_factor(self):
+        with self.assertWarns(UserWarning):
+            self.assertIsNone(_incremental_sweep(FakeVsp(ff_mach=True), self.speeds, self.alts))
+
+    def sweep(self, vsp, incremental):
+        with mock.patch.object(parasite_drag.vsp_module, "get_instance", return_value=vsp):
+            return parasite_drag.parasitedrag_sweep(self.speeds, self.alts, incremental=incremental)
+
+    def test_parasitedrag_sweep(self):
+        sweep = self.sweep(FakeVsp(), incremental=True)
+        self.assertIsInstance(sweep, ParasiteDragSweepResults)
+        full = self.sweep(FakeVsp(), incremental=False)
+        self.assertIsInstance(full, ParasiteDragResults)
+        npt.assert_allclose(full.CD_Total, sweep.CD_Total, rtol=1e-9)
+        npt.assert_allclose(full.Vinf, sweep.Vinf)
+        npt.assert_allclose(np.reshape(full.CD_Total, (len(self.speeds), len(self.alts))), sweep.grid("CD_Total"),
+                            rtol=1e-9)
+        npt.assert_allclose(full.CD_Total[5], sweep.build_interpolator()(full.Vinf[5], full.Alt[5]), rtol=1e-9)
+
+    def test_parasitedrag_sweep_fallback(self):
+        vsp = FakeVsp(ff_mach=True)
+        with self.assertWarns(UserWarning):
+            results = self.sweep(vsp, incremental=True)
+        # every point is run and the results are the same as without incremental
+        self.assertIs(ParasiteDragResults, type(results))
+        self.assertLess(len(self.speeds) * len(self.alts), vsp.num_runs)
+        expected = self.sweep(FakeVsp(ff_mach=True), incremental=False)
+        self.assertEqual(vars(expected).keys(), vars(results).keys())
+        npt.assert_allclose(expected.CD_Total, results.CD_Total)
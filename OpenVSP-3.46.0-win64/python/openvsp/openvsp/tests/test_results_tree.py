@@ -0,0 +1,127 @@
+# Copyright (c) 2020 Uber Technologies, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from unittest import TestCase, mock
+import numpy.testing as npt
+
+from openvsp import utilities
+
+
+class FakeVec3d:
+    def __init__(self, x, y, z):
+        self._v = (x, y, z)
+
+    def x(self):
+        return self._v[0]
+
+    def y(self):
+        return self._v[1]
+
+    def z(self):
+        return self._v[2]
+
+
+class FakeResultsVsp:
+    """
+    Stands in for the vsp results manager with a parent result holding two child results
+    """
+    INT_DATA, DOUBLE_DATA, STRING_DATA, VEC3D_DATA, DOUBLE_MATRIX_DATA = range(5)
+
+    def __init__(self, facade=False):
+        self.facade = facade
+        self.calls = []
+        self.results = {
+            "parent": ("Parent", {
+                "Num": (self.INT_DATA, (1, 2)),
+                "Cl": (self.DOUBLE_DATA, (0.5, 0.6)),
+                "Label": (self.STRING_DATA, ("a", "b")),
+                "Points": (self.VEC3D_DATA, (FakeVec3d(1.0, 2.0, 3.0), FakeVec3d(4.0, 5.0, 6.0))),
+                "Mat": (self.DOUBLE_MATRIX_DATA, ((1.0, 2.0), (3.0, 4.0))),
+                "Ragged": (self.DOUBLE_MATRIX_DATA, ((1.0,), (2.0, 3.0))),
+                "Sections": (self.STRING_DATA, ("child0", "child1")),
+            }),
+            "child0": ("Section", {"Cl": (self.DOUBLE_DATA, (0.1,)), "Cd": (self.DOUBLE_DATA, (0.01,))}),
+            "child1": ("Section", {"Cl": (self.DOUBLE_DATA, (0.2,)), "Cd": (self.DOUBLE_DATA, (0.02,))}),
+        }
+
+    def _get(self, res_id, name):
+        self.calls.append((res_id, name))
+        return self.results[res_id][1][name][1]
+
+    def IsFacade(self):
+        return self.facade
+
+    def GetResultsTree(self, res_id, fields=None, children=()):
+        # what the facade server does next to the results manager
+        return utilities._results_tree(self, res_id, fields, children)
+
+    def GetResultsName(self, res_id):
+        return self.results[res_id][0]
+
+    def GetAllDataNames(self, res_id):
+        return list(self.results[res_id][1])
+
+    def GetResultsType(self, res_id, name):
+        return self.results[res_id][1][name][0]
+
+    GetIntResults = GetDoubleResults = GetStringResults = GetVec3dResults = GetDoubleMatResults = _get
+
+
+class TestResultsTree(TestCase):
+
+    def parse(self, vsp, *args, **kwargs):
+        with mock.patch.object(utilities.vsp_module, "get_instance", return_value=vsp):
+            return utilities.parse_results_tree(*args, **kwargs)
+
+    def test_all_fields(self):
+        res = self.parse(FakeResultsVsp(), "parent")
+        self.assertEqual("Parent", type(res).__name__)
+        npt.assert_array_equal([1, 2], res.Num)
+        npt.assert_allclose([0.5, 0.6], res.Cl)
+        self.assertEqual(["a", "b"], res.Label)
+        npt.assert_allclose([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], res.Points)
+        npt.assert_allclose([[1.0, 2.0], [3.0, 4.0]], res.Mat)
+        self.assertEqual(2, len(res.Ragged))
+        npt.assert_allclose([2.0, 3.0], res.Ragged[1])
+        # not listed as children, so the ids are returned as they are
+        self.assertEqual(["child0", "child1"], res.Sections)
+
+    def test_children(self):
+        res = self.parse(FakeResultsVsp(), "parent", children=["Sections"])
+        self.assertEqual(["Section", "Section"], [type(section).__name__ for section in res.Sections])
+        npt.assert_allclose([[0.1], [0.2]], [section.Cl for section in res.Sections])
+        npt.assert_allclose([0.02], res.Sections[1].Cd)
+
+    def test_fields(self):
+        vsp = FakeResultsVsp()
+        res = self.parse(vsp, "parent", fields=["Cl"], children=["Sections"])
+        # child fields are kept even though they are not whitelisted
+        self.assertEqual(("Cl", "Sections"), res._fields)
+        self.assertEqual(("Cl",), res.Sections[0]._fields)
+        npt.assert_allclose([0.2], res.Sections[1].Cl)
+        # data that is filtered out is never fetched
+        self.assertEqual({"Cl", "Sections"}, {name for _, name in vsp.calls})
+
+    def test_facade(self):
+        local = self.parse(FakeResultsVsp(), "parent", fields=("Cl", "Points"), children=("Sections",))
+        remote = self.parse(FakeResultsVsp(facade=True), "parent", fields=("Cl", "Points"), children=("Sections",))
+        self.assertEqual(local._fields, remote._fields)
+        npt.assert_allclose(local.Points, remote.Points)
+        npt.assert_allclose([s.Cl for s in local.Sections], [s.Cl for s in remote.Sections])
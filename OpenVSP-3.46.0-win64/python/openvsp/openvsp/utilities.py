@@ -105,6 +105,84 @@ def parse_results_object(res_id, vsp_instance=None):
     return res_tuple(*data)
 
 
+def _results_tree(vsp, res_id, fields=None, children=()):
+    """
+    Walks a results object and its children, returning plain python containers and numpy arrays so the tree can be
+    built next to the results manager and sent back in one piece.  See :func:`parse_results_tree`.
+
+    :return: (results name, dict of data name to value), child fields hold lists of the same
+    """
+    data = {}
+    for name in vsp.GetAllDataNames(res_id):
+        if fields is not None and name not in fields and name not in children:
+            continue
+        type = vsp.GetResultsType(res_id, name)
+        d = []
+        if type == vsp.INT_DATA:
+            d = np.array(vsp.GetIntResults(res_id, name), dtype=int)
+        elif type == vsp.STRING_DATA:
+            d = list(vsp.GetStringResults(res_id, name))
+            if name in children:
+                d = [_results_tree(vsp, child_id, fields, children) for child_id in d]
+        elif type == vsp.DOUBLE_DATA:
+            d = np.array(vsp.GetDoubleResults(res_id, name), dtype=float)
+        elif type == vsp.DOUBLE_MATRIX_DATA:
+            rows = vsp.GetDoubleMatResults(res_id, name)
+            try:
+                d = np.array(rows, dtype=float)
+            except ValueError:
+                # ragged matrix
+                d = [np.array(row, dtype=float) for row in rows]
+        elif type == vsp.VEC3D_DATA:
+            d = np.array([[v3d.x(), v3d.y(), v3d.z()] for v3d in vsp.GetVec3dResults(res_id, name)],
+                         dtype=float).reshape(-1, 3)
+        data[name] = d
+    return vsp.GetResultsName(res_id), data
+
+
+_results_tuples = {}
+
+
+def _results_tree_to_tuple(tree):
+    name, data = tree
+    names = tuple(data)
+    key = (name, names)
+    if key not in _results_tuples:
+        _results_tuples[key] = namedtuple(name, names)
+    values = []
+    for value in data.values():
+        if isinstance(value, list) and len(value) > 0 and isinstance(value[0], tuple):
+            value = [_results_tree_to_tuple(child) for child in value]
+        values.append(value)
+    return _results_tuples[key](*values)
+
+
+def parse_results_tree(res_id, fields=None, children=(), vsp_instance=None):
+    """
+    Bulk version of :func:`parse_results_object` that parses a results object and, recursively, the child results
+    named in children.  Numeric data is returned as numpy arrays: int and double data as 1-D arrays, double
+    matrices as 2-D arrays and vec3d data as (N, 3) arrays.  With the facade the whole tree is built by the server
+    and returned in a single request.
+
+    :param res_id: id of the results object to parse
+    :param fields: optional collection of data names to extract, other data is skipped. Child fields are always
+                   extracted
+    :param children: names of string data that hold child results ids, these are replaced by lists of parsed
+                     child results
+    :param vsp_instance: optional instance of vsp if using the multifacade
+    :return: named tuple of results values
+    """
+    vsp = vsp_module.get_instance(vsp_instance)
+    if fields is not None:
+        fields = tuple(fields)
+    children = tuple(children)
+    if vsp.IsFacade():
+        tree = vsp.GetResultsTree(res_id, fields, children)
+    else:
+        tree = _results_tree(vsp, res_id, fields, children)
+    return _results_tree_to_tuple(tree)
+
+
 def get_wing_reference_quantities(wing_name=None, wing_id=None, vsp_instance=None):
     """
     Gets wing reference area, reference span, and reference chord (sref, bref, cref) from the TotalArea, TotalSpan, and
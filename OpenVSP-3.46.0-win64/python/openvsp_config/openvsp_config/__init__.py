@@ -5,9 +5,18 @@ LOAD_GRAPHICS = False
 
 # Optional setting to specify facade port
 FACADE_PORT = -1
-FACADE_SERVER_TIMEOUT = .1
+# Seconds to wait for a started facade server to report its port before trying again
+FACADE_SERVER_TIMEOUT = 30.0
 FACADE_SERVER_ATTEMPTS = 10
 
+# Control whether facade servers are forked from a warm zygote process that has already imported OpenVSP.
+# Zygote servers outlive the client and can be reattached by name.  POSIX only.  Default to False.
+FACADE_ZYGOTE = False
+
+# Optional path of the file the zygote advertises its control port and token in. It must be owned by the user and not
+# accessible by others. Defaults to a file in a per user directory with mode 0700 in the temp directory
+FACADE_ZYGOTE_REGISTRY = None
+
 # Control whether facade remote access client version is loaded.  Default to False.
 LOAD_FACADE = False
 
@@ -18,7 +18,15 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import bisect
+import mmap
+import os
+import re
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import f90nml
+from f90nml.scanner import scan as _scan_namelist
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib
@@ -85,6 +93,7 @@ class loadsData:
 class surfData:
     def __init__(self):
         self.ntstep: int = 0
+        self.tsteps = []
         self.npatch: int = 0
         self.pnames = []
         self.ncol: np.ndarray = Field(default_factory=lambda: np.zeros())
@@ -121,7 +130,145 @@ class surfData:
         self.cp_center = []
 
 
+class PMARCFile:
+    """
+    Read only, memory mapped view of a PMARC output file. The byte offset of every occurrence of the section markers
+    is recorded in a single pass over the file, so sections are found with a lookup instead of a scan and parsed
+    directly from the buffer.
+
+    Like a file object, a cursor is kept; :meth:`find` moves it just past the next marker and :meth:`readline` reads
+    from it.
+    """
+
+    def __init__(self, fname, markers=()):
+        """
+
+        :param fname: path to the PMARC output file
+        :param markers: section marker strings to index up front, other markers are indexed when first searched for
+        """
+        self._file = open(fname, 'rb')
+        if os.fstat(self._file.fileno()).st_size > 0:
+            self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.buf = b''
+        self.pos = 0
+        self.offsets = {}
+        """
+        Dictionary of marker to sorted list of the byte offsets it starts at
+        """
+        self.index(markers)
+
+    def index(self, markers):
+        """
+        Records the byte offsets of all occurrences of markers in one pass over the file
+
+        :param markers: list of marker strings
+        """
+        markers = sorted({m.encode('latin-1') for m in markers if m and m not in self.offsets}, key=len, reverse=True)
+        if not markers:
+            return
+
+        # Markers may start inside a match of another marker (e.g. "WIND" in "WIND AXES"), the regex only reports
+        # the longest marker at each match, so these are checked explicitly.
+        overlaps = {m: [(s, o) for s in markers for o in range(len(m))
+                        if (o > 0 or s != m) and m[o:o + len(s)] == s[:len(m) - o]] for m in markers}
+
+        found = {m: [] for m in markers}
+        pattern = re.compile(b'|'.join(re.escape(m) for m in markers))
+        for match in pattern.finditer(self.buf):
+            m = match.group()
+            start = match.start()
+            found[m].append(start)
+            for s, o in overlaps[m]:
+                if self.buf[start + o:start + o + len(s)] == s:
+                    found[s].append(start + o)
+
+        for m, offsets in found.items():
+            self.offsets[m.decode('latin-1')] = sorted(set(offsets))
+
+    def find(self, marker):
+        """
+        Moves the cursor just past the next occurrence of marker
+
+        :param marker: section marker string
+        :return: new cursor position, -1 if the marker does not occur after the cursor
+        """
+        if marker not in self.offsets:
+            self.index([marker])
+        offsets = self.offsets.get(marker, [])
+        i = bisect.bisect_left(offsets, self.pos)
+        if i == len(offsets):
+            return -1
+        self.pos = offsets[i] + len(marker.encode('latin-1'))
+        return self.pos
+
+    def readline(self):
+        """
+        Reads from the cursor to the end of the line
+
+        :return: line including the newline, empty string at end of file
+        """
+        end = self.buf.find(b'\n', self.pos)
+        end = len(self.buf) if end == -1 else end + 1
+        line = self.buf[self.pos:end].decode('latin-1')
+        self.pos = end
+        return line
+
+    def read_lines(self, nlines):
+        """
+        Reads the next nlines lines in one block
+
+        :param nlines: number of lines
+        :return: bytes of the lines, including newlines
+        """
+        end = self._lines_end(nlines)
+        block = self.buf[self.pos:end]
+        self.pos = end
+        return block
+
+    def skip_lines(self, nlines):
+        """
+        Moves the cursor past the next nlines lines without parsing them
+
+        :param nlines: number of lines
+        """
+        self.pos = self._lines_end(nlines)
+
+    def _lines_end(self, nlines):
+        if nlines <= 0:
+            return self.pos
+        end = self.buf.find(b'\n', self.pos)
+        if end == -1:
+            return len(self.buf)
+
+        # Fortran records are usually fixed width, guess the end from the first line and check it
+        guess = self.pos + nlines * (end + 1 - self.pos)
+        if guess <= len(self.buf) and self.buf[guess - 1:guess] == b'\n' and \
+                self.buf[self.pos:guess].count(b'\n') == nlines:
+            return guess
+
+        for _ in range(nlines - 1):
+            end = self.buf.find(b'\n', end + 1)
+            if end == -1:
+                return len(self.buf)
+        return end + 1
+
+    def close(self):
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
 def pos_file_str(file, target_string):
+    if isinstance(file, PMARCFile):
+        return file.find(target_string)
+
     # Read the file character by character
     while True:
         char = file.read(1)
@@ -129,8 +276,7 @@ def pos_file_str(file, target_string):
 
         if not char:
             # End of file reached without finding the target string
-            return ld
-            break
+            return -1
 
         if char == target_string[0]:
 
@@ -142,28 +288,33 @@ def pos_file_str(file, target_string):
                 # print("Remaining contents of line:")
                 # print(remaining_contents)
                 return file.tell()
-                break
             else:
                 file.seek(lastpos)
 
 
+# Section markers of a PMARC loads file, indexed when the file is opened.
+_LOAD_DATA_MARKERS = ["NTSTPS", "ALDEG", "CBAR", "BASIC PATCH DATA", "SECTION PARAMETERS", "WIND",
+                      "FORCE AND MOMENT COEFFICIENTS", "WIND AXES", "TOTAL COEFFICIENTS", "CL", "TREFFTZ",
+                      "TOTAL INDUCED DRAG COEFFICIENT CDI =", "TOTAL LIFT COEFFICIENT CL ="]
+
+
 def ReadPMARC12LoadData(fname, plotflag=True):
     ld = loadsData()
 
-    with open(fname, 'r') as fp:
-        if pos_file_str(fp, "NTSTPS") == -1: return ld
+    with PMARCFile(fname, _LOAD_DATA_MARKERS) as fp:
+        if fp.find("NTSTPS") == -1: return ld
         fp.readline()  # skip to end of line.
         dat = fp.readline().split()
         ld.ntstps = int(dat[0])
         ld.dt = float(dat[1])
 
-        if pos_file_str(fp, "ALDEG") == -1: return ld
+        if fp.find("ALDEG") == -1: return ld
         fp.readline()  # skip to end of line.
         dat = fp.readline().split()
         ld.aldeg = float(dat[0])
         ld.yawdeg = float(dat[1])
 
-        if pos_file_str(fp, "CBAR") == -1: return ld
+        if fp.find("CBAR") == -1: return ld
         fp.readline()  # skip to end of line.
         dat = fp.readline().split()
         ld.cbar = float(dat[0])
@@ -173,7 +324,7 @@ def ReadPMARC12LoadData(fname, plotflag=True):
         ld.my = float(dat[4])
         ld.mz = float(dat[5])
 
-        if pos_file_str(fp, "BASIC PATCH DATA") == -1: return ld
+        if fp.find("BASIC PATCH DATA") == -1: return ld
         fp.readline()  # skip to end of line.
         fp.readline()  # skip line.
         fp.readline()  # skip line.
@@ -203,7 +354,7 @@ def ReadPMARC12LoadData(fname, plotflag=True):
             dat = fp.readline().split()
 
         # Move to final time step
-        if pos_file_str(fp, "TIME STEP %3d" % ld.ntstps) == -1: return ld
+        if fp.find("TIME STEP %3d" % ld.ntstps) == -1: return ld
         fp.readline()  # skip to end of line.
 
         for ipat in range(ld.npatch):
@@ -224,14 +375,14 @@ def ReadPMARC12LoadData(fname, plotflag=True):
 
                 for icol in range(ld.patncol[ipat]):
 
-                    if pos_file_str(fp, "SECTION PARAMETERS") == -1: return ld
+                    if fp.find("SECTION PARAMETERS") == -1: return ld
                     fp.readline()  # skip to end of line.
                     fp.readline()  # skip line.
 
                     xle[icol], yle[icol], zle[icol], chord[icol], circ[icol], eta[icol] = map(float,
                                                                                               fp.readline().split())
 
-                    if pos_file_str(fp, "WIND") == -1: return ld
+                    if fp.find("WIND") == -1: return ld
 
                     Clift[icol], Cdrag[icol], Cside[icol], Cpitch[icol], Cyaw[icol], Croll[icol] = map(float,
                                                                                                        fp.readline().split())
@@ -249,10 +400,10 @@ def ReadPMARC12LoadData(fname, plotflag=True):
                 ld.Cyaw_sect.append(Cyaw)
                 ld.Croll_sect.append(Croll)
 
-        if pos_file_str(fp, "FORCE AND MOMENT COEFFICIENTS") == -1: return ld
+        if fp.find("FORCE AND MOMENT COEFFICIENTS") == -1: return ld
         fp.readline()  # skip to end of line.
 
-        if pos_file_str(fp, "WIND AXES") == -1: return ld
+        if fp.find("WIND AXES") == -1: return ld
         fp.readline()  # skip to end of line.
 
         ld.Clift_patch = np.zeros(ld.npatch)
@@ -264,28 +415,28 @@ def ReadPMARC12LoadData(fname, plotflag=True):
         ld.Sfrac_patch = np.zeros(ld.npatch)
 
         for ipat in range(ld.npatch):
-            if pos_file_str(fp, ld.patname[ipat].strip()) == -1: return ld
+            if fp.find(ld.patname[ipat].strip()) == -1: return ld
 
             ld.Clift_patch[ipat], ld.Cdrag_patch[ipat], ld.Cside_patch[ipat], ld.Cpitch_patch[ipat], ld.Cyaw_patch[
                 ipat], ld.Croll_patch[ipat], ld.Sfrac_patch[ipat] = map(float, fp.readline().split())
 
-        if pos_file_str(fp, "TOTAL COEFFICIENTS") == -1: return ld
+        if fp.find("TOTAL COEFFICIENTS") == -1: return ld
         fp.readline()  # skip to end of line.
 
-        if pos_file_str(fp, "CL") == -1: return ld
+        if fp.find("CL") == -1: return ld
         fp.readline()  # skip to end of line.
         fp.readline()  # skip line.
 
         ld.Clift, ld.Cdrag, ld.Cside, ld.Cpitch, ld.Cyaw, ld.Croll = map(float, fp.readline().split())
 
-        if pos_file_str(fp, "TREFFTZ") == -1: return ld
+        if fp.find("TREFFTZ") == -1: return ld
         fp.readline()  # skip to end of line.
 
-        if pos_file_str(fp, "TOTAL INDUCED DRAG COEFFICIENT CDI =") == -1: return ld
+        if fp.find("TOTAL INDUCED DRAG COEFFICIENT CDI =") == -1: return ld
 
         ld.CdragTrefftz = float(fp.readline())
 
-        if pos_file_str(fp, "TOTAL LIFT COEFFICIENT CL =") == -1: return ld
+        if fp.find("TOTAL LIFT COEFFICIENT CL =") == -1: return ld
 
         ld.CliftTrefftz = float(fp.readline())
 
@@ -302,16 +453,64 @@ def ReadPMARC12LoadData(fname, plotflag=True):
     return ld
 
 
-def ReadPMARC12SurfData(fname='DATA22', plotflag=True):
+def _read_grid(fp, nrow, ncol, edge_counts, interior_counts):
+    """
+    Reads the records of one patch or wake with a single bulk numeric read. Records are written column by column for
+    each of the (nrow + 1) x (ncol + 1) corners, corners on the last row or column have fewer values since there is no
+    panel center data.
+
+    :param fp: :class:`PMARCFile` positioned at the first record
+    :param nrow: number of rows of panels
+    :param ncol: number of columns of panels
+    :param edge_counts: list of the number of values on each line of an edge corner record
+    :param interior_counts: list of the number of values on each line of an interior corner record
+    :return: tuple of the flat array of values, the offset of each corner record into it in Fortran order, and a
+        mask of the interior corners
+    """
+    interior = np.zeros((nrow + 1, ncol + 1), dtype=bool)
+    interior[:nrow, :ncol] = True
+    interior = interior.ravel(order='F')
+
+    nlines = np.where(interior, len(interior_counts), len(edge_counts))
+    nvalues = np.where(interior, sum(interior_counts), sum(edge_counts))
+
+    block = fp.read_lines(int(nlines.sum()))
+    try:
+        values = np.fromstring(block, sep=' ')
+    except ValueError:
+        values = np.zeros(0)
+
+    if values.size != nvalues.sum():
+        # Some lines have extra values, fall back to reading line by line
+        counts = [n for i in interior for n in (interior_counts if i else edge_counts)]
+        values = np.array([float(x) for line, n in zip(block.splitlines(), counts) for x in line.split()[:n]])
+
+    start = np.cumsum(nvalues) - nvalues
+    return values, start, interior
+
+
+def ReadPMARC12SurfData(fname='DATA22', plotflag=True, tsteps=None):
+    """
+    Reads the surface and wake solution written by PMARC 12
+
+    :param fname: path to the DATA22 file
+    :param plotflag: if True, plots the surface pressure and wake of the last loaded time step
+    :param tsteps: time steps to load, numbered from 1 as in PMARC. Negative numbers count back from the last time
+        step, so -1 only loads the final solution. Defaults to all time steps
+    :return: :class:`surfData` object
+    """
     sd = surfData()
 
     # Open the file for parsing.
-    with open(fname, 'r') as fp:
+    with PMARCFile(fname) as fp:
         # Read in three integers from first line. Not sure what they are.
         a = [int(x) for x in fp.readline().split()]
         sd.ntstep = a[1]
 
-        # print( sd.ntstep )
+        if tsteps is None:
+            sd.tsteps = list(range(1, sd.ntstep + 1))
+        else:
+            sd.tsteps = sorted({int(t) if t > 0 else sd.ntstep + 1 + int(t) for t in np.atleast_1d(tsteps)})
 
         # Read in number of patches
         sd.npatch = int(fp.readline())
@@ -322,7 +521,6 @@ def ReadPMARC12SurfData(fname='DATA22', plotflag=True):
         sd.finalpan = np.zeros(sd.npatch, dtype=int)
 
         for ipatch in range(sd.npatch):
-            # fp.readline()  # read to next line
             sd.pnames.append(fp.readline().strip())
             a = [int(x) for x in fp.readline().split()]
             sd.ncol[ipatch] = a[0]  # Number of columns in patch
@@ -330,80 +528,39 @@ def ReadPMARC12SurfData(fname='DATA22', plotflag=True):
             sd.initpan[ipatch] = a[2]  # Initial panel of patch
             sd.finalpan[ipatch] = a[3]  # Last panel of patch
 
-        # print(sd.pnames)
-        # print(sd.ncol)
-        # print(sd.nrow)
-        # print(sd.initpan)
-        # print(sd.finalpan)
-
         for ipatch in range(sd.npatch):
-
             nr = sd.nrow[ipatch]
             nc = sd.ncol[ipatch]
 
-            ncenter = nr * nc
-            ncorner = (nr + 1) * (nc + 1)
-
-            # print(ncenter)
-            # print(ncorner)
-
-            x = np.zeros(ncorner)
-            y = np.zeros(ncorner)
-            z = np.zeros(ncorner)
-
-            xc = np.zeros(ncenter)
-            yc = np.zeros(ncenter)
-            zc = np.zeros(ncenter)
-            xn = np.zeros(ncenter)
-            yn = np.zeros(ncenter)
-            zn = np.zeros(ncenter)
-
-            k = 0
-            icp = 0
-            for icol in range(sd.ncol[ipatch] + 1):
-                for irow in range(sd.nrow[ipatch] + 1):
-                    if irow < sd.nrow[ipatch] and icol < sd.ncol[ipatch]:
-                        a = [float(x) for x in fp.readline().split()]  # Read in 9 floats
-                        # print(a)
-                        x[icp] = a[0]  # Corner points
-                        y[icp] = a[1]
-                        z[icp] = a[2]
-                        xc[k] = a[3]  # Center points
-                        yc[k] = a[4]
-                        zc[k] = a[5]
-                        xn[k] = a[6]  # Normal vectors
-                        yn[k] = a[7]
-                        zn[k] = a[8]
-                        k += 1
-                        icp += 1
-                    else:
-                        a = [float(x) for x in fp.readline().split()]  # Read in 3 floats
-                        # print(a)
-                        x[icp] = a[0]  # Corner points
-                        y[icp] = a[1]
-                        z[icp] = a[2]
-                        icp += 1
-
-            sd.x_corner.append(np.reshape(x, (nr + 1, nc + 1), order='F'))
-            sd.y_corner.append(np.reshape(y, (nr + 1, nc + 1), order='F'))
-            sd.z_corner.append(np.reshape(z, (nr + 1, nc + 1), order='F'))
-
-            sd.x_center.append(np.reshape(xc, (nr, nc), order='F'))
-            sd.y_center.append(np.reshape(yc, (nr, nc), order='F'))
-            sd.z_center.append(np.reshape(zc, (nr, nc), order='F'))
-            sd.x_normal.append(np.reshape(xn, (nr, nc), order='F'))
-            sd.y_normal.append(np.reshape(yn, (nr, nc), order='F'))
-            sd.z_normal.append(np.reshape(zn, (nr, nc), order='F'))
-
-        # Read and ignore panel neighbor data
-        for ipanel in range(sd.finalpan[-1]):
-            a = [int(x) for x in fp.readline().split()]  # Read in 8 int
-
-        for itstep in range(sd.ntstep):
-            # print(itstep)
+            # Corner points, then center points and normal vectors of interior corners
+            values, start, interior = _read_grid(fp, nr, nc, [3], [9])
+            corner = values[start[:, None] + np.arange(3)]
+            center = values[start[interior][:, None] + np.arange(3, 9)]
+
+            sd.x_corner.append(np.reshape(corner[:, 0], (nr + 1, nc + 1), order='F'))
+            sd.y_corner.append(np.reshape(corner[:, 1], (nr + 1, nc + 1), order='F'))
+            sd.z_corner.append(np.reshape(corner[:, 2], (nr + 1, nc + 1), order='F'))
+
+            sd.x_center.append(np.reshape(center[:, 0], (nr, nc), order='F'))
+            sd.y_center.append(np.reshape(center[:, 1], (nr, nc), order='F'))
+            sd.z_center.append(np.reshape(center[:, 2], (nr, nc), order='F'))
+            sd.x_normal.append(np.reshape(center[:, 3], (nr, nc), order='F'))
+            sd.y_normal.append(np.reshape(center[:, 4], (nr, nc), order='F'))
+            sd.z_normal.append(np.reshape(center[:, 5], (nr, nc), order='F'))
+
+        # Skip panel neighbor data
+        fp.skip_lines(sd.finalpan[-1] if sd.npatch > 0 else 0)
+
+        # Dublet strength, velocity components and pressure coefficient, skipping values 4 and 6
+        sol_cols = np.array([0, 1, 2, 3, 5])
+        nsurf_lines = int(np.sum((sd.nrow + 1) * (sd.ncol + 1) + sd.nrow * sd.ncol))
+
+        for itstep in range(1, sd.ntstep + 1):
+            if not sd.tsteps or itstep > sd.tsteps[-1]:
+                break
+            load = itstep in sd.tsteps
 
             sd.nwake = int(fp.readline())
-            # print(sd.nwake)
 
             sd.nwcol = np.zeros(sd.nwake, dtype=int)
             sd.nwrow = np.zeros(sd.nwake, dtype=int)
@@ -411,59 +568,33 @@ def ReadPMARC12SurfData(fname='DATA22', plotflag=True):
             sd.lwpan = np.zeros(sd.nwake, dtype=int)
 
             for iwake in range(sd.nwake):
-                sd.wnames.append(fp.readline().strip())
+                wname = fp.readline().strip()
+                if load:
+                    sd.wnames.append(wname)
                 a = [int(x) for x in fp.readline().split()]
-                # print(a)
                 sd.nwcol[iwake] = a[0]  # Number of columns in patch
                 sd.nwrow[iwake] = a[1]  # Number of rows in patch
                 sd.iwpan[iwake] = a[2]  # Initial panel of patch
                 sd.lwpan[iwake] = a[3]  # Last panel of patch
 
-            # print(sd.wnames)
-            # print(sd.nwcol)
-            # print(sd.nwrow)
-            # print(sd.iwpan)
-            # print(sd.lwpan)
+            if not load:
+                fp.skip_lines(int(np.sum((sd.nwrow + 1) * (sd.nwcol + 1))) + nsurf_lines)
+                continue
 
             xw_corner = []
             yw_corner = []
             zw_corner = []
 
             for iwake in range(sd.nwake):
-
                 nr = sd.nwrow[iwake]
                 nc = sd.nwcol[iwake]
 
-                nwcenter = nr * nc
-                nwcorner = (nr + 1) * (nc + 1)
-
-                xw = np.zeros(nwcorner)
-                yw = np.zeros(nwcorner)
-                zw = np.zeros(nwcorner)
-
-                k = 0
-                icp = 0
-                for icol in range(sd.nwcol[iwake] + 1):
-                    for irow in range(sd.nwrow[iwake] + 1):
-                        if irow < sd.nwrow[iwake] and icol < sd.nwcol[iwake]:
-                            a = [float(x) for x in fp.readline().split()]  # Read in 9 floats
-                            # print(a)
-                            xw[icp] = a[0]  # Corner points
-                            yw[icp] = a[1]
-                            zw[icp] = a[2]
-                            k += 1
-                            icp += 1
-                        else:
-                            a = [float(x) for x in fp.readline().split()]  # Read in 3 floats
-                            # print(a)
-                            xw[icp] = a[0]  # Corner points
-                            yw[icp] = a[1]
-                            zw[icp] = a[2]
-                            icp += 1
-
-                xw_corner.append(np.reshape(xw, (nr + 1, nc + 1), order='F'))
-                yw_corner.append(np.reshape(yw, (nr + 1, nc + 1), order='F'))
-                zw_corner.append(np.reshape(zw, (nr + 1, nc + 1), order='F'))
+                values, start, interior = _read_grid(fp, nr, nc, [3], [9])
+                corner = values[start[:, None] + np.arange(3)]
+
+                xw_corner.append(np.reshape(corner[:, 0], (nr + 1, nc + 1), order='F'))
+                yw_corner.append(np.reshape(corner[:, 1], (nr + 1, nc + 1), order='F'))
+                zw_corner.append(np.reshape(corner[:, 2], (nr + 1, nc + 1), order='F'))
 
             sd.xw_corner.append(xw_corner)
             sd.yw_corner.append(yw_corner)
@@ -482,73 +613,25 @@ def ReadPMARC12SurfData(fname='DATA22', plotflag=True):
             cp_center = []
 
             for ipatch in range(sd.npatch):
-
                 nr = sd.nrow[ipatch]
                 nc = sd.ncol[ipatch]
 
-                ncenter = nr * nc
-                ncorner = (nr + 1) * (nc + 1)
-
-                dub = np.zeros(ncorner)
-                vx = np.zeros(ncorner)
-                vy = np.zeros(ncorner)
-                vz = np.zeros(ncorner)
-                cp = np.zeros(ncorner)
-
-                dubc = np.zeros(ncenter)
-                vxc = np.zeros(ncenter)
-                vyc = np.zeros(ncenter)
-                vzc = np.zeros(ncenter)
-                cpc = np.zeros(ncenter)
-
-                k = 0
-                icp = 0
-                for icol in range(sd.ncol[ipatch] + 1):
-                    for irow in range(sd.nrow[ipatch] + 1):
-                        if irow < sd.nrow[ipatch] and icol < sd.ncol[ipatch]:
-                            a = [float(x) for x in fp.readline().split()]  # Read in 7 floats
-                            # print(a)
-                            dub[icp] = a[0]  # Corner points
-                            vx[icp] = a[1]
-                            vy[icp] = a[2]
-                            vz[icp] = a[3]
-                            # Skip 4
-                            cp[icp] = a[5]
-                            # Skip 6
-                            a = [float(x) for x in fp.readline().split()]  # Read in 7 floats
-                            # print(a)
-                            dubc[k] = a[0]  # Center points
-                            vxc[k] = a[1]
-                            vyc[k] = a[2]
-                            vzc[k] = a[3]
-                            # Skip 4
-                            cpc[k] = a[5]
-                            # Skip 6
-                            k += 1
-                            icp += 1
-                        else:
-                            a = [float(x) for x in fp.readline().split()]  # Read in 7 floats
-                            # print(a)
-                            dub[icp] = a[0]  # Corner points
-                            vx[icp] = a[1]
-                            vy[icp] = a[2]
-                            vz[icp] = a[3]
-                            # Skip 4
-                            cp[icp] = a[5]
-                            # Skip 6
-                            icp += 1
-
-                dub_corner.append(np.reshape(dub, (nr + 1, nc + 1), order='F'))
-                vx_corner.append(np.reshape(vx, (nr + 1, nc + 1), order='F'))
-                vy_corner.append(np.reshape(vy, (nr + 1, nc + 1), order='F'))
-                vz_corner.append(np.reshape(vz, (nr + 1, nc + 1), order='F'))
-                cp_corner.append(np.reshape(cp, (nr + 1, nc + 1), order='F'))
-
-                dub_center.append(np.reshape(dubc, (nr, nc), order='F'))
-                vx_center.append(np.reshape(vxc, (nr, nc), order='F'))
-                vy_center.append(np.reshape(vyc, (nr, nc), order='F'))
-                vz_center.append(np.reshape(vzc, (nr, nc), order='F'))
-                cp_center.append(np.reshape(cpc, (nr, nc), order='F'))
+                # Interior corners are followed by a line of center point data
+                values, start, interior = _read_grid(fp, nr, nc, [7], [7, 7])
+                corner = values[start[:, None] + sol_cols]
+                center = values[start[interior][:, None] + 7 + sol_cols]
+
+                dub_corner.append(np.reshape(corner[:, 0], (nr + 1, nc + 1), order='F'))
+                vx_corner.append(np.reshape(corner[:, 1], (nr + 1, nc + 1), order='F'))
+                vy_corner.append(np.reshape(corner[:, 2], (nr + 1, nc + 1), order='F'))
+                vz_corner.append(np.reshape(corner[:, 3], (nr + 1, nc + 1), order='F'))
+                cp_corner.append(np.reshape(corner[:, 4], (nr + 1, nc + 1), order='F'))
+
+                dub_center.append(np.reshape(center[:, 0], (nr, nc), order='F'))
+                vx_center.append(np.reshape(center[:, 1], (nr, nc), order='F'))
+                vy_center.append(np.reshape(center[:, 2], (nr, nc), order='F'))
+                vz_center.append(np.reshape(center[:, 3], (nr, nc), order='F'))
+                cp_center.append(np.reshape(center[:, 4], (nr, nc), order='F'))
 
             sd.dub_corner.append(dub_corner)
             sd.vx_corner.append(vx_corner)
@@ -561,17 +644,17 @@ def ReadPMARC12SurfData(fname='DATA22', plotflag=True):
             sd.vy_center.append(vy_center)
             sd.vz_center.append(vz_center)
             sd.cp_center.append(cp_center)
-
-        # Read whatever remains in the file and dump it out to screen.
-        print(fp.readlines())
+        else:
+            # Read whatever remains in the file and dump it out to screen.
+            print(fp.buf[fp.pos:].decode('latin-1').splitlines(keepends=True))
 
     # Visualize surface solution and wake.
-    if plotflag:
+    if plotflag and sd.cp_center:
         fig = plt.figure()
         ax = fig.add_subplot(111, projection='3d')
 
-        cpmax = max(max(map(np.amax, cp_center)),max(map(np.amax, cp_corner)))
-        cpmin = min(min(map(np.amin, cp_center)),min(map(np.amin, cp_corner)))
+        cpmax = max(max(map(np.amax, sd.cp_center[-1])), max(map(np.amax, sd.cp_corner[-1])))
+        cpmin = min(min(map(np.amin, sd.cp_center[-1])), min(map(np.amin, sd.cp_corner[-1])))
 
         print( cpmax )
         print( cpmin )
@@ -582,7 +665,7 @@ def ReadPMARC12SurfData(fname='DATA22', plotflag=True):
             ax.plot_surface(sd.x_corner[ipatch], sd.y_corner[ipatch], sd.z_corner[ipatch],
                             facecolors=matplotlib.cm.jet(norm(sd.cp_center[-1][ipatch])), shade=False, linewidth=0.5,linestyle='-',edgecolor='k')
 
-        for iwake in range(sd.nwake):
+        for iwake in range(len(sd.xw_corner[-1])):
             ax.plot_wireframe(sd.xw_corner[-1][iwake], sd.yw_corner[-1][iwake], sd.zw_corner[-1][iwake], linewidth=0.5)
 
         fig.colorbar(matplotlib.cm.ScalarMappable(norm=norm, cmap=matplotlib.cm.jet), ax=ax)
@@ -615,3 +698,287 @@ def modNamelist(fin, fout, grp, var, val):
         nml_pat[grp[i]][var[i]] = val[i]
 
     f90nml.patch(fin, nml_pat, fout)
+
+
+_NAMELIST_NAME = re.compile(r'[a-z_][a-z0-9_]*$')
+
+
+class _NamelistTemplate:
+    """
+    Baseline namelist text split into tokens once, with the positions of the values assigned in each group, so a
+    case is written by replacing those tokens and the rest of the text, such as the title line and comments, is kept
+    """
+
+    def __init__(self, text):
+        self.tokens = list(_scan_namelist(text.splitlines(True)))
+        self.values = {}
+        """
+        Dictionary of (group, index, variable) to the (first, last) token indices of the values of each assignment
+        """
+        self.ends = {}
+        """
+        Dictionary of (group, index) to the token index of the group terminator
+        """
+        self.counts = {}
+        """
+        Dictionary of group name to the number of times the group appears
+        """
+        self.indexed = set()
+        """
+        (group, index, variable) of variables assigned by array index or derived type component
+        """
+        self._format = f90nml.Namelist()
+
+        significant = [i for i, token in enumerate(self.tokens) if not self._blank(token)]
+        tokens = [self.tokens[i].lower() for i in significant]
+        group = None
+        var = None
+        j = 0
+        while j < len(tokens):
+            token = tokens[j]
+            next_token = tokens[j + 1] if j + 1 < len(tokens) else None
+            if group is None:
+                # Only the text between a group name and its terminator is namelist data
+                if token in ('&', '$') and next_token not in (None, 'end'):
+                    group = (next_token, self.counts.get(next_token, 0))
+                    self.counts[next_token] = group[1] + 1
+                    j += 1
+                j += 1
+            elif token in ('/', '&', '$'):
+                self.ends[group] = significant[j]
+                group = var = None
+                j += 1
+            elif next_token in ('=', '(', '%') and _NAMELIST_NAME.match(token):
+                var = group + (token,)
+                if next_token != '=':
+                    self.indexed.add(var)
+                while tokens[j] != '=':
+                    j += 1
+                self.values.setdefault(var, []).append(None)
+                j += 1
+            else:
+                if token != ',' and var is not None:
+                    spans = self.values[var]
+                    spans[-1] = (significant[j] if spans[-1] is None else spans[-1][0], significant[j])
+                j += 1
+        # Variables assigned by index, or without a value, cannot be replaced in place
+        self.values = {var: spans for var, spans in self.values.items()
+                       if var not in self.indexed and None not in spans}
+
+    @staticmethod
+    def _blank(token):
+        stripped = token.strip()
+        return not stripped or stripped.startswith('!')
+
+    def render(self, params):
+        """
+        Builds the text of a case
+
+        :param params: dictionary of (group, variable) or (group, index, variable) to value. (group, variable) changes
+            the first occurrence of a repeated group, like :func:`modNamelist`
+        :return: namelist text
+        """
+        replace = {}
+        insert = {}
+        new_groups = f90nml.Namelist()
+        for key, val in params.items():
+            grp, index, var = (key[0], 0, key[1]) if len(key) == 2 else key
+            grp, var = grp.lower(), var.lower()
+            if (grp, index, var) in self.indexed:
+                raise ValueError('{} is assigned by index in the baseline and cannot be changed'.format(key))
+            if (grp, index, var) in self.values:
+                value_str = ', '.join(self._format._f90repr(v) for v in np.atleast_1d(val).tolist())
+                for first, last in self.values[(grp, index, var)]:
+                    replace[first] = (last, value_str)
+            elif (grp, index) in self.ends:
+                insert.setdefault(self.ends[(grp, index)], []).extend(self._format._var_strings(var, val))
+            elif index == 0 and grp not in self.counts:
+                if grp not in new_groups:
+                    new_groups[grp] = f90nml.Namelist()
+                new_groups[grp][var] = val
+            else:
+                raise IndexError('{} has no group {} number {}'.format(key, grp, index))
+
+        out = []
+        i = 0
+        while i < len(self.tokens):
+            if i in insert:
+                if out and not out[-1].endswith('\n'):
+                    out.append('\n')
+                out.extend(line + '\n' for line in insert[i])
+            if i in replace:
+                last, value_str = replace[i]
+                out.append(value_str)
+                i = last + 1
+                continue
+            out.append(self.tokens[i])
+            i += 1
+        if new_groups:
+            out.append('\n{}\n'.format(new_groups))
+        return ''.join(out)
+
+
+class PMARCCase:
+    """
+    A single case written by :class:`PMARCCaseGenerator`
+    """
+
+    def __init__(self, name, case_dir, params):
+        self.name = name
+        self.case_dir = case_dir
+        self.params = params
+        """
+        Dictionary of (group, variable) or (group, index, variable) to the value changed from the baseline namelist
+        """
+        self.returncode = None
+        self.error = None
+        """
+        Exception raised running or reading this case, None if it succeeded
+        """
+        self.loads = None
+        """
+        :class:`loadsData` read from the case output
+        """
+        self.surf = None
+        """
+        :class:`surfData` read from the case output, if a surface data file was requested
+        """
+
+
+class PMARCCaseGenerator:
+    """
+    Writes many PMARC cases from one baseline namelist. The baseline is parsed once, each case only replaces the text of
+    the changed values, unlike calling :func:`modNamelist` for every case. The rest of the baseline text, such as the
+    title line and comments, is written as is.
+    """
+
+    def __init__(self, baseline, input_name=None):
+        """
+
+        :param baseline: path to the baseline namelist file or a :class:`f90nml.Namelist`
+        :param input_name: file name of the namelist written in each case directory, defaults to the name of the
+            baseline file
+        """
+        if isinstance(baseline, f90nml.Namelist):
+            self.baseline = baseline
+            self.input_name = 'pmarc.in' if input_name is None else input_name
+            text = str(baseline)
+        else:
+            self.baseline = f90nml.read(baseline)
+            self.input_name = os.path.basename(baseline) if input_name is None else input_name
+            with open(baseline, 'r') as f:
+                text = f.read()
+        self._template = _NamelistTemplate(text)
+
+    @staticmethod
+    def case_table(table):
+        """
+        Expands a parameter table into the values of each case
+
+        :param table: dictionary of (group, variable) or (group, index, variable) to a value or array of values. The
+            index picks an occurrence of a repeated group, (group, variable) changes the first. Arrays are broadcast
+            together and give one case per element, e.g. the outputs of ``np.meshgrid`` for a full factorial sweep
+        :return: list of dictionaries of (group, variable) or (group, index, variable) to value, one per case
+        """
+        keys = list(table.keys())
+        if not keys:
+            return [{}]
+        columns = [c.ravel() for c in np.broadcast_arrays(*[np.asarray(table[key]) for key in keys])]
+        return [{key: column[i].item() for key, column in zip(keys, columns)} for i in range(columns[0].size)]
+
+    def write_case(self, fout, params):
+        """
+        Writes one case namelist
+
+        :param fout: path to output namelist file
+        :param params: dictionary of (group, variable) or (group, index, variable) to value, see :meth:`case_table`.
+            Variables missing from a group are added to it and missing groups are added at the end of the file
+        """
+        text = self._template.render(params)
+        with open(fout, 'w') as f:
+            f.write(text)
+
+    def write_cases(self, table, work_dir, num_workers=1, prefix='case'):
+        """
+        Writes one case directory per case of a parameter table
+
+        :param table: parameter table, see :meth:`case_table`
+        :param work_dir: directory the case directories are created in
+        :param num_workers: number of processes writing case files
+        :param prefix: prefix of the case directory names, followed by the case number
+        :return: list of :class:`PMARCCase` objects
+        """
+        case_params = self.case_table(table)
+        width = len(str(len(case_params) - 1))
+        names = ['{}{:0{}d}'.format(prefix, i, width) for i in range(len(case_params))]
+        cases = [PMARCCase(name, os.path.join(work_dir, name), params) for name, params in zip(names, case_params)]
+
+        if num_workers > 1 and len(cases) > 1:
+            chunks = [chunk for chunk in np.array_split(np.arange(len(cases)), num_workers) if chunk.size > 0]
+            with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                list(executor.map(_write_case_files, [self] * len(chunks),
+                                  [[cases[i] for i in chunk] for chunk in chunks]))
+        else:
+            _write_case_files(self, cases)
+        return cases
+
+    def run(self, cases, run_cmd='pmarc', num_workers=None, timeout=None, log_name='pmarc.out', loads_file=None,
+            surf_file=None, tsteps=-1):
+        """
+        Runs cases, at most num_workers at a time, and reads their outputs with :func:`ReadPMARC12LoadData` and
+        :func:`ReadPMARC12SurfData`. This function is blocking.
+
+        :param cases: list of :class:`PMARCCase` objects from :meth:`write_cases`
+        :param run_cmd: command to run PMARC, either a string or a list of arguments. It is called as
+            ``run_cmd input_name`` from the case directory
+        :param num_workers: maximum number of cases run at once, defaults to the number of cpus
+        :param timeout: timeout in seconds for each case
+        :param log_name: file the printed output of each case is written to
+        :param loads_file: file the loads are read from, defaults to the printed output
+        :param surf_file: surface data file to read, e.g. 'DATA22'. If None, surface data is not read
+        :param tsteps: time steps of the surface data to read, see :func:`ReadPMARC12SurfData`
+        :return: list of :class:`PMARCCase` objects
+        """
+        run_cmd = [run_cmd] if isinstance(run_cmd, str) else list(run_cmd)
+        num_workers = os.cpu_count() if num_workers is None else num_workers
+
+        def run_case(case):
+            case.error = None
+            try:
+                with open(os.path.join(case.case_dir, log_name), 'w') as log:
+                    case.returncode = subprocess.run(run_cmd + [self.input_name], cwd=case.case_dir, stdout=log,
+                                                     stderr=subprocess.STDOUT, timeout=timeout).returncode
+                if case.returncode != 0:
+                    raise RuntimeError('{} exited with code {}'.format(' '.join(run_cmd), case.returncode))
+                case.loads = ReadPMARC12LoadData(os.path.join(case.case_dir, log_name if loads_file is None
+                                                              else loads_file), plotflag=False)
+                if surf_file is not None:
+                    case.surf = ReadPMARC12SurfData(os.path.join(case.case_dir, surf_file), plotflag=False,
+                                                    tsteps=tsteps)
+            except Exception as e:
+                case.error = e
+            return case
+
+        with ThreadPoolExecutor(max_workers=max(1, num_workers)) as executor:
+            return list(executor.map(run_case, cases))
+
+    def sweep(self, table, work_dir, num_workers=None, **kwargs):
+        """
+        Writes and runs one case per case of a parameter table
+
+        :param table: parameter table, see :meth:`case_table`
+        :param work_dir: directory the case directories are created in
+        :param num_workers: number of processes writing case files and maximum number of cases run at once, defaults
+            to the number of cpus
+        :param kwargs: keyword arguments passed to :meth:`run`
+        :return: list of :class:`PMARCCase` objects
+        """
+        num_workers = os.cpu_count() if num_workers is None else num_workers
+        cases = self.write_cases(table, work_dir, num_workers=num_workers)
+        return self.run(cases, num_workers=num_workers, **kwargs)
+
+
+def _write_case_files(generator, cases):
+    for case in cases:
+        os.makedirs(case.case_dir, exist_ok=True)
+        generator.write_case(os.path.join(case.case_dir, generator.input_name), case.params)
@@ -0,0 +1,97 @@
+# Copyright (c) 2023 Rob McDonald
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import f90nml
+
+from pypmarc import PMARCCaseGenerator, modNamelist
+
+BASELINE = """PMARC test case title line
+! comment before
+&basic  ncases = 1, alpha = 2.5 ! angle
+  beta = 0.0 /
+&sect1 stx = 1.0, sty = 2.0 /
+&sect1 stx = 3.0,
+  sty = 4.0, arr = 1, 2, 3
+/
+&sect1 stx = 5.0 sty = 6.0 /
+"""
+
+
+class TestPMARCCaseGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.baseline = os.path.join(self.tmp, 'pmarc.in')
+        with open(self.baseline, 'w') as f:
+            f.write(BASELINE)
+        self.generator = PMARCCaseGenerator(self.baseline)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write_case(self, params):
+        fout = os.path.join(self.tmp, 'case.in')
+        self.generator.write_case(fout, params)
+        with open(fout, 'r') as f:
+            return f.read()
+
+    def test_matches_modNamelist(self):
+        params = {('basic', 'alpha'): 4.0, ('sect1', 'stx'): 9.0, ('sect1', 'new'): 4, ('extra', 'q'): True}
+        text = self.write_case(params)
+
+        fout = os.path.join(self.tmp, 'mod.in')
+        grp, var, val = zip(*[(g, v, params[(g, v)]) for g, v in params])
+        modNamelist(self.baseline, fout, grp, var, val)
+        self.assertEqual(f90nml.read(fout), f90nml.reads(text))
+
+    def test_repeated_groups(self):
+        nml = f90nml.reads(self.write_case({('sect1', 1, 'stx'): 7.0, ('SECT1', 2, 'arr'): [4, 5]}))
+        self.assertEqual([1.0, 7.0, 5.0], [sect['stx'] for sect in nml['sect1']])
+        self.assertEqual([2.0, 4.0, 6.0], [sect['sty'] for sect in nml['sect1']])
+        self.assertEqual([1, 2, 3], nml['sect1'][1]['arr'])
+        self.assertEqual([4, 5], nml['sect1'][2]['arr'])
+
+        with self.assertRaises(IndexError):
+            self.write_case({('sect1', 3, 'stx'): 1.0})
+
+    def test_keeps_text(self):
+        text = self.write_case({('basic', 'alpha'): 4.0, ('sect1', 1, 'sty'): 8.0})
+        self.assertEqual(BASELINE.replace('alpha = 2.5', 'alpha = 4.0').replace('sty = 4.0', 'sty = 8.0'), text)
+        self.assertEqual(BASELINE, self.write_case({}))
+
+    def test_write_cases(self):
+        table = {('basic', 'alpha'): [0.0, 2.0, 4.0], ('sect1', 2, 'sty'): 1.5}
+        for num_workers in (1, 2):
+            work_dir = os.path.join(self.tmp, 'cases{}'.format(num_workers))
+            cases = self.generator.write_cases(table, work_dir, num_workers=num_workers)
+            self.assertEqual(['case0', 'case1', 'case2'], [case.name for case in cases])
+            for case, alpha in zip(cases, table[('basic', 'alpha')]):
+                nml = f90nml.read(os.path.join(case.case_dir, 'pmarc.in'))
+                self.assertEqual(alpha, nml['basic']['alpha'])
+                self.assertEqual(1.5, nml['sect1'][2]['sty'])
+
+
+if __name__ == '__main__':
+    unittest.main()
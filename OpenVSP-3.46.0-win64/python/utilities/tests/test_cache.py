@@ -0,0 +1,231 @@
+# Copyright (c) 2020 Uber Technologies, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import functools
+import math
+import os
+import pickle
+import shutil
+import sqlite3
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from utilities.cache import MemoryCache, ResultCache, binary_identity, function_identity, hash_key, \
+    register_cache_type
+from utilities.runners import DOE
+
+
+def scaled(x, k=1.0, *, offset=0.0):
+    return k * x + offset
+
+
+def make_scaled(k):
+    return lambda x: scaled(x, k)
+
+
+@register_cache_type
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def to_cache_data(self):
+        return [self.x, self.y]
+
+    @classmethod
+    def from_cache_data(cls, data):
+        return cls(*data)
+
+
+class Unregistered:
+    pass
+
+
+class FunctionIdentityTest(unittest.TestCase):
+
+    def test_code(self):
+        self.assertNotEqual(function_identity(lambda x: math.sin(x)), function_identity(lambda x: math.cos(x)))
+        self.assertEqual(function_identity(make_scaled(2.0)), function_identity(make_scaled(2.0)))
+        self.assertNotIn("0x", function_identity(lambda x: [y for y in (lambda: x)()]))
+
+    def test_closure(self):
+        identities = [function_identity(lambda x: scaled(x, k)) for k in range(3)]
+        self.assertEqual(3, len(set(identities)))
+        self.assertNotEqual(function_identity(make_scaled(1.0)), function_identity(make_scaled(2.0)))
+
+        # functions held in a closure are identified by their own closure
+        def outer(g):
+            return lambda x: g(x) + 1.0
+        self.assertNotEqual(function_identity(outer(make_scaled(1.0))), function_identity(outer(make_scaled(2.0))))
+
+    def test_defaults(self):
+        def f(x, k=1.0):
+            return k * x
+        before = function_identity(f)
+        f.__defaults__ = (2.0,)
+        self.assertNotEqual(before, function_identity(f))
+
+        before = function_identity(scaled)
+        scaled.__kwdefaults__ = {"offset": 1.0}
+        try:
+            self.assertNotEqual(before, function_identity(scaled))
+        finally:
+            scaled.__kwdefaults__ = {"offset": 0.0}
+
+    def test_partial(self):
+        self.assertEqual(function_identity(functools.partial(scaled, k=2.0)),
+                         function_identity(functools.partial(scaled, k=2.0)))
+        self.assertNotEqual(function_identity(functools.partial(scaled, k=2.0)),
+                            function_identity(functools.partial(scaled, k=3.0)))
+
+        # stable across processes
+        code = "import functools, math; from utilities.cache import function_identity; " \
+               "print(function_identity(functools.partial(math.hypot, 3.0)))"
+        identities = {subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                     check=True).stdout for _ in range(2)}
+        self.assertEqual({function_identity(functools.partial(math.hypot, 3.0)) + "\n"}, identities)
+
+    def test_unpicklable_closure(self):
+        lock = threading.Lock()
+
+        def f(x):
+            with lock:
+                return x
+        with self.assertRaises(ValueError):
+            function_identity(f)
+        f.cache_key = "locked identity v1"
+        self.assertEqual("locked identity v1", function_identity(f))
+
+    def test_recursive(self):
+        def fact(n):
+            return 1 if n <= 1 else n * fact(n - 1)
+        self.assertEqual(function_identity(fact), function_identity(fact))
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_doe_closure(self):
+        cache = ResultCache(os.path.join(self.tmp, "cache.sqlite"))
+        cases = np.arange(5.0)[:, None]
+        for k in (1.0, 2.0):
+            doe = DOE(cases)
+            doe.run(lambda x: scaled(x[0], k), cache=cache)
+            np.testing.assert_allclose(k * cases[:, 0], np.ravel(doe.results))
+        self.assertEqual(10, len(cache))
+        cache.close()
+
+    def test_values(self):
+        cache = ResultCache(os.path.join(self.tmp, "cache.sqlite"))
+        value = {"a": (1, 2.5, None, True), 3: [np.arange(6.0).reshape(2, 3), np.float32(1.5), float("nan")],
+                 ("t", 1): b"bytes", "points": [Point(np.zeros(2), "p")], "text": np.array(["x", "yz"])}
+        cache["key"] = value
+        loaded = cache["key"]
+        self.assertEqual({"a", 3, ("t", 1), "points", "text"}, set(loaded))
+        self.assertEqual((1, 2.5, None, True), loaded["a"])
+        np.testing.assert_array_equal(value[3][0], loaded[3][0])
+        self.assertEqual(1.5, loaded[3][1])
+        self.assertTrue(math.isnan(loaded[3][2]))
+        self.assertEqual(b"bytes", loaded[("t", 1)])
+        self.assertIsInstance(loaded["points"][0], Point)
+        np.testing.assert_array_equal(np.zeros(2), loaded["points"][0].x)
+        np.testing.assert_array_equal(value["text"], loaded["text"])
+
+        with self.assertRaises(TypeError):
+            cache["other"] = Unregistered()
+        with self.assertRaises(TypeError):
+            cache["other"] = np.array([Unregistered()])
+        cache.close()
+
+    def test_no_pickle(self):
+        path = os.path.join(self.tmp, "cache.sqlite")
+        cache = ResultCache(path)
+        cache["key"] = 1.0
+        with sqlite3.connect(path) as db:
+            db.execute("UPDATE results SET value=? WHERE key=?", (pickle.dumps(Unregistered()), "key"))
+        self.assertIsNone(cache.get("key"))
+        cache.close()
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "POSIX permissions")
+    def test_permissions(self):
+        path = os.path.join(self.tmp, "private", "cache.sqlite")
+        cache = ResultCache(path)
+        cache["key"] = 1.0
+        for suffix in ("", "-wal", "-shm"):
+            self.assertEqual(0o600, stat.S_IMODE(os.stat(path + suffix).st_mode), suffix)
+        cache.close()
+
+        path = os.path.join(self.tmp, "shared", "cache.sqlite")
+        cache = ResultCache(path, shared=True)
+        cache["key"] = 1.0
+        self.assertEqual(stat.S_ISGID | stat.S_ISVTX | 0o770, stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode))
+        for suffix in ("", "-wal", "-shm"):
+            self.assertEqual(0o660, stat.S_IMODE(os.stat(path + suffix).st_mode), suffix)
+        cache.close()
+
+    def test_evict(self):
+        cache = ResultCache(os.path.join(self.tmp, "cache.sqlite"), max_size=10000)
+        for i in range(20):
+            cache[hash_key(i)] = np.zeros(100)
+        self.assertLessEqual(cache.size, 10000)
+        self.assertIn(hash_key(19), cache)
+        self.assertNotIn(hash_key(0), cache)
+        cache.close()
+
+
+class MemoryCacheTest(unittest.TestCase):
+
+    def test_lru(self):
+        cache = MemoryCache(max_entries=3)
+        for i in range(3):
+            cache[i] = i
+        self.assertEqual(0, cache.get(0))
+        cache[3] = 3
+        self.assertEqual(3, len(cache))
+        self.assertNotIn(1, cache)
+        self.assertIn(0, cache)
+        self.assertIsNone(cache.get(1))
+
+    def test_binary_identity(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "binary")
+            with open(path, "wb") as f:
+                f.write(b"one")
+            first = binary_identity(path)
+            self.assertEqual(first, binary_identity(path))
+            with open(path, "wb") as f:
+                f.write(b"other")
+            self.assertNotEqual(first, binary_identity(path))
+            self.assertEqual("missing_binary", binary_identity("missing_binary"))
+
+
+if __name__ == "__main__":
+    unittest.main()
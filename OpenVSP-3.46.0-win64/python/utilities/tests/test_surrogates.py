@@ -0,0 +1,117 @@
+# Copyright (c) 2020 Uber Technologies, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import numpy.testing as npt
+
+from utilities.runners import LatinHypercube
+from utilities.surrogates import Surrogate, PolynomialSurrogate, RBFSurrogate, KrigingSurrogate
+
+
+def quadratic(x):
+    return 1.0 + 2.0 * x[:, 0] - 3.0 * x[:, 1] + 0.5 * x[:, 0] * x[:, 1] + x[:, 1] ** 2
+
+
+def smooth(x):
+    return np.sin(3.0 * x[:, 0]) * np.cos(2.0 * x[:, 1])
+
+
+class SurrogateTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.RandomState(0)
+        cls.x = rng.uniform(-1.0, 1.0, (80, 2))
+        cls.x_test = rng.uniform(-0.9, 0.9, (200, 2))
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def check_round_trip(self, model, x):
+        filename = os.path.join(self.tmp, "model.npz")
+        model.save(filename)
+        loaded = Surrogate.load(filename)
+        self.assertIs(type(model), type(loaded))
+        npt.assert_allclose(model.predict(x), loaded.predict(x), rtol=1e-12, atol=1e-12)
+        return loaded
+
+    def test_polynomial(self):
+        model = PolynomialSurrogate(degree=2).fit(self.x, quadratic(self.x))
+        npt.assert_allclose(quadratic(self.x_test), model.predict(self.x_test), atol=1e-10)
+        self.check_round_trip(model, self.x_test)
+
+    def test_rbf(self):
+        for kernel in RBFSurrogate.KERNELS:
+            model = RBFSurrogate(kernel=kernel, epsilon=2.0).fit(self.x, smooth(self.x))
+            npt.assert_allclose(smooth(self.x), model.predict(self.x), atol=1e-6, err_msg=kernel)
+            error = np.sqrt(np.mean((model.predict(self.x_test) - smooth(self.x_test)) ** 2))
+            self.assertLess(error, 0.05, kernel)
+            self.check_round_trip(model, self.x_test)
+
+    def test_kriging(self):
+        model = KrigingSurrogate().fit(self.x, smooth(self.x))
+        error = np.sqrt(np.mean((model.predict(self.x_test) - smooth(self.x_test)) ** 2))
+        self.assertLess(error, 0.01)
+        self.assertTrue(np.all(model.predict_variance(self.x) < 1e-6))
+        loaded = self.check_round_trip(model, self.x_test)
+        npt.assert_allclose(model.predict_variance(self.x_test), loaded.predict_variance(self.x_test), rtol=1e-10)
+
+        fixed = KrigingSurrogate(theta=[2.0, 2.0]).fit(self.x, smooth(self.x))
+        npt.assert_allclose([2.0, 2.0], self.check_round_trip(fixed, self.x_test).theta)
+
+    def test_several_responses(self):
+        y = np.column_stack((quadratic(self.x), 2.0 * quadratic(self.x)))
+        model = PolynomialSurrogate(degree=2).fit(self.x, y)
+        self.assertEqual((200, 2), model.predict(self.x_test).shape)
+        self.assertEqual((2,), model.predict(self.x_test[0]).shape)
+
+    def test_one_input(self):
+        x = np.linspace(0.0, 2.0, 15)
+        y = np.sin(x)
+        x_test = np.linspace(0.1, 1.9, 7)
+        for model in (PolynomialSurrogate(degree=5), RBFSurrogate(), KrigingSurrogate()):
+            model.fit(x, y)
+            self.assertEqual(1, model.n_inputs)
+            prediction = model.predict(x_test)
+            self.assertEqual((7,), prediction.shape)
+            npt.assert_allclose(np.sin(x_test), prediction, atol=1e-3, err_msg=type(model).__name__)
+            npt.assert_allclose(prediction, model.predict(x_test[:, None]))
+            self.assertEqual((), np.shape(model.predict(x_test[0])))
+            self.assertEqual((1,), np.shape(model.predict(x_test[:1])))
+            self.check_round_trip(model, x_test)
+        self.assertEqual((7,), model.predict_variance(x_test).shape)
+
+    def test_from_doe(self):
+        doe = LatinHypercube([[-1.0, 1.0], [-1.0, 1.0]], 40, seed=1)
+        doe.run(lambda x: quadratic(np.atleast_2d(x))[0])
+        model = PolynomialSurrogate.from_doe(doe)
+        npt.assert_allclose(quadratic(self.x_test), model.predict(self.x_test), atol=1e-10)
+
+
+if __name__ == "__main__":
+    unittest.main()
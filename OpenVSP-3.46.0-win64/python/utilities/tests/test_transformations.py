@@ -0,0 +1,108 @@
+# Copyright (c) 2020 Uber Technologies, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import unittest
+
+import numpy as np
+import numpy.testing as npt
+
+import utilities.transformations as trans
+from utilities.transformations import TransMatrix, compose_transformations, transform_points, rotate_points
+
+
+def random_transform(rng):
+    mat = TransMatrix.create_from_axis_angle(rng.normal(size=3), rng.uniform(-np.pi, np.pi))
+    mat.set_translations(rng.normal(size=3))
+    return mat
+
+
+class TransformationsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.RandomState(0)
+        self.points = self.rng.normal(size=(20, 3))
+
+    def column_path(self, mat, points):
+        # one point at a time through the column vector path
+        return np.array([mat.apply_transformation(point.reshape(3, 1)).ravel() for point in points])
+
+    def test_transform_points(self):
+        mat = random_transform(self.rng)
+        expected = self.column_path(mat, self.points)
+        npt.assert_allclose(expected, transform_points(mat.mat, self.points), atol=1e-12)
+        npt.assert_allclose(expected, mat.transform_points(self.points), atol=1e-12)
+        npt.assert_allclose(expected[3], mat.transform_points(self.points[3]), atol=1e-12)
+        npt.assert_allclose(mat.apply_rotations(self.points.T).T, mat.rotate_points(self.points), atol=1e-12)
+
+    def test_transform_points_stack(self):
+        mats = [random_transform(self.rng) for _ in self.points]
+        expected = np.array([mat.apply_transformation(point.reshape(3, 1)).ravel()
+                             for mat, point in zip(mats, self.points)])
+        stack = np.array([mat.mat for mat in mats])
+        npt.assert_allclose(expected, transform_points(stack, self.points), atol=1e-12)
+        npt.assert_allclose(expected - stack[:, 0:3, 3], rotate_points(stack[:, 0:3, 0:3], self.points), atol=1e-12)
+
+    def test_compose(self):
+        a, b, c = (random_transform(self.rng) for _ in range(3))
+        sequential = self.column_path(c, self.column_path(b, self.column_path(a, self.points)))
+        npt.assert_allclose(sequential, transform_points(compose_transformations(a, b, c), self.points), atol=1e-12)
+        npt.assert_allclose(sequential, TransMatrix.compose(a, b.mat, c).transform_points(self.points), atol=1e-12)
+        npt.assert_allclose(np.identity(4), compose_transformations(a, a.get_inverse_transform()), atol=1e-12)
+
+        # 3x3 rotations compose like 4x4 matrices without translation
+        dcm = trans.dcm_body2wind(0.1, 0.2)
+        npt.assert_allclose(dcm @ a.mat[0:3, 0:3], compose_transformations(a, dcm)[0:3, 0:3], atol=1e-12)
+        npt.assert_allclose(dcm @ a.mat[0:3, 3], compose_transformations(a, dcm)[0:3, 3], atol=1e-12)
+
+    def test_compose_stack(self):
+        stack = np.array([random_transform(self.rng).mat for _ in self.points])
+        b = random_transform(self.rng)
+        composed = compose_transformations(stack, b)
+        self.assertEqual((len(self.points), 4, 4), composed.shape)
+        expected = np.array([self.column_path(b, self.column_path(TransMatrix(mat), [point]))[0]
+                             for mat, point in zip(stack, self.points)])
+        npt.assert_allclose(expected, transform_points(composed, self.points), atol=1e-12)
+
+        with self.assertRaises(ValueError):
+            compose_transformations(np.identity(2))
+
+    def test_dcm_cache(self):
+        dcm = trans.dcm_body2wind(0.1, 0.2)
+        self.assertIs(dcm, trans.dcm_body2wind(0.1, 0.2))
+        self.assertFalse(dcm.flags.writeable)
+        with self.assertRaises(ValueError):
+            dcm[0, 0] = 2.0
+        npt.assert_allclose(trans._build_dcm_body2wind(0.1, 0.2), trans.dcm_body2wind(0.1, 0.2))
+        # derived matrices are views of the cached one and cannot be written either
+        self.assertFalse(trans.dcm_wind2body(0.1, 0.2).flags.writeable)
+
+    def test_dcm_arrays(self):
+        alpha = self.rng.uniform(-0.3, 0.3, len(self.points))
+        beta = self.rng.uniform(-0.3, 0.3, len(self.points))
+        dcms = trans.dcm_body2wind(alpha, beta)
+        self.assertEqual((len(self.points), 3, 3), dcms.shape)
+        self.assertTrue(dcms.flags.writeable)
+        expected = np.array([trans.body2wind(point, a, b).ravel() for point, a, b in zip(self.points, alpha, beta)])
+        npt.assert_allclose(expected, trans.frame_transform(self.points, "body", "wind", alpha, beta), atol=1e-12)
+        npt.assert_allclose(self.points, trans.frame_transform(expected, "wind", "body", alpha, beta), atol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
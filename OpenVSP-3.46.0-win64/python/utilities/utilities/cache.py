@@ -0,0 +1,462 @@
+# Copyright (c) 2020 Uber Technologies, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+import base64
+import collections
+import functools
+import hashlib
+import io
+import json
+import os
+import pickle
+import shutil
+import sqlite3
+import time
+import zipfile
+
+import numpy as np
+
+
+def hash_key(*parts):
+    """
+    Builds a content address from any number of picklable parts
+
+    Numpy arrays and scalars are converted to python types first so equal values hash equally regardless of dtype
+    wrappers.
+
+    :param parts: objects to hash
+    :return: hex digest
+    """
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(pickle.dumps(_normalize(part), protocol=4))
+    return h.hexdigest()
+
+
+def _normalize(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (list, tuple)):
+        return tuple(_normalize(o) for o in obj)
+    return obj
+
+
+def function_identity(f):
+    """
+    Identifies a function by name, compiled code, defaults and closure variables, so editing the function or
+    building it with other values invalidates its cached results. functools.partial objects are identified by their
+    function and bound arguments.
+
+    Functions whose results depend on state outside their code (globals, files) should set a ``cache_key``
+    attribute, which is used instead.
+
+    :param f: function handle
+    :return: identity string
+    :raises ValueError: if a default or closure variable cannot be pickled and f has no ``cache_key``
+    """
+    return _function_identity(f, set())
+
+
+def _function_identity(f, seen):
+    key = getattr(f, "cache_key", None)
+    if key is not None:
+        return str(key)
+    if isinstance(f, functools.partial):
+        return "partial:" + _hash_state(repr(f.func), _function_identity(f.func, seen),
+                                        _state_value(f.args, seen), _state_value(f.keywords, seen))
+    name = "{}.{}".format(getattr(f, "__module__", ""), getattr(f, "__qualname__", repr(f)))
+    code = getattr(f, "__code__", None)
+    if code is None or id(f) in seen:
+        # recursive references are identified by name, the outer identity already covers their code
+        return name
+    seen = seen | {id(f)}
+    try:
+        closure = tuple(cell.cell_contents for cell in getattr(f, "__closure__", None) or ())
+    except ValueError:
+        raise ValueError("{} has an unset closure variable, set a cache_key attribute on it".format(name))
+    return name + ":" + _hash_state(name, _code_content(code), _state_value(getattr(f, "__defaults__", None), seen),
+                                    _state_value(getattr(f, "__kwdefaults__", None), seen),
+                                    _state_value(closure, seen))
+
+
+def _state_value(value, seen):
+    # Functions held in defaults and closures are identified like the function itself, other values by content
+    if isinstance(value, functools.partial) or (callable(value) and hasattr(value, "__code__")):
+        return ("function", _function_identity(value, seen))
+    if isinstance(value, (list, tuple)):
+        return tuple(_state_value(v, seen) for v in value)
+    if isinstance(value, dict):
+        return ("dict",) + tuple((k, _state_value(v, seen)) for k, v in value.items())
+    return value
+
+
+def _hash_state(name, *parts):
+    try:
+        return hash_key(*parts)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        raise ValueError("{} has defaults or closure variables that cannot be pickled, set a cache_key attribute "
+                         "on it to cache its results".format(name)) from e
+
+
+def _code_content(code):
+    # Nested code objects (lambdas, comprehensions, inner functions) are identified by their content, their repr
+    # holds a memory address that changes between processes
+    return (code.co_code, code.co_names,
+            tuple(_code_content(c) if isinstance(c, type(code)) else c for c in code.co_consts))
+
+
+def binary_identity(path):
+    """
+    Identifies an executable by its contents, so results are recomputed when the executable is rebuilt or replaced.
+    The hash is kept for as long as the file size and modification time are unchanged.
+
+    :param path: path or name on the PATH of the executable
+    :return: hex digest, or path if the executable cannot be found
+    """
+    found = shutil.which(path) or path
+    try:
+        st = os.stat(found)
+    except OSError:
+        return path
+    return _hash_file(os.path.realpath(found), st.st_size, st.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=None)
+def _hash_file(path, size, mtime_ns):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(2**20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class MemoryCache():
+    """
+    In-memory mapping that keeps the max_entries most recently used entries, for caching small results within one
+    process. Supports the get/set subset of the :class:`ResultCache` interface.
+    """
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, key):
+        value = self._entries[key]
+        self._entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def clear(self):
+        self._entries.clear()
+
+
+_CACHE_TYPES = {}
+
+
+def register_cache_type(cls):
+    """
+    Registers a class whose instances can be stored in a :class:`ResultCache`. Instances are stored as the data
+    returned by their to_cache_data() method, built from the types a ResultCache stores, and rebuilt with the
+    from_cache_data(data) classmethod.
+
+    :param cls: class to register
+    :return: cls, so this can be used as a class decorator
+    """
+    _CACHE_TYPES[_type_name(cls)] = cls
+    return cls
+
+
+def _type_name(cls):
+    return "{}.{}".format(cls.__module__, cls.__qualname__)
+
+
+_FORMAT = b"RC1\n"
+
+
+def _encode(value):
+    """
+    Serializes a value without pickle, as a JSON tree with numpy arrays in an npz archive
+
+    :raises TypeError: if the value holds anything other than None, bools, numbers, strings, bytes, numpy arrays
+                       and scalars, lists, tuples, dicts and registered types
+    """
+    arrays = []
+    header = json.dumps(_to_tree(value, arrays)).encode("utf8")
+    f = io.BytesIO()
+    f.write(_FORMAT)
+    f.write(len(header).to_bytes(8, "little"))
+    f.write(header)
+    if arrays:
+        np.savez(f, *arrays)
+    return f.getvalue()
+
+
+def _decode(b_value):
+    """
+    Inverse of :func:`_encode`
+
+    :raises ValueError: if the value was not written by _encode or holds an unregistered type
+    """
+    if not b_value.startswith(_FORMAT):
+        raise ValueError("unknown result format")
+    start = len(_FORMAT) + 8
+    end = start + int.from_bytes(b_value[len(_FORMAT):start], "little")
+    arrays = {}
+    if end < len(b_value):
+        with np.load(io.BytesIO(b_value[end:]), allow_pickle=False) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+    return _from_tree(json.loads(b_value[start:end].decode("utf8")), arrays)
+
+
+def _to_tree(value, arrays):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return _to_tree(value.item(), arrays)
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise TypeError("object arrays cannot be stored in a ResultCache")
+        arrays.append(value)
+        return {"array": "arr_{}".format(len(arrays) - 1)}
+    if isinstance(value, list):
+        return [_to_tree(v, arrays) for v in value]
+    if isinstance(value, tuple):
+        return {"tuple": [_to_tree(v, arrays) for v in value]}
+    if isinstance(value, dict):
+        return {"dict": [[_to_tree(k, arrays), _to_tree(v, arrays)] for k, v in value.items()]}
+    if isinstance(value, bytes):
+        return {"bytes": base64.b64encode(value).decode("ascii")}
+    name = _type_name(type(value))
+    if name in _CACHE_TYPES:
+        return {"object": name, "data": _to_tree(value.to_cache_data(), arrays)}
+    raise TypeError("{} cannot be stored in a ResultCache, register it with register_cache_type".format(name))
+
+
+def _from_tree(tree, arrays):
+    if isinstance(tree, list):
+        return [_from_tree(t, arrays) for t in tree]
+    if not isinstance(tree, dict):
+        return tree
+    if "array" in tree:
+        return arrays[tree["array"]]
+    if "tuple" in tree:
+        return tuple(_from_tree(t, arrays) for t in tree["tuple"])
+    if "dict" in tree:
+        return {_from_tree(k, arrays): _from_tree(v, arrays) for k, v in tree["dict"]}
+    if "bytes" in tree:
+        return base64.b64decode(tree["bytes"])
+    cls = _CACHE_TYPES.get(tree["object"])
+    if cls is None:
+        raise ValueError("{} is not a registered cache type".format(tree["object"]))
+    return cls.from_cache_data(_from_tree(tree["data"], arrays))
+
+
+def _share(path, mode):
+    # Only the owner can change permissions, files created by other users are left alone
+    try:
+        os.chmod(path, mode)
+    except PermissionError:
+        pass
+
+
+def _share_directory(directory, group=None):
+    """
+    Makes a directory writable by a group. The setgid bit gives new files the group of the directory and the sticky
+    bit stops members from removing each other's files. Other users are given no access.
+
+    :param directory: directory to share
+    :param group: optional group name to change the directory to, defaults to the group it already has
+    """
+    if group is not None:
+        import grp
+        try:
+            os.chown(directory, -1, grp.getgrnam(group).gr_gid)
+        except PermissionError:
+            pass
+    _share(directory, 0o3770)
+
+
+def _create_file(path, mode):
+    """
+    Creates an empty file with exactly the given permissions, regardless of the umask. SQLite gives the -wal and -shm
+    files it creates next to a database the permissions of the database, so they follow this mode too.
+    """
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+    except FileExistsError:
+        return
+    try:
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, mode)
+    finally:
+        os.close(fd)
+
+
+class ResultCache():
+    """
+    Content-addressed result cache backed by a local SQLite file.
+
+    Values are stored as data rather than pickles, so a cache written by someone else can be read without running
+    their code. Values can be built from None, bools, numbers, strings, bytes, numpy arrays and scalars, lists, tuples,
+    dicts and types registered with :func:`register_cache_type`. Entries that cannot be read back, such as those of
+    older versions or of types that are not registered, are treated as missing.
+
+    The least recently used entries are evicted once the stored size exceeds max_size bytes.
+    """
+    _MISSING = object()
+
+    def __init__(self, path, max_size=2**30, shared=False):
+        """
+
+        :param path: SQLite file to store results in, created if needed
+        :param max_size: maximum total size of stored values in bytes
+        :param shared: True or a group name to share the cache with the members of a group. The directory is given to the
+                       group, if named, and made group writable with the setgid and sticky bits. The database and its
+                       -wal and -shm files are readable and writable by the group. Other users get no access. When
+                       not shared, a new database and its -wal and -shm files are only accessible by their owner
+        """
+        self.path = path
+        self.max_size = max_size
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if shared:
+            _share_directory(directory, None if shared is True else shared)
+            _create_file(path, 0o660)
+            _share(path, 0o660)
+        else:
+            _create_file(path, 0o600)
+        self._db = sqlite3.connect(path, timeout=60)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS results "
+                         "(key TEXT PRIMARY KEY, value BLOB, size INTEGER, atime REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_atime ON results (atime)")
+        self._db.commit()
+
+    def __contains__(self, key):
+        return self._db.execute("SELECT 1 FROM results WHERE key=?", (key,)).fetchone() is not None
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @property
+    def size(self):
+        """total size of stored values in bytes"""
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def __getitem__(self, key):
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys):
+        """
+        Looks up many keys in one transaction
+
+        :param keys: iterable of keys
+        :return: dict of key to value for the keys that are cached
+        """
+        keys = list(set(keys))
+        found = {}
+        now = time.time()
+        with self._db:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._db.execute("SELECT key, value FROM results WHERE key IN ({})".format(
+                    ",".join("?" * len(chunk))), chunk).fetchall()
+                for key, value in rows:
+                    try:
+                        found[key] = _decode(value)
+                    except (ValueError, KeyError, zipfile.BadZipFile):
+                        continue
+                self._db.executemany("UPDATE results SET atime=? WHERE key=?", [(now, key) for key in found])
+        return found
+
+    def put(self, key, value):
+        self.put_many([(key, value)])
+
+    def put_many(self, items):
+        """
+        Stores many (key, value) pairs in one transaction, then evicts least recently used entries if needed
+
+        :raises TypeError: if a value cannot be stored, see :class:`ResultCache`
+        """
+        now = time.time()
+        rows = []
+        for key, value in items:
+            b_value = _encode(value)
+            rows.append((key, b_value, len(b_value), now))
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO results (key, value, size, atime) VALUES (?, ?, ?, ?)",
+                                 rows)
+        self.evict()
+
+    def evict(self, max_size=None):
+        """
+        Removes least recently used entries until the stored size is at most max_size
+
+        :param max_size: defaults to the size given at construction
+        """
+        if max_size is None:
+            max_size = self.max_size
+        excess = self.size - max_size
+        if excess <= 0:
+            return
+        with self._db:
+            rows = self._db.execute("SELECT key, size FROM results ORDER BY atime").fetchall()
+            remove = []
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                remove.append((key,))
+                excess -= size
+            self._db.executemany("DELETE FROM results WHERE key=?", remove)
+
+    def clear(self):
+        with self._db:
+            self._db.execute("DELETE FROM results")
+
+    def close(self):
+        self._db.close()
@@ -21,7 +21,132 @@
 
 import numpy as np
 import logging
+import hashlib
+import math
+import os
+import pickle
+import time
 from multiprocessing_logging import MultiProcessingHandler
+from utilities.cache import ResultCache, function_identity, hash_key
+
+
+def vectorized(f):
+    """
+    Marks a function as vectorized so :meth:`DOE.run` evaluates it on whole batches of cases.
+
+    A vectorized function takes a 2-D array of cases, one case per row, and returns one result per row.
+
+    :param f: function handle
+    :return: f
+    """
+    f.vectorized = True
+    return f
+
+
+class DOEStore():
+    """
+    Append-only on-disk store of DOE results.
+
+    Results are appended in chunks as (indices, results) pickle records behind a header identifying the cases,
+    so a crashed run can be resumed from the last complete chunk.
+    """
+    def __init__(self, path):
+        """
+
+        :param path: file to append results to
+        """
+        self.path = path
+        self._good_offset = None
+
+    @staticmethod
+    def case_hash(cases):
+        return hashlib.sha1(pickle.dumps(np.asarray(cases).tolist() if isinstance(cases, np.ndarray) else list(cases))).hexdigest()
+
+    def load(self, cases):
+        """
+        Reads back the results stored for cases, ignoring a partially written trailing record
+
+        :param cases: cases of the DOE the store belongs to
+        :return: dict of case index to result
+        """
+        results = {}
+        self._good_offset = 0
+        if not os.path.exists(self.path):
+            return results
+        with open(self.path, "rb") as f:
+            try:
+                header = pickle.load(f)
+            except (EOFError, pickle.UnpicklingError):
+                return results
+            if header.get("case_hash") != self.case_hash(cases):
+                raise ValueError("DOE store {} belongs to a different set of cases.".format(self.path))
+            self._good_offset = f.tell()
+            while True:
+                try:
+                    indices, chunk_results = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError, ValueError):
+                    break
+                results.update(zip(indices, chunk_results))
+                self._good_offset = f.tell()
+        return results
+
+    def open(self, cases):
+        """
+        Opens the store for appending, writing the header if the store is new. A partially written trailing record is
+        truncated so appended records stay readable.
+        """
+        if self._good_offset is None:
+            self.load(cases)
+        self._f = open(self.path, "ab")
+        self._f.truncate(self._good_offset)
+        if self._good_offset == 0:
+            pickle.dump({"case_hash": self.case_hash(cases), "ncases": len(cases)}, self._f)
+            self._f.flush()
+        self._good_offset = None
+
+    def append(self, indices, results):
+        pickle.dump((list(indices), list(results)), self._f)
+        self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+
+class DOEProgress():
+    """
+    Progress and throughput of a :meth:`DOE.run`
+    """
+    def __init__(self, total, completed=0):
+        self.total = total
+        """number of cases in the DOE"""
+        self.completed = completed
+        """number of cases with results, including those resumed from a store"""
+        self.evaluated = 0
+        """number of cases evaluated by this run"""
+        self.start_time = time.time()
+
+    def update(self, n):
+        self.completed += n
+        self.evaluated += n
+
+    @property
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    @property
+    def throughput(self):
+        """cases evaluated per second"""
+        elapsed = self.elapsed
+        return self.evaluated / elapsed if elapsed > 0 else 0.
+
+    @property
+    def eta(self):
+        """estimated seconds until all cases are complete"""
+        throughput = self.throughput
+        return (self.total - self.completed) / throughput if throughput > 0 else float("inf")
+
+    def __str__(self):
+        return "{}/{} cases, {:.1f} cases/s, eta {:.1f} s".format(self.completed, self.total, self.throughput, self.eta)
 
 class DOE():
     """
@@ -45,31 +170,117 @@ class DOE():
     def shape(self):
         return (len(self.cases),)
 
-    def run(self, f, nCores=1, **kwargs):
+    def run(self, f, nCores=1, vectorized=None, chunksize=None, store=None, progress=None, cache=None, **kwargs):
         """
 
         :param f: function handle that returns a result
         :param nCores: number of cores to run on. For single threaded, set nCores==1. To multi-thread, set >1.
+        :param vectorized: if True, f is called with a 2-D array of cases and returns one result per row. Default
+                           detects functions marked with :func:`vectorized`.
+        :param chunksize: number of cases per batch, process pool task and store record. Default is tuned from the
+                          number of cases and cores.
+        :param store: optional path of a :class:`DOEStore` results are streamed to. If the store already holds
+                      results for these cases, only the missing cases are run.
+        :param progress: optional callback called with a :class:`DOEProgress` after every chunk
+        :param cache: optional :class:`utilities.cache.ResultCache` or path of one. Cases already cached for f are
+                      not evaluated, repeated cases are evaluated once, and new results are added to the cache.
         :return:
         """
-        self.logger.info("Running {} cases with {} cores.".format(len(self.cases), nCores))
-        if nCores == 1:
-            r = list( map(f, self.cases) )
-        elif nCores > 1:
-            # we have to use pathos.multiprocessing instead of multiprocessing because pathos uses
-            # dill instead of pickle, which works much better with pickling functions
-            # https://stackoverflow.com/a/19985580
-            import pathos.multiprocessing as mp
-            with mp.Pool(nCores) as pool:
-                r = pool.map(f, self.cases)
-        else:
+        if nCores < 1:
             raise ValueError("nCores must be >= 1.")
+        if vectorized is None:
+            vectorized = getattr(f, "vectorized", False)
+
+        done = {}
+        if store is not None:
+            store = DOEStore(store)
+            done = store.load(self.cases)
+            store.open(self.cases)
+        pending = [i for i in range(0, len(self.cases)) if i not in done]
+        self.progress = DOEProgress(len(self.cases), len(done))
+
+        keys = None
+        duplicates = {}
+        if cache is not None:
+            if not isinstance(cache, ResultCache):
+                cache = ResultCache(cache)
+            identity = function_identity(f)
+            keys = {i: hash_key(identity, self.cases[i]) for i in pending}
+            cached = cache.get_many(keys.values())
+            hits = [i for i in pending if keys[i] in cached]
+            if len(hits) > 0:
+                hit_results = [cached[keys[i]] for i in hits]
+                done.update(zip(hits, hit_results))
+                if store is not None:
+                    store.append(hits, hit_results)
+                self.progress.completed += len(hits)
+            # evaluate each distinct case once
+            first = {}
+            unique = []
+            for i in pending:
+                if i in done:
+                    continue
+                if keys[i] in first:
+                    duplicates[i] = first[keys[i]]
+                else:
+                    first[keys[i]] = i
+                    unique.append(i)
+            self.logger.info("{} cases cached, {} duplicates.".format(len(hits), len(duplicates)))
+            pending = unique
+        self.logger.info("Running {} cases with {} cores, {} resumed.".format(len(pending), nCores, len(done)))
+
+        if chunksize is None:
+            max_chunk = 65536 if vectorized else 1024
+            chunksize = min(max_chunk, max(1, math.ceil(len(pending) / (nCores * 4))))
+        chunks = [pending[i:i + chunksize] for i in range(0, len(pending), chunksize)]
+        cases = self.cases
+
+        if vectorized:
+            def run_chunk(chunk):
+                return list(f(np.asarray([cases[i] for i in chunk])))
+        else:
+            def run_chunk(chunk):
+                return [f(cases[i]) for i in chunk]
 
-        self.results = r
+        try:
+            if nCores == 1:
+                self._collect(chunks, map(run_chunk, chunks), done, store, progress, cache, keys)
+            else:
+                # we have to use pathos.multiprocessing instead of multiprocessing because pathos uses
+                # dill instead of pickle, which works much better with pickling functions
+                # https://stackoverflow.com/a/19985580
+                import pathos.multiprocessing as mp
+                with mp.Pool(nCores) as pool:
+                    self._collect(chunks, pool.imap(run_chunk, chunks), done, store, progress, cache, keys)
+            if len(duplicates) > 0:
+                indices = list(duplicates)
+                done.update((i, done[duplicates[i]]) for i in indices)
+                if store is not None:
+                    store.append(indices, [done[i] for i in indices])
+                self.progress.completed += len(indices)
+        finally:
+            if store is not None:
+                store.close()
+
+        self.results = [done[i] for i in range(0, len(self.cases))]
         self.runs = []
         for i in range(0,len(self.results)):
             self.runs.append( [self.cases[i], self.results[i]])
 
+    def _collect(self, chunks, chunk_results, done, store, progress, cache=None, keys=None):
+        for chunk, results in zip(chunks, chunk_results):
+            if len(results) != len(chunk):
+                raise ValueError("Expected {} results from chunk, got {}.".format(len(chunk), len(results)))
+            done.update(zip(chunk, results))
+            if store is not None:
+                store.append(chunk, results)
+            if cache is not None:
+                cache.put_many([(keys[i], r) for i, r in zip(chunk, results)])
+            self.progress.update(len(chunk))
+            self.logger.debug("Progress: {}".format(self.progress))
+            if progress is not None:
+                progress(self.progress)
+
     def plot(self,x,y):
         # choose x,y indices and plot them. maybe support 3d?
         pass
@@ -167,7 +378,7 @@ class LatinHypercube(DOE):
         for iVar in range(0, nVars):
             self.logger.debug("Generating normalized variable.")
             for iCase in range(0, npts):
-                cases[iCase, iVar] = np.random.rand(1) * delta + segments[iCase]
+                cases[iCase, iVar] = np.random.rand() * delta + segments[iCase]
 
             self.logger.debug("Randomizing normalized variable.")
             cases[:,iVar] = np.random.permutation( cases[:,iVar])
@@ -218,6 +429,153 @@ class Random(DOE):
     def shape(self):
         return (self.nCases,)
 
+class Adaptive(DOE):
+    """
+    Adaptive (sequential) DOE
+
+    Starts from a Latin Hypercube seed and adds batches of points where a radial basis function surrogate of the
+    response is least certain ("variance") or changes fastest ("gradient"), until the point budget is spent or the
+    cross-validated surrogate error drops below a target.
+    """
+    def __init__(self, bnds, npts, nseed=None, batch=None, criterion="variance", target_error=None,
+                 ncandidates=None, response=None, seed=None):
+        """
+
+        :param bnds: array of bnds for each variable. example: ( (0,1), (-5,20), (5, 10) )
+        :param npts: maximum number of runs
+        :param nseed: number of Latin Hypercube seed runs. default is a quarter of npts, at least 2*(nVars+1)
+        :param batch: number of runs added per iteration. default is the number of cores passed to run
+        :param criterion: "variance" refines where cross-validation fits disagree most, "gradient" refines where
+                          the surrogate gradient times the distance to the nearest run is largest
+        :param target_error: stop once the cross-validated RMS error, relative to the range of the response, is
+                             below this value. default is None, which spends the whole budget
+        :param ncandidates: number of random candidate points scored per iteration. default is 200*nVars
+        :param response: optional function mapping a result to the scalar that is refined on. default is float
+        :param seed: numpy.random seed. default is None, which uses the current numpy.random seed
+        """
+        self.logger = logging.getLogger(__name__)
+        self.logger.info("Initializing Adaptive DOE object.")
+        if criterion not in ("variance", "gradient"):
+            raise ValueError("criterion must be 'variance' or 'gradient'.")
+        self.bnds = np.asarray(bnds, dtype=float)
+        nVars = len(bnds)
+        self.npts = npts
+        if nseed is None:
+            nseed = max(2 * (nVars + 1), npts // 4)
+        self.nseed = min(nseed, npts)
+        self.batch = batch
+        self.criterion = criterion
+        self.target_error = target_error
+        self.ncandidates = ncandidates if ncandidates is not None else 200 * nVars
+        self.response = response if response is not None else float
+        self.error = None
+        self.history = []
+        if seed is not None:
+            np.random.seed(seed)
+
+        cases = LatinHypercube(bnds, self.nseed).cases
+        self.nCases = cases.shape[0]
+        self.logger.debug("Done initializing Adaptive object.")
+        super().__init__(cases)
+
+    @property
+    def shape(self):
+        return (self.nCases,)
+
+    def run(self, f, nCores=1, **kwargs):
+        """
+
+        :param f: function handle that returns a result
+        :param nCores: number of cores each batch is run on
+        :param kwargs: passed on to :meth:`DOE.run` for every batch, except store which needs a fixed set of cases
+        :return:
+        """
+        if kwargs.pop("store", None) is not None:
+            raise ValueError("Adaptive DOE does not support a results store.")
+        batch = self.batch if self.batch is not None else nCores
+        new_cases = self.cases
+        cases = np.empty((0, len(self.bnds)))
+        results = []
+        self.history = []
+        while True:
+            self.cases = new_cases
+            super().run(f, nCores=nCores, **kwargs)
+            cases = np.vstack((cases, new_cases))
+            results += self.results
+
+            x = self._normalize(cases)
+            y = np.array([self.response(r) for r in results])
+            self.error = self._cv_error(x, y)
+            self.history.append((len(results), self.error))
+            self.logger.info("Adaptive DOE: {} runs, relative cv error {}".format(len(results), self.error))
+
+            nleft = self.npts - len(results)
+            if nleft <= 0 or (self.target_error is not None and self.error <= self.target_error):
+                break
+            new_cases = self._denormalize(self._select(x, y, min(batch, nleft)))
+
+        self.cases = cases
+        self.nCases = cases.shape[0]
+        self.results = results
+        self.runs = []
+        for i in range(0,len(self.results)):
+            self.runs.append( [self.cases[i], self.results[i]])
+
+    def _normalize(self, cases):
+        return (cases - self.bnds.min(axis=1)) / np.abs(self.bnds[:, 1] - self.bnds[:, 0])
+
+    def _denormalize(self, x):
+        return x * np.abs(self.bnds[:, 1] - self.bnds[:, 0]) + self.bnds.min(axis=1)
+
+    @staticmethod
+    def _fit(x, y):
+        from scipy.interpolate import RBFInterpolator
+        return RBFInterpolator(x, y, kernel="thin_plate_spline")
+
+    @staticmethod
+    def _folds(n):
+        k = min(5, n)
+        return np.array_split(np.random.permutation(n), k)
+
+    def _cv_error(self, x, y, folds=None):
+        if folds is None:
+            folds = self._folds(len(y))
+        err = np.empty(len(y))
+        for fold in folds:
+            keep = np.setdiff1d(np.arange(len(y)), fold)
+            err[fold] = self._fit(x[keep], y[keep])(x[fold]) - y[fold]
+        scale = np.ptp(y)
+        return np.sqrt(np.mean(err**2)) / (scale if scale > 0 else 1.)
+
+    def _select(self, x, y, n):
+        candidates = np.random.random_sample((self.ncandidates, x.shape[1]))
+        dist = np.min(np.linalg.norm(candidates[:, None, :] - x[None, :, :], axis=2), axis=1)
+        if self.criterion == "variance":
+            predictions = []
+            for fold in self._folds(len(y)):
+                keep = np.setdiff1d(np.arange(len(y)), fold)
+                predictions.append(self._fit(x[keep], y[keep])(candidates))
+            score = np.std(predictions, axis=0)
+        else:
+            surrogate = self._fit(x, y)
+            h = 1e-4
+            grad = np.empty(candidates.shape)
+            for j in range(0, x.shape[1]):
+                step = np.zeros(x.shape[1])
+                step[j] = h
+                grad[:, j] = (surrogate(candidates + step) - surrogate(candidates - step)) / (2 * h)
+            score = np.linalg.norm(grad, axis=1) * dist
+
+        # greedy batch selection, damping candidates near points already picked so a batch spreads out
+        radius = (1. / len(y))**(1. / x.shape[1])
+        selected = []
+        score = score * np.minimum(1., dist / radius)
+        for i in range(0, n):
+            best = int(np.argmax(score))
+            selected.append(candidates[best])
+            score = score * np.minimum(1., np.linalg.norm(candidates - candidates[best], axis=1) / radius)
+        return np.array(selected)
+
 class FullFactorial(DOE):
     """
     Full Factorial DOE
@@ -0,0 +1,373 @@
+# Copyright (c) 2020 Uber Technologies, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+import itertools
+import numpy as np
+
+
+class Surrogate():
+    """
+    Base class for response surfaces fit to DOE results
+
+    Inputs are scaled to the unit hypercube spanned by the training data.  Outputs may be one response per run,
+    shape (n,), or several, shape (n, m).
+    """
+    # rows predicted at once, bounds the size of temporary arrays
+    CHUNK = 65536
+
+    def __init__(self):
+        self.xmin = None
+        self.xscale = None
+
+    @classmethod
+    def from_doe(cls, doe, response=None, **kwargs):
+        """
+        Fits a surrogate to the runs of a :class:`utilities.runners.DOE`
+
+        :param doe: DOE that has been run
+        :param response: optional function mapping a result to the response(s) to fit. default uses the result
+        :param kwargs: surrogate settings
+        :return: fitted surrogate
+        """
+        if doe.runs is None:
+            raise AttributeError("Cannot fit a surrogate until the DOE has been run with the run method.")
+        x = np.asarray([run[0] for run in doe.runs], dtype=float)
+        if response is None:
+            y = np.asarray([run[1] for run in doe.runs], dtype=float)
+        else:
+            y = np.asarray([response(run[1]) for run in doe.runs], dtype=float)
+        return cls(**kwargs).fit(x, y)
+
+    def fit(self, x, y):
+        """
+        Fits the surrogate
+
+        :param x: (n, d) array of inputs
+        :param y: (n,) or (n, m) array of responses
+        :return: self
+        """
+        x = np.atleast_2d(np.asarray(x, dtype=float))
+        if x.shape[0] == 1 and len(y) > 1:
+            x = x.T
+        self.xmin = x.min(axis=0)
+        self.xscale = np.ptp(x, axis=0)
+        self.xscale[self.xscale == 0] = 1.
+        self._fit(self._scale(x), np.asarray(y, dtype=float))
+        return self
+
+    def predict(self, x):
+        """
+        Evaluates the surrogate
+
+        :param x: (N, d) array of inputs, or (d,) for a single point. A one input surrogate also takes (N,) inputs
+        :return: (N,) or (N, m) array of predictions
+        """
+        x, single = self._as_points(x)
+        x = self._scale(x)
+        if x.shape[0] <= self.CHUNK:
+            y = self._predict(x)
+        else:
+            y = np.concatenate([self._predict(x[i:i + self.CHUNK]) for i in range(0, x.shape[0], self.CHUNK)])
+        return y[0] if single else y
+
+    __call__ = predict
+
+    @property
+    def n_inputs(self):
+        """number of input variables of the fitted surrogate"""
+        return len(self.xmin)
+
+    def _as_points(self, x):
+        """
+        Converts inputs to an (N, d) array, like :meth:`fit` a 1-D array holds N points of a one input surrogate
+
+        :return: array of points and whether x was a single point
+        """
+        x = np.asarray(x, dtype=float)
+        if x.ndim == 1 and self.n_inputs == 1:
+            return x[:, None], False
+        return np.atleast_2d(x), x.ndim <= 1
+
+    def cross_validate(self, x, y, k=5, seed=None):
+        """
+        k-fold cross-validation of this surrogate's settings on (x, y). The surrogate itself is not changed.
+
+        :param x: (n, d) array of inputs
+        :param y: (n,) or (n, m) array of responses
+        :param k: number of folds
+        :param seed: seed for the fold assignment
+        :return: dict with the out-of-fold "predictions", "rmse" and "relative_rmse" (rmse / range of y)
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        rng = np.random.RandomState(seed)
+        folds = np.array_split(rng.permutation(len(y)), min(k, len(y)))
+        predictions = np.empty(y.shape)
+        for fold in folds:
+            keep = np.setdiff1d(np.arange(len(y)), fold)
+            model = self.__class__(**self._settings()).fit(x[keep], y[keep])
+            predictions[fold] = model.predict(x[fold])
+        rmse = np.sqrt(np.mean((predictions - y)**2, axis=0))
+        scale = np.ptp(y, axis=0)
+        return {"predictions": predictions, "rmse": rmse,
+                "relative_rmse": rmse / np.where(scale > 0, scale, 1.)}
+
+    def save(self, filename):
+        """
+        Saves the fitted surrogate to a .npz file
+        """
+        state = self._state()
+        state["xmin"] = self.xmin
+        state["xscale"] = self.xscale
+        settings = {"setting_" + key: value for key, value in self._settings().items()}
+        np.savez(filename, surrogate_type=self.__class__.__name__, **settings, **state)
+
+    @staticmethod
+    def load(filename):
+        """
+        Loads a surrogate saved with :meth:`save`
+        """
+        with np.load(filename, allow_pickle=False) as data:
+            cls = _SURROGATES[str(data["surrogate_type"])]
+            settings = {key[len("setting_"):]: data[key].item() if data[key].ndim == 0 else data[key]
+                        for key in data.files if key.startswith("setting_")}
+            model = cls(**settings)
+            model.xmin = data["xmin"]
+            model.xscale = data["xscale"]
+            model._set_state({key: data[key] for key in data.files
+                              if key not in ("surrogate_type", "xmin", "xscale") and not key.startswith("setting_")})
+        return model
+
+    def _scale(self, x):
+        return (x - self.xmin) / self.xscale
+
+    def _settings(self):
+        return {}
+
+    def _state(self):
+        raise NotImplementedError
+
+    def _set_state(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    def _fit(self, x, y):
+        raise NotImplementedError
+
+    def _predict(self, x):
+        raise NotImplementedError
+
+
+def _monomials(x, exponents):
+    terms = np.ones((x.shape[0], len(exponents)))
+    for j, exponent in enumerate(exponents):
+        for i, p in enumerate(exponent):
+            if p > 0:
+                terms[:, j] *= x[:, i]**p
+    return terms
+
+
+class PolynomialSurrogate(Surrogate):
+    """
+    Least squares polynomial response surface
+    """
+    def __init__(self, degree=2):
+        """
+
+        :param degree: total degree of the polynomial
+        """
+        super().__init__()
+        self.degree = degree
+        self.exponents = None
+        self.coefficients = None
+
+    def _settings(self):
+        return {"degree": self.degree}
+
+    def _state(self):
+        return {"exponents": self.exponents, "coefficients": self.coefficients}
+
+    def _fit(self, x, y):
+        d = x.shape[1]
+        self.exponents = np.array([e for e in itertools.product(range(self.degree + 1), repeat=d)
+                                   if sum(e) <= self.degree], dtype=int).reshape(-1, d)
+        self.coefficients = np.linalg.lstsq(_monomials(x, self.exponents), y, rcond=None)[0]
+
+    def _predict(self, x):
+        return _monomials(x, self.exponents) @ self.coefficients
+
+
+def _sq_distances(a, b):
+    d2 = np.sum(a**2, axis=1)[:, None] + np.sum(b**2, axis=1)[None, :] - 2 * a @ b.T
+    return np.maximum(d2, 0.)
+
+
+class RBFSurrogate(Surrogate):
+    """
+    Radial basis function interpolant with a linear polynomial tail
+    """
+    KERNELS = {
+        "cubic": lambda r2, eps: r2 * np.sqrt(r2),
+        "thin_plate_spline": lambda r2, eps: 0.5 * r2 * np.log(np.where(r2 > 0, r2, 1.)),
+        "gaussian": lambda r2, eps: np.exp(-eps**2 * r2),
+        "multiquadric": lambda r2, eps: -np.sqrt(1. + eps**2 * r2),
+    }
+
+    def __init__(self, kernel="cubic", epsilon=1.0, smoothing=0.0):
+        """
+
+        :param kernel: "cubic", "thin_plate_spline", "gaussian" or "multiquadric"
+        :param epsilon: shape parameter of the gaussian and multiquadric kernels, in scaled input units
+        :param smoothing: added to the kernel matrix diagonal, 0 interpolates the data exactly
+        """
+        super().__init__()
+        if kernel not in self.KERNELS:
+            raise ValueError("Unknown RBF kernel {}.".format(kernel))
+        self.kernel = kernel
+        self.epsilon = epsilon
+        self.smoothing = smoothing
+        self.centers = None
+        self.weights = None
+        self.tail = None
+
+    def _settings(self):
+        return {"kernel": self.kernel, "epsilon": self.epsilon, "smoothing": self.smoothing}
+
+    def _state(self):
+        return {"centers": self.centers, "weights": self.weights, "tail": self.tail}
+
+    def _fit(self, x, y):
+        n, d = x.shape
+        phi = self.KERNELS[self.kernel]
+        a = phi(_sq_distances(x, x), self.epsilon) + self.smoothing * np.eye(n)
+        p = np.hstack((np.ones((n, 1)), x))
+        lhs = np.block([[a, p], [p.T, np.zeros((d + 1, d + 1))]])
+        rhs = np.concatenate((y, np.zeros((d + 1,) + y.shape[1:])))
+        solution = np.linalg.lstsq(lhs, rhs, rcond=None)[0]
+        self.centers = x
+        self.weights = solution[:n]
+        self.tail = solution[n:]
+
+    def _predict(self, x):
+        phi = self.KERNELS[self.kernel]
+        return phi(_sq_distances(x, self.centers), self.epsilon) @ self.weights + \
+            np.hstack((np.ones((x.shape[0], 1)), x)) @ self.tail
+
+
+class KrigingSurrogate(Surrogate):
+    """
+    Ordinary kriging (Gaussian process with constant mean and Gaussian correlation)
+
+    Correlation lengths are found by maximizing the concentrated likelihood unless theta is given.
+    :meth:`predict_variance` gives the kriging mean squared error, useful as an uncertainty estimate.
+    """
+    def __init__(self, theta=None, nugget=1e-10):
+        """
+
+        :param theta: optional correlation parameters, one per input, in scaled input units
+        :param nugget: added to the correlation matrix diagonal for conditioning, relative to 1
+        """
+        super().__init__()
+        self.fixed_theta = theta
+        self.theta = theta
+        self.nugget = nugget
+        self.centers = None
+        self.mean = None
+        self.sigma2 = None
+        self.weights = None
+        self.cholesky = None
+        self.rinv_ones = None
+
+    def _settings(self):
+        if self.fixed_theta is None:
+            return {"nugget": self.nugget}
+        return {"theta": np.asarray(self.fixed_theta, dtype=float), "nugget": self.nugget}
+
+    def _state(self):
+        return {"theta": np.asarray(self.theta), "centers": self.centers, "mean": self.mean,
+                "sigma2": self.sigma2, "weights": self.weights, "cholesky": self.cholesky,
+                "rinv_ones": self.rinv_ones}
+
+    def _correlation(self, a, b, theta):
+        scale = np.sqrt(theta)
+        return np.exp(-_sq_distances(a * scale, b * scale))
+
+    def _solve(self, x, y, theta):
+        from scipy.linalg import cho_factor, cho_solve
+        n = x.shape[0]
+        r = self._correlation(x, x, theta) + self.nugget * np.eye(n)
+        c = cho_factor(r, lower=True)
+        ones = np.ones(n)
+        rinv_ones = cho_solve(c, ones)
+        mean = rinv_ones @ y / (ones @ rinv_ones)
+        resid = y - mean
+        rinv_resid = cho_solve(c, resid)
+        sigma2 = np.sum(resid * rinv_resid, axis=0) / n
+        logdet = 2 * np.sum(np.log(np.diag(c[0])))
+        nll = 0.5 * n * np.sum(np.log(np.maximum(sigma2, 1e-300))) + 0.5 * logdet * np.size(sigma2)
+        return nll, c, mean, sigma2, rinv_resid, rinv_ones
+
+    def _fit(self, x, y):
+        from scipy.optimize import minimize
+        d = x.shape[1]
+        if self.fixed_theta is None:
+            def objective(log_theta):
+                try:
+                    return self._solve(x, y, 10**log_theta)[0]
+                except np.linalg.LinAlgError:
+                    return 1e300
+            starts = [np.full(d, s) for s in (-1., 0., 1.)]
+            best = min((minimize(objective, s, method="L-BFGS-B", bounds=[(-3., 3.)] * d) for s in starts),
+                       key=lambda result: result.fun)
+            theta = 10**best.x
+        else:
+            theta = np.broadcast_to(np.asarray(self.fixed_theta, dtype=float), (d,)).copy()
+        _, c, self.mean, self.sigma2, self.weights, self.rinv_ones = self._solve(x, y, theta)
+        self.theta = theta
+        self.cholesky = c[0]
+        self.centers = x
+
+    def _predict(self, x):
+        return self.mean + self._correlation(x, self.centers, self.theta) @ self.weights
+
+    def predict_variance(self, x):
+        """
+        Kriging mean squared error at x
+
+        :param x: (N, d) array of inputs, or (d,) for a single point. A one input surrogate also takes (N,) inputs
+        :return: (N,) or (N, m) array of variances
+        """
+        from scipy.linalg import solve_triangular
+        x, single = self._as_points(x)
+        x = self._scale(x)
+        variances = []
+        ones = np.ones(self.centers.shape[0])
+        for i in range(0, x.shape[0], self.CHUNK):
+            r = self._correlation(x[i:i + self.CHUNK], self.centers, self.theta)
+            v = solve_triangular(self.cholesky, r.T, lower=True)
+            u = 1. - r @ self.rinv_ones
+            mse = 1. - np.sum(v**2, axis=0) + u**2 / (ones @ self.rinv_ones)
+            variances.append(np.multiply.outer(np.maximum(mse, 0.), self.sigma2))
+        v = np.concatenate(variances)
+        return v[0] if single else v
+
+
+_SURROGATES = {cls.__name__: cls for cls in (PolynomialSurrogate, RBFSurrogate, KrigingSurrogate)}
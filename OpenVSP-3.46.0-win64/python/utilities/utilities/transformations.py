@@ -112,6 +112,32 @@ class TransMatrix:
 
         return self.apply_translations(self.apply_rotations(vector))
 
+    def transform_points(self, points):
+        """
+        Applies transformations to an array of points
+        :param points: (N, 3) array with a point in each row, or a single (3,) point
+        :return: transformed points, same shape as the input
+        """
+        return transform_points(self.mat, points)
+
+    def rotate_points(self, points):
+        """
+        Applies rotations to an array of points
+        :param points: (N, 3) array with a point in each row, or a single (3,) point
+        :return: rotated points, same shape as the input
+        """
+        return rotate_points(self.mat[0:3, 0:3], points)
+
+    @staticmethod
+    def compose(*transforms):
+        """
+        Folds a chain of transformations into a single transformation matrix
+        :param transforms: TransMatrix objects, 4x4 matrices or 3x3 rotation matrices in the order they are applied, so
+            compose(a2b, b2c) transforms from frame a to frame c
+        :return: transformation matrix
+        """
+        return TransMatrix(compose_transformations(*transforms))
+
     def get_inverse_transform(self):
         """
         Returns a transformation matrix that will result in the inverse
@@ -226,15 +252,103 @@ def _convert_to_column_vector(vector):
     return column_vector
 
 
-def dcm_body2wind(alpha, beta):
-    dcm = np.array(((np.cos(alpha) * np.cos(beta), np.sin(beta), np.sin(alpha) * np.cos(beta)),
-                    (-np.cos(alpha) * np.sin(beta), np.cos(beta), -np.sin(alpha) * np.sin(beta)),
-                    (-np.sin(alpha), 0., np.cos(alpha),)))
+def _as_homogeneous(transform):
+    """
+    Converts a TransMatrix, 3x3 rotation matrix or stack of either into 4x4 homogeneous matrices
+    :param transform: TransMatrix, (..., 4, 4) or (..., 3, 3) array
+    :return: (..., 4, 4) array
+    """
+    if isinstance(transform, TransMatrix):
+        return transform.mat
+    mat = np.asarray(transform, dtype=float)
+    if mat.shape[-2:] == (4, 4):
+        return mat
+    if mat.shape[-2:] != (3, 3):
+        raise ValueError("transform must be (..., 4, 4) or (..., 3, 3) not {}".format(mat.shape))
+    homogeneous = np.zeros(mat.shape[:-2] + (4, 4))
+    homogeneous[..., 0:3, 0:3] = mat
+    homogeneous[..., 3, 3] = 1.0
+    return homogeneous
+
+
+def compose_transformations(*transforms):
+    """
+    Folds a chain of transformations into a single matrix, so each point is transformed once
+    :param transforms: TransMatrix objects, 4x4 matrices, 3x3 rotation matrices or (N, 4, 4)/(N, 3, 3) stacks of them
+        in the order they are applied. Stacks are broadcast against each other and against single matrices.
+    :return: (4, 4) matrix, or (N, 4, 4) stack if any input was a stack
+    """
+    result = np.identity(4)
+    for transform in transforms:
+        result = np.matmul(_as_homogeneous(transform), result)
+    return result
+
+
+def transform_points(mats, points):
+    """
+    Applies transformation matrices to an array of points
+    :param mats: (4, 4) matrix applied to every point, or (N, 4, 4) stack with one matrix per point
+    :param points: (N, 3) array with a point in each row, or a single (3,) point
+    :return: transformed points, same shape as the input
+    """
+    mats = _as_homogeneous(mats)
+    return rotate_points(mats[..., 0:3, 0:3], points) + mats[..., 0:3, 3]
+
+
+def rotate_points(dcms, points):
+    """
+    Applies rotation matrices to an array of points
+    :param dcms: (3, 3) matrix applied to every point, or (N, 3, 3) stack with one matrix per point
+    :param points: (N, 3) array with a point in each row, or a single (3,) point
+    :return: rotated points, same shape as the input
+    """
+    dcms = np.asarray(dcms)
+    points = np.asarray(points, dtype=float)
+    if dcms.ndim == 2:
+        return np.matmul(points, dcms.T)
+    return np.einsum("nij,nj->ni", dcms, points)
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_dcm_body2wind(alpha, beta):
+    dcm = _build_dcm_body2wind(alpha, beta)
+    dcm.flags.writeable = False
+    return dcm
+
+
+def _build_dcm_body2wind(alpha, beta):
+    ca = np.cos(alpha)
+    sa = np.sin(alpha)
+    cb = np.cos(beta)
+    sb = np.sin(beta)
+    dcm = np.empty(np.shape(ca + cb) + (3, 3))
+    dcm[..., 0, 0] = ca * cb
+    dcm[..., 0, 1] = sb
+    dcm[..., 0, 2] = sa * cb
+    dcm[..., 1, 0] = -ca * sb
+    dcm[..., 1, 1] = cb
+    dcm[..., 1, 2] = -sa * sb
+    dcm[..., 2, 0] = -sa
+    dcm[..., 2, 1] = 0.
+    dcm[..., 2, 2] = ca
     return dcm
 
 
+def dcm_body2wind(alpha, beta):
+    """
+    Direction cosine matrix from body to wind axes. Matrices for scalar angles are cached and read only.
+    :param alpha: angle of attack (radians), scalar or array
+    :param beta: sideslip angle (radians), scalar or array
+    :return: (3, 3) matrix, or (N, 3, 3) stack for array angles
+    """
+    if np.ndim(alpha) == 0 and np.ndim(beta) == 0:
+        return _cached_dcm_body2wind(float(alpha), float(beta))
+    return _build_dcm_body2wind(np.asarray(alpha, dtype=float), np.asarray(beta, dtype=float))
+
+
 def dcm_wind2body(alpha, beta):
-    dcm = np.linalg.inv(dcm_body2wind(alpha, beta))
+    # Direction cosine matrices are orthonormal, so the inverse is the transpose
+    dcm = np.swapaxes(dcm_body2wind(alpha, beta), -1, -2)
 
     return dcm
 
@@ -247,7 +361,7 @@ def dcm_body2stability(alpha):
 
 
 def dcm_stability2body(alpha):
-    dcm = np.linalg.inv(dcm_body2stability(alpha))
+    dcm = np.swapaxes(dcm_body2stability(alpha), -1, -2)
 
     return dcm
 
@@ -260,7 +374,7 @@ def dcm_stability2wind(beta):
 
 
 def dcm_wind2stability(beta):
-    dcm = np.linalg.inv(dcm_stability2wind(beta))
+    dcm = np.swapaxes(dcm_stability2wind(beta), -1, -2)
 
     return dcm
 
@@ -300,16 +414,41 @@ def body2wind(vector, alpha, beta):
 
     return np.matmul(dcm, _convert_to_column_vector(vector))
 
-def coord_transform(vector,from_axes, to_axes, alpha=0,beta=0):
+def dcm_transform(from_axes, to_axes, alpha=0, beta=0):
+    """
+    Direction cosine matrix between body, stability and wind axes
+    :param from_axes: 'body', 'stability' or 'wind'
+    :param to_axes: 'body', 'stability' or 'wind'
+    :param alpha: angle of attack (radians), scalar or array
+    :param beta: sideslip angle (radians), scalar or array
+    :return: (3, 3) matrix, or (N, 3, 3) stack for array angles
+    """
     func_mapping = {('wind','body'):(dcm_wind2body,(alpha,beta)),
                     ('wind','stability'):(dcm_wind2stability,(beta,)),
                     ('stability','wind'):(dcm_stability2wind,(beta,)),
                     ('stability','body'):(dcm_stability2body,(alpha,)),
-                    ('body','stability'):(body2stability,(alpha,)),
-                    ('body','wind'):(body2wind,(alpha,beta))}
+                    ('body','stability'):(dcm_body2stability,(alpha,)),
+                    ('body','wind'):(dcm_body2wind,(alpha,beta))}
 
     f, args = func_mapping[(from_axes,to_axes)]
 
-    dcm = f(*args)
+    return f(*args)
+
+
+def coord_transform(vector,from_axes, to_axes, alpha=0,beta=0):
+    dcm = dcm_transform(from_axes, to_axes, alpha=alpha, beta=beta)
 
     return np.matmul(dcm, _convert_to_column_vector(vector))
+
+
+def frame_transform(points, from_axes, to_axes, alpha=0, beta=0):
+    """
+    Transforms an array of points or vectors between body, stability and wind axes
+    :param points: (N, 3) array with a vector in each row, or a single (3,) vector
+    :param from_axes: 'body', 'stability' or 'wind'
+    :param to_axes: 'body', 'stability' or 'wind'
+    :param alpha: angle of attack (radians), scalar or (N,) array with an angle for each vector
+    :param beta: sideslip angle (radians), scalar or (N,) array with an angle for each vector
+    :return: transformed vectors, same shape as the input
+    """
+    return rotate_points(dcm_transform(from_axes, to_axes, alpha=alpha, beta=beta), points)
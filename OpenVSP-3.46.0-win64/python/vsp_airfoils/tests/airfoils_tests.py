@@ -20,7 +20,9 @@ import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import unittest
-from vsp_airfoils import airfoil, kulfanAirfoil, Naca16, Naca4
+from vsp_airfoils import airfoil, kulfanAirfoil, Naca16, Naca4, cst_coordinates, cst_jacobian, \
+    AirfoilDatabase
+import numpy as np
 import os
 
 
@@ -55,6 +57,38 @@ class AirfoilTest(unittest.TestCase):
         a.plot()
         plt.savefig(self.get_outputname("kulfan.png"), dpi=300)
 
+    def test_kulfan_batch(self):
+        N = 200
+        wl = -np.random.rand(20, 4)
+        wu = np.random.rand(20, 5)
+        x, y = cst_coordinates(wl, wu, dz=0.01, N=N)
+        self.assertEqual(y.shape, (20, N))
+        a = kulfanAirfoil(wl=wl[3], wu=wu[3], dz=0.01, N=N)
+        np.testing.assert_allclose(a.y, y[3])
+
+        dy_dwl, dy_dwu, dy_ddz = cst_jacobian(4, 5, N=N)
+        np.testing.assert_allclose(y, wl @ dy_dwl.T + wu @ dy_dwu.T + 0.01 * dy_ddz, atol=1e-12)
+
+    def test_naca4_family(self):
+        family = Naca4.family([0, 2, 4], [0, 4, 4], [12, 12, 15], nPts=50, half_cosine_spacing=True)
+        self.assertEqual([a.to_naca_string() for a in family], ["0012", "2412", "4415"])
+        single = Naca4(2, 4, 12, nPts=50, half_cosine_spacing=True)
+        for s1, s2 in zip(family[1].segments, single.segments):
+            np.testing.assert_allclose(s1, s2)
+
+    def test_airfoil_database(self):
+        db = AirfoilDatabase()
+        db.ingest(self.INPUT_FOLDER)
+        self.assertEqual(sorted(db.names), ["N0012_VSP", "N0012_VSP_sym", "clarky", "e387"])
+        self.assertAlmostEqual(db.info("N0012_VSP")["thickness"], 0.12, places=3)
+
+        db.save(self.get_outputname("airfoil_db"))
+        db = AirfoilDatabase(self.get_outputname("airfoil_db"))
+        self.assertEqual(db.coords("clarky").shape, (122, 2))
+        self.assertEqual([n for n, d in db.similar("N0012_VSP", 2)], ["N0012_VSP", "N0012_VSP_sym"])
+        self.assertEqual(db.query(camber=(0.03, None)), ["clarky", "e387"])
+        self.assertEqual(db.ingest(self.INPUT_FOLDER), [])
+
     def test_vsp_nonsym_parse(self):
         a = airfoil(self.get_inputname("N0012_VSP.af"))
         self.assertTrue(True)
@@ -1 +1,2 @@
-from .vsp_airfoils import *
\ No newline at end of file
+from .vsp_airfoils import *
+from .airfoil_database import AirfoilDatabase, parse_airfoil_file
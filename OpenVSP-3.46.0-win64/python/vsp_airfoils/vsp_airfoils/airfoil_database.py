@@ -0,0 +1,366 @@
+# Copyright (c) 2020 Uber Technologies, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import json
+import os
+
+import numpy as np
+
+from .vsp_airfoils import airfoil, AirfoilType
+
+
+class AirfoilDatabase():
+    """
+    Indexed store of airfoil coordinate files.
+
+    Directories of Selig, Lednicer and VSP .af files are parsed once into a single coordinate array plus an index of
+    name -> (offset, format, point counts, thickness, camber). Saved stores are memory mapped, so coordinates are
+    only read from disk when a section is accessed, and thickness/camber/shape queries run on the index arrays alone.
+
+    Coordinates are stored as the upper surface from leading to trailing edge followed by the lower surface from
+    leading to trailing edge.
+    """
+    INDEX_FILE = "index.json"
+    COORDS_FILE = "coords.npy"
+    SHAPES_FILE = "shapes.npy"
+
+    # chordwise stations at which the shape vectors used for similarity queries are sampled
+    STATIONS = 0.5 * (1 - np.cos(np.linspace(0, np.pi, 41)))
+
+    def __init__(self, path=None):
+        """
+
+        :param path: store directory, loaded if it exists (optional)
+        """
+        self.path = path
+        self.records = []
+        self._names = {}
+        self._coords = np.empty((0, 2))
+        self._new_coords = []
+        self._n_coords = 0
+        self._shapes = np.empty((0, 2 * len(self.STATIONS)))
+        self._features = np.empty((0, 2))
+        if path is not None and os.path.isfile(os.path.join(path, self.INDEX_FILE)):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __iter__(self):
+        return iter(self.names)
+
+    @property
+    def names(self):
+        return [r["name"] for r in self.records]
+
+    @property
+    def thickness(self):
+        """max thickness to chord ratio of every section, in index order"""
+        return self._features[:, 0]
+
+    @property
+    def camber(self):
+        """max camber to chord ratio of every section, in index order"""
+        return self._features[:, 1]
+
+    def load(self, path):
+        """
+        Loads a saved store, memory mapping the coordinate array
+
+        :param path: store directory
+        :return: None
+        """
+        self.path = path
+        with open(os.path.join(path, self.INDEX_FILE), "r") as f:
+            self.records = json.load(f)
+        self._names = {r["name"]: i for i, r in enumerate(self.records)}
+        self._coords = np.load(os.path.join(path, self.COORDS_FILE), mmap_mode="r")
+        self._n_coords = self._coords.shape[0]
+        self._new_coords = []
+        self._shapes = np.load(os.path.join(path, self.SHAPES_FILE))
+        self._features = np.array([[r["thickness"], r["camber"]] for r in self.records]).reshape(-1, 2)
+
+    def save(self, path=None):
+        """
+        Writes the store to disk
+
+        :param path: store directory (default, the directory the store was loaded from)
+        :return: path to the store directory
+        """
+        if path is None:
+            path = self.path
+        if path is None:
+            raise ValueError("No path given for the airfoil database")
+        os.makedirs(path, exist_ok=True)
+        # compact the coordinates, dropping those of sections that were re-ingested, so the file is written from
+        # memory rather than from a memory map of the destination
+        coords = self._all_coords()
+        offset = 0
+        blocks = []
+        for r in self.records:
+            n = r["n_upper"] + r["n_lower"]
+            blocks.append(coords[r["offset"]:r["offset"] + n])
+            r["offset"] = offset
+            offset += n
+        coords = np.concatenate(blocks) if blocks else np.empty((0, 2))
+        self._coords = None
+        np.save(os.path.join(path, self.COORDS_FILE), coords)
+        np.save(os.path.join(path, self.SHAPES_FILE), self._shapes)
+        with open(os.path.join(path, self.INDEX_FILE), "w") as f:
+            json.dump(self.records, f)
+        self.load(path)
+        return path
+
+    def ingest(self, *paths, extensions=(".dat", ".af", ".txt"), recursive=True):
+        """
+        Parses airfoil coordinate files into the store. Files that are already in the store and have not changed
+        since are skipped, as are files that are not recognized as airfoil coordinates.
+
+        :param paths: files or directories to ingest
+        :param extensions: file extensions to consider when scanning directories
+        :param recursive: scan sub-directories
+        :return: list of names that were added or updated
+        """
+        files = []
+        for p in paths:
+            if os.path.isdir(p):
+                for root, dirs, fnames in os.walk(p):
+                    files.extend(os.path.join(root, f) for f in sorted(fnames) if f.lower().endswith(extensions))
+                    if not recursive:
+                        break
+            else:
+                files.append(p)
+
+        by_file = {r["file"]: i for i, r in enumerate(self.records)}
+        updated = []
+        shapes = []
+        for fname in files:
+            fname = os.path.abspath(fname)
+            stat = os.stat(fname)
+            i = by_file.get(fname)
+            if i is not None and self.records[i]["mtime"] == stat.st_mtime and self.records[i]["size"] == stat.st_size:
+                continue
+            try:
+                fmt, upper, lower = parse_airfoil_file(fname)
+                shape, features = _section_shape(upper, lower, self.STATIONS)
+            except (ValueError, IndexError, UnicodeDecodeError):
+                continue
+
+            record = dict(name=self._unique_name(fname) if i is None else self.records[i]["name"],
+                          file=fname, format=fmt.name, mtime=stat.st_mtime, size=stat.st_size,
+                          offset=self._n_coords, n_upper=upper.shape[0], n_lower=lower.shape[0])
+            record.update(features)
+            self._new_coords.append(upper)
+            self._new_coords.append(lower)
+            self._n_coords += upper.shape[0] + lower.shape[0]
+
+            if i is None:
+                by_file[fname] = self._names[record["name"]] = len(self.records)
+                self.records.append(record)
+                shapes.append(shape)
+            else:
+                self.records[i] = record
+                self._shapes[i] = shape
+            updated.append(record["name"])
+
+        if shapes:
+            self._shapes = np.vstack([self._shapes] + shapes)
+        self._features = np.array([[r["thickness"], r["camber"]] for r in self.records]).reshape(-1, 2)
+        return updated
+
+    def info(self, name):
+        """
+        :param name: section name
+        :return: index record of the section
+        """
+        return self.records[self._names[name]]
+
+    def coords(self, name):
+        """
+        :param name: section name
+        :return: (n_upper+n_lower)x2 array view of the upper then lower surface coordinates
+        """
+        r = self.info(name)
+        return self._coords_slice(r["offset"], r["offset"] + r["n_upper"] + r["n_lower"])
+
+    def segments(self, name):
+        """
+        :param name: section name
+        :return: [upper, lower] list of array views, both running from the leading edge to the trailing edge
+        """
+        c = self.coords(name)
+        n_upper = self.info(name)["n_upper"]
+        return [c[:n_upper], c[n_upper:]]
+
+    def airfoil(self, name):
+        """
+        :param name: section name
+        :return: airfoil object for the section
+        """
+        a = airfoil(segments=[np.array(s) for s in self.segments(name)])
+        a.file = self.info(name)["file"]
+        a.type = AirfoilType[self.info(name)["format"]]
+        return a
+
+    def query(self, thickness=None, camber=None):
+        """
+        Finds sections within thickness and camber ranges
+
+        :param thickness: (min, max) thickness to chord ratio, either bound may be None
+        :param camber: (min, max) camber to chord ratio, either bound may be None
+        :return: list of section names
+        """
+        mask = np.ones(len(self.records), dtype=bool)
+        for values, bounds in ((self.thickness, thickness), (self.camber, camber)):
+            if bounds is None:
+                continue
+            lo, hi = bounds
+            if lo is not None:
+                mask &= values >= lo
+            if hi is not None:
+                mask &= values <= hi
+        return [self.records[i]["name"] for i in np.flatnonzero(mask)]
+
+    def similar(self, target, n=5):
+        """
+        Finds the sections whose shape is closest to target, measured as the RMS difference of the upper and lower
+        surfaces sampled at common chordwise stations
+
+        :param target: section name in the store, or [upper, lower] segments running from leading to trailing edge
+        :param n: number of sections to return
+        :return: list of (name, rms distance) tuples, closest first
+        """
+        if isinstance(target, str):
+            shape = self._shapes[self._names[target]]
+        else:
+            shape, _ = _section_shape(np.asarray(target[0]), np.asarray(target[1]), self.STATIONS)
+        dist = np.sqrt(np.mean((self._shapes - shape) ** 2, axis=1))
+        n = min(n, dist.shape[0])
+        if n == 0:
+            return []
+        order = np.argpartition(dist, n - 1)[:n]
+        order = order[np.argsort(dist[order])]
+        return [(self.records[i]["name"], float(dist[i])) for i in order]
+
+    def _coords_slice(self, start, end):
+        if end > self._coords.shape[0]:
+            self._coords = self._all_coords()
+        return self._coords[start:end]
+
+    def _all_coords(self):
+        if self._new_coords:
+            self._coords = np.concatenate([self._coords] + self._new_coords)
+            self._new_coords = []
+        return self._coords
+
+    def _unique_name(self, fname):
+        name = os.path.splitext(os.path.basename(fname))[0]
+        if name not in self._names:
+            return name
+        name = "{}/{}".format(os.path.basename(os.path.dirname(fname)), name)
+        unique, k = name, 1
+        while unique in self._names:
+            unique = "{}_{}".format(name, k)
+            k += 1
+        return unique
+
+
+def parse_airfoil_file(fname):
+    """
+    Parses a Selig, Lednicer or VSP .af airfoil coordinate file in bulk
+
+    :param fname: coordinate file
+    :return: (AirfoilType, upper, lower) tuple, the surfaces are nx2 arrays running from leading to trailing edge
+    """
+    with open(fname, "r") as f:
+        lines = f.read().splitlines()
+    lines = [l for l in lines if l.strip() and not l.lstrip().startswith("#")]
+
+    if len(lines) > 3 and "sym flag" in lines[2].lower():
+        sym = int(lines[2].split()[0])
+        n_upper = int(lines[3].split()[0])
+        if sym:
+            pts = _parse_points(lines[4:4 + n_upper])
+            lower = pts.copy()
+            lower[:, 1] = -lower[:, 1]
+            return AirfoilType.vsp_sym, pts, lower
+        n_lower = int(lines[4].split()[0])
+        pts = _parse_points(lines[5:5 + n_upper + n_lower])
+        return AirfoilType.vsp_nonsym, pts[:n_upper], pts[n_upper:]
+
+    # the title line is optional
+    try:
+        first = _parse_points(lines[:1])
+        start = 0
+    except ValueError:
+        first = _parse_points(lines[1:2])
+        start = 1
+
+    if first[0, 0] > 1.5 and first[0, 1] > 1.5:
+        n_upper, n_lower = int(first[0, 0]), int(first[0, 1])
+        pts = _parse_points(lines[start + 1:start + 1 + n_upper + n_lower])
+        if pts.shape[0] != n_upper + n_lower:
+            raise ValueError("Lednicer point counts do not match the file")
+        return AirfoilType.lednicer, pts[:n_upper], pts[n_upper:]
+
+    pts = _parse_points(lines[start:])
+    if pts.shape[0] < 5:
+        raise ValueError("Not enough points for an airfoil")
+    le = int(np.argmin(pts[:, 0]))
+    upper = pts[:le + 1][::-1]
+    lower = pts[le:]
+    if upper[:, 1].mean() < lower[:, 1].mean():
+        upper, lower = lower, upper
+    return AirfoilType.selig, np.ascontiguousarray(upper), lower
+
+
+def _parse_points(lines):
+    values = np.array(" ".join(lines).replace(",", " ").split(), dtype=float)
+    if values.size == 0 or values.size % 2:
+        raise ValueError("Coordinate lines do not contain (x,y) pairs")
+    return values.reshape(-1, 2)
+
+
+def _section_shape(upper, lower, stations):
+    """
+    Samples a section at common chordwise stations
+
+    :return: (shape, features) tuple, shape is the upper then lower surface y/c at the stations and features is a
+        dict with the thickness, camber and their chordwise locations
+    """
+    x_le = min(upper[:, 0].min(), lower[:, 0].min())
+    chord = max(upper[:, 0].max(), lower[:, 0].max()) - x_le
+    if chord <= 0:
+        raise ValueError("Section has zero chord")
+    surfaces = []
+    for s in (upper, lower):
+        order = np.argsort(s[:, 0], kind="stable")
+        surfaces.append(np.interp(stations, (s[order, 0] - x_le) / chord, s[order, 1] / chord))
+    yu, yl = surfaces
+    t = yu - yl
+    c = 0.5 * (yu + yl)
+    i_t = int(np.argmax(t))
+    i_c = int(np.argmax(np.abs(c)))
+    features = dict(thickness=float(t[i_t]), thickness_loc=float(stations[i_t]),
+                    camber=float(c[i_c]), camber_loc=float(stations[i_c]))
+    return np.concatenate((yu, yl)), features
@@ -18,10 +18,11 @@
 
 import os
 import matplotlib.pyplot as plt
-from math import pi, cos, sin, factorial
+from math import pi
 from enum import Enum
 import numpy as np
 import copy
+import functools
 import math
 
 class Segment(np.ndarray):
@@ -313,6 +314,96 @@ class airfoil():
         switches = [s+1 for s in switches]
         return switches
 
+@functools.lru_cache(maxsize=32)
+def _cst_x(N):
+    """
+    Cosine x distribution used by the CST airfoils, running from the trailing edge around the lower surface to the
+    leading edge and back along the upper surface
+
+    :param N: number of points
+    :return: (x, center_loc) tuple, center_loc is the index of the leading edge point
+    """
+    zeta = 2 * pi / N * np.arange(N)
+    x = 0.5 * (np.cos(zeta) + 1)
+    center_loc = int(np.argmin(x))
+    x[center_loc] = 0.
+    x.setflags(write=False)
+    return x, center_loc
+
+
+@functools.lru_cache(maxsize=64)
+def _cst_basis(N, n, N1, N2):
+    """
+    Class function times the Bernstein polynomials of order n evaluated on the cosine x distribution
+
+    :return: Nx(n+1) read only array
+    """
+    x, _ = _cst_x(N)
+    j = np.arange(n + 1)
+    K = np.array([math.comb(n, i) for i in j], dtype=float)
+    C = x ** N1 * (1 - x) ** N2
+    B = C[:, np.newaxis] * K * x[:, np.newaxis] ** j * (1 - x[:, np.newaxis]) ** (n - j)
+    B.setflags(write=False)
+    return B
+
+
+def cst_coordinates(wl, wu, dz=0, N=200, N1=0.5, N2=1):
+    """
+    Evaluates a batch of CST (Kulfan) airfoils in one matrix product per surface
+
+    :param wl: lower surface weights, either a vector or an MxNl array with one airfoil per row
+    :param wu: upper surface weights, either a vector or an MxNu array with one airfoil per row
+    :param dz: trailing edge thickness, scalar or length M array
+    :param N: number of output points
+    :param N1: class function leading edge exponent (0.5 for airfoils)
+    :param N2: class function trailing edge exponent (1 for airfoils)
+    :return: (x, y) tuple, x is the length N x distribution and y is the MxN array of y coordinates (length N if the
+        weights were vectors)
+    """
+    wl = np.asarray(wl, dtype=float)
+    wu = np.asarray(wu, dtype=float)
+    single = wl.ndim == 1 and wu.ndim == 1 and np.ndim(dz) == 0
+    wl = np.atleast_2d(wl)
+    wu = np.atleast_2d(wu)
+    dz = np.reshape(np.asarray(dz, dtype=float), (-1, 1))
+
+    x, center_loc = _cst_x(N)
+    Bl = _cst_basis(N, wl.shape[1] - 1, N1, N2)[:center_loc]
+    Bu = _cst_basis(N, wu.shape[1] - 1, N1, N2)[center_loc:]
+
+    M = max(wl.shape[0], wu.shape[0], dz.shape[0])
+    y = np.empty((M, N))
+    y[:, :center_loc] = wl @ Bl.T - x[:center_loc] * dz
+    y[:, center_loc:] = wu @ Bu.T + x[center_loc:] * dz
+    if single:
+        return x, y[0]
+    return x, y
+
+
+def cst_jacobian(nl, nu, N=200, N1=0.5, N2=1):
+    """
+    Analytic derivatives of the CST y coordinates with respect to the weights and the trailing edge thickness.
+
+    The CST coordinates are linear in the weights, so the jacobian is the same for every airfoil of a given order
+    and is returned from the basis cache.
+
+    :param nl: number of lower surface weights
+    :param nu: number of upper surface weights
+    :param N: number of output points
+    :param N1: class function leading edge exponent
+    :param N2: class function trailing edge exponent
+    :return: (dy_dwl, dy_dwu, dy_ddz) tuple of NxNl, NxNu and length N arrays
+    """
+    x, center_loc = _cst_x(N)
+    dy_dwl = np.zeros((N, nl))
+    dy_dwl[:center_loc] = _cst_basis(N, nl - 1, N1, N2)[:center_loc]
+    dy_dwu = np.zeros((N, nu))
+    dy_dwu[center_loc:] = _cst_basis(N, nu - 1, N1, N2)[center_loc:]
+    dy_ddz = x.copy()
+    dy_ddz[:center_loc] *= -1
+    return dy_dwl, dy_dwu, dy_ddz
+
+
 class kulfanAirfoil(airfoil):
     def __init__(self, wl=[-1, -1, -1], wu=[1, 1, 1], dz=0, N=200):
         """
@@ -337,40 +428,9 @@ class kulfanAirfoil(airfoil):
 
         :return: (x,y,coords) tuple containing the x coordinates, the y coordinates, and the concatenated coordinates
         """
-        wl = self.wl
-        wu = self.wu
-        dz = self.dz
-        N = self.N
-
-        # Create x coordinate
-        x = np.ones((N, 1))
-        y = np.zeros((N, 1))
-        zeta = np.zeros((N, 1))
-
-        for i in range(0, N):
-            zeta[i] = 2 * pi / N * i
-            x[i] = 0.5 * (cos(zeta[i]) + 1)
-
         # N1 and N2 parameters (N1 = 0.5 and N2 = 1 for airfoil shape)
-        N1 = 0.5
-        N2 = 1
-
-        center_loc = np.where(x == 0)  # Used to separate upper and lower surfaces
-        center_loc = center_loc[0][0]
-
-        xl = np.zeros(center_loc)
-        xu = np.zeros(N - center_loc)
-
-        for i in range(len(xl)):
-            xl[i] = x[i]  # Lower surface x-coordinates
-        for i in range(len(xu)):
-            xu[i] = x[i + center_loc]  # Upper surface x-coordinates
-
-        yl = self.__ClassShape(wl, xl, N1, N2, -dz)  # Call ClassShape function to determine lower surface y-coordinates
-        yu = self.__ClassShape(wu, xu, N1, N2, dz)  # Call ClassShape function to determine upper surface y-coordinates
-
-        y = np.hstack((yl, yu))  # Combine upper and lower y coordinates
-        x = x.reshape(-1)
+        x, y = cst_coordinates(self.wl, self.wu, self.dz, self.N, N1=0.5, N2=1)
+        x = x.copy()
         coords = np.vstack( (x, y) ).T # Combine x and y into single output
         return x, y, coords
 
@@ -381,40 +441,121 @@ class kulfanAirfoil(airfoil):
         :return:
         """
         return self
-    def __ClassShape(self, w, x, N1, N2, dz):
-        """
 
-        :param w: weight function
-        :param x: x locations at which y will be calculated
-        :param N1:
-        :param N2:
-        :param dz:
-        :return:
+    def jacobian(self):
         """
-        # Class function; taking input of N1 and N2
-        C = np.zeros(len(x))
-        for i in range(len(x)):
-            C[i] = x[i] ** N1 * ((1 - x[i]) ** N2)
-
-        # Shape function; using Bernstein Polynomials
-        n = len(w) - 1  # Order of Bernstein polynomials
-
-        K = np.zeros(n + 1)
-        for i in range(0, n + 1):
-            K[i] = factorial(n) / (factorial(i) * (factorial((n) - (i))))
+        Derivatives of the airfoil y coordinates with respect to the weights
 
-        S = np.zeros(len(x))
-        for i in range(len(x)):
-            S[i] = 0
-            for j in range(0, n + 1):
-                S[i] += w[j] * K[j] * x[i] ** (j) * ((1 - x[i]) ** (n - (j)))
-
-        # Calculate y output
-        y = np.zeros(len(x))
-        for i in range(len(y)):
-            y[i] = C[i] * S[i] + x[i] * dz
-
-        return y
+        :return: (dy_dwl, dy_dwu, dy_ddz) tuple, see cst_jacobian
+        """
+        return cst_jacobian(len(self.wl), len(self.wu), self.N)
+
+
+@functools.lru_cache(maxsize=32)
+def _spacing_grid(nPts, half_cosine_spacing=False):
+    """
+    Chordwise x distribution from 0 to 1
+
+    :param nPts: number of points
+    :param half_cosine_spacing: cluster points at the leading and trailing edges
+    :return: read only length nPts array
+    """
+    if half_cosine_spacing:
+        x = 0.5 * (1.0 - np.cos(np.linspace(0.0, pi, nPts)))
+    else:
+        x = np.linspace(0.0, 1.0, nPts)
+    x.setflags(write=False)
+    return x
+
+
+def naca4_sections(max_camber, camb_loc, max_thick, nPts=100, finite_TE=False, half_cosine_spacing=False):
+    """
+    Generates a family of NACA 4-series sections in one call. The section parameters may be scalars or arrays, which
+    are broadcast against each other.
+
+    :param max_camber: max camber value(s) (eg 2)
+    :param camb_loc: location(s) of max camber (eg 4)
+    :param max_thick: max thickness(es) (eg 12)
+    :param nPts: number of chordwise panels, each surface has nPts+1 points
+    :param finite_TE: use the finite thickness trailing edge coefficient
+    :param half_cosine_spacing: use half cosine instead of linear chordwise spacing
+    :return: (upper, lower) tuple of Mx(nPts+1)x2 arrays of (x,y) coordinates
+    """
+    m, p, t = np.broadcast_arrays(np.atleast_1d(np.asarray(max_camber, dtype=float)) / 100.0,
+                                  np.atleast_1d(np.asarray(camb_loc, dtype=float)) / 10.0,
+                                  np.atleast_1d(np.asarray(max_thick, dtype=float)) / 100.0)
+    m = m.reshape(-1, 1)
+    p = p.reshape(-1, 1)
+    t = t.reshape(-1, 1)
+
+    a0 = +0.2969
+    a1 = -0.1260
+    a2 = -0.3516
+    a3 = +0.2843
+
+    if finite_TE:
+        a4 = -0.1015  # For finite thick TE
+    else:
+        a4 = -0.1036  # For zero thick TE
+
+    x = _spacing_grid(nPts + 1, half_cosine_spacing)
+
+    yt = 5 * t * (a0 * np.sqrt(x) + a1 * x + a2 * x ** 2 + a3 * x ** 3 + a4 * x ** 4)
+
+    fore = x <= p
+    with np.errstate(divide="ignore", invalid="ignore"):
+        zc = np.where(fore, m / p ** 2 * x * (2 * p - x), m / (1 - p) ** 2 * (1 - 2 * p + x) * (1 - x))
+        dyc_dx = np.where(fore, m / p ** 2 * (2 * p - 2 * x), m / (1 - p) ** 2 * (2 * p - 2 * x))
+
+    # sections with p == 0 are symmetric
+    symmetric = p == 0
+    zc = np.where(symmetric, 0., zc)
+    theta = np.arctan(np.where(symmetric, 0., dyc_dx))
+    sin_theta = np.sin(theta)
+    cos_theta = np.cos(theta)
+
+    upper = np.empty(yt.shape + (2,))
+    lower = np.empty(yt.shape + (2,))
+    upper[..., 0] = x - yt * sin_theta
+    upper[..., 1] = zc + yt * cos_theta
+    lower[..., 0] = x + yt * sin_theta
+    lower[..., 1] = zc - yt * cos_theta
+    return upper, lower
+
+
+def naca16_sections(t_ov_c, cl, xMaxThick=0.5, nPts=150):
+    """
+    Generates a family of NACA 16-series sections in one call. The section parameters may be scalars or arrays, which
+    are broadcast against each other.
+
+    :param t_ov_c: thickness to chord ratio(s)
+    :param cl: design cl(s)
+    :param xMaxThick: x/C location(s) of max thickness
+    :param nPts: number of points
+    :return: (top, bottom) tuple of MxnPtsx2 arrays of (x,y) coordinates
+    """
+    t, cl, xMaxThick = np.broadcast_arrays(np.atleast_1d(np.asarray(t_ov_c, dtype=float)),
+                                           np.atleast_1d(np.asarray(cl, dtype=float)),
+                                           np.atleast_1d(np.asarray(xMaxThick, dtype=float)))
+    t = t.reshape(-1, 1)
+    cl = cl.reshape(-1, 1)
+    xMaxThick = xMaxThick.reshape(-1, 1)
+
+    x = _spacing_grid(nPts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yc = -0.079577 * cl * (x*np.log(x) + (1-x)*np.log(x)*(1-x))
+    yc[:, 0] = 0
+
+    fore = 0.01*t * (0.989665*np.sqrt(x) - 0.239250*x - 0.041000*x**2 - 0.559400*x**3)
+    aft = 0.01*t * (0.01 + 2.325*(1-x) - 3.42 * (1-x)**2 + 1.46*(1-x)**3)
+
+    top = np.empty(yc.shape + (2,))
+    bottom = np.empty(yc.shape + (2,))
+    top[..., 0] = x
+    top[..., 1] = yc + np.where(x <= xMaxThick, fore, aft)
+    bottom[..., 0] = x
+    bottom[..., 1] = yc - fore
+    return top, bottom
 
 
 class Naca4(airfoil):
@@ -431,66 +572,35 @@ class Naca4(airfoil):
 
         self.segments = self.genSegs(**kwargs)
 
+    @classmethod
+    def family(cls, max_camber, camb_loc, max_thick, **kwargs):
+        """Generates a list of NACA 4-series airfoils from arrays of section parameters in one call
+
+        :param max_camber: max camber values
+        :param camb_loc: locations of max camber
+        :param max_thick: max thicknesses
+        :param kwargs: passed to naca4_sections
+        :return: list of Naca4 airfoils
+        """
+        params = np.broadcast_arrays(np.atleast_1d(max_camber), np.atleast_1d(camb_loc), np.atleast_1d(max_thick))
+        upper, lower = naca4_sections(*params, **kwargs)
+        airfoils = []
+        for i, (m, p, t) in enumerate(zip(*params)):
+            a = cls.__new__(cls)
+            a.max_camber = m
+            a.camb_loc = p
+            a.max_thick = t
+            a.segments = [upper[i], lower[i]]
+            airfoils.append(a)
+        return airfoils
+
     def genSegs(self,  nPts=100, finite_TE=False, half_cosine_spacing=False):
         """
         Returns 2*n+1 points in [0 1] for the given 4 digit NACA number string
         """
-
-        m = self.max_camber / 100.0
-        p = self.camb_loc / 10.0
-        t = self.max_thick / 100.0
-
-        a0 = +0.2969
-        a1 = -0.1260
-        a2 = -0.3516
-        a3 = +0.2843
-
-        if finite_TE:
-            a4 = -0.1015  # For finite thick TE
-        else:
-            a4 = -0.1036  # For zero thick TE
-
-        if half_cosine_spacing:
-            beta = np.linspace(0.0, pi, nPts + 1)
-            x = [(0.5 * (1.0 - cos(xx))) for xx in beta]  # Half cosine based spacing
-        else:
-            x = np.linspace(0.0, 1.0, nPts + 1)
-
-        yt = [5 * t * (a0 * math.sqrt(xx) + a1 * xx + a2 * pow(xx, 2) + a3 * pow(xx, 3) + a4 * pow(xx, 4)) for xx in x]
-
-        xc1 = [xx for xx in x if xx <= p]
-        xc2 = [xx for xx in x if xx > p]
-
-        if p == 0:
-            xu = x
-            yu = yt
-
-            xl = x
-            yl = [-xx for xx in yt]
-
-            xc = xc1 + xc2
-            zc = [0] * len(xc)
-        else:
-            yc1 = [m / pow(p, 2) * xx * (2 * p - xx) for xx in xc1]
-            yc2 = [m / pow(1 - p, 2) * (1 - 2 * p + xx) * (1 - xx) for xx in xc2]
-            zc = yc1 + yc2
-
-            dyc1_dx = [m / pow(p, 2) * (2 * p - 2 * xx) for xx in xc1]
-            dyc2_dx = [m / pow(1 - p, 2) * (2 * p - 2 * xx) for xx in xc2]
-            dyc_dx = dyc1_dx + dyc2_dx
-
-            theta = [math.atan(xx) for xx in dyc_dx]
-
-            xu = [xx - yy * sin(zz) for xx, yy, zz in zip(x, yt, theta)]
-            yu = [xx + yy * cos(zz) for xx, yy, zz in zip(zc, yt, theta)]
-
-            xl = [xx + yy * sin(zz) for xx, yy, zz in zip(x, yt, theta)]
-            yl = [xx - yy * cos(zz) for xx, yy, zz in zip(zc, yt, theta)]
-
-        upper = np.array( [xu, yu]).T
-        lower = np.array( [xl, yl]).T
-
-        return [upper, lower]
+        upper, lower = naca4_sections(self.max_camber, self.camb_loc, self.max_thick, nPts=nPts,
+                                      finite_TE=finite_TE, half_cosine_spacing=half_cosine_spacing)
+        return [upper[0], lower[0]]
 
     def to_naca_string(self):
         """Saves airfoil to a NACA string
@@ -542,32 +652,32 @@ class Naca16(airfoil):
         self.cl = cl
         self.t_ov_c = t_ov_c
 
-        x = np.linspace(0,1,self.nPts)
-        yc = -0.079577 * self.cl * (x*np.log(x) + (1-x)*np.log(x)*(1-x))
-        yc[0] = 0
-
-        yt = np.empty(x.shape)
-        yb = np.empty(yt.shape)
-
-        for i in range(0,x.shape[0]):
-            if x[i] <= self.xMaxThick:
-                yt[i] = yc[i] + 0.01*self.t_ov_c * (0.989665*np.power(x[i],0.5) - 0.239250*x[i] - 0.041000*np.power(x[i],2) - 0.559400*np.power(x[i],3))
-                yb[i] = yc[i] - 0.01*self.t_ov_c * (0.989665*np.power(x[i],0.5) - 0.239250*x[i] - 0.041000*np.power(x[i],2) - 0.559400*np.power(x[i],3))
-
-            else:
-                yt[i] = yc[i] + 0.01*self.t_ov_c * (0.01 + 2.325*(1-x[i]) - 3.42 * np.power(1-x[i],2) + 1.46*np.power(1-x[i],3))
-                yb[i] = yc[i] - 0.01*self.t_ov_c * (0.989665*np.power(x[i],0.5) - 0.239250*x[i] - 0.041000*np.power(x[i],2) - 0.559400*np.power(x[i],3))
+        top, bottom = naca16_sections(self.t_ov_c, self.cl, self.xMaxThick, self.nPts)
+        self.LERadius = np.power(0.004897,2)*np.power(self.t_ov_c,2)
+        self.segments.append(top[0])
+        self.segments.append(bottom[0])
 
+    @classmethod
+    def family(cls, t_ov_c, cl, xMaxThick=0.5, nPts=150):
+        '''
+        Generates a list of NACA 16-series airfoils from arrays of section parameters in one call
 
-        plt.plot(x,yc)
-        plt.figure()
-        plt.plot(x,yt)
-        print(yt.max())
-        plt.figure()
-        plt.plot(x,yb)
-        plt.show()
-        self.LERadius = np.power(0.004897,2)*np.power(self.t_ov_c,2)
-        #yt[0] = yc[0] + self.LERadius
-        #yb[0] = yc[0] - self.LERadius
-        self.segments.append( np.vstack((x,yt)).T)
-        self.segments.append( np.vstack((x,yb)).T)
\ No newline at end of file
+        :param t_ov_c: thickness to chord ratios
+        :param cl: design cls
+        :param xMaxThick: x/C locations of max thickness
+        :param nPts: number of points
+        :return: list of Naca16 airfoils
+        '''
+        params = np.broadcast_arrays(np.atleast_1d(t_ov_c), np.atleast_1d(cl), np.atleast_1d(xMaxThick))
+        top, bottom = naca16_sections(*params, nPts=nPts)
+        airfoils = []
+        for i, (t, c, xm) in enumerate(zip(*params)):
+            a = cls.__new__(cls)
+            airfoil.__init__(a, segments=[top[i], bottom[i]])
+            a.xMaxThick = xm
+            a.nPts = nPts
+            a.cl = c
+            a.t_ov_c = t
+            a.LERadius = np.power(0.004897,2)*np.power(t,2)
+            airfoils.append(a)
+        return airfoils